@@ -1,11 +1,16 @@
 import serial
 import numpy as np
-import pandas as pd
 import time
+from nmea import NmeaParser, fixDtype
+from ring_buffer import RingBuffer
 
 class GPS:
-    def __init__(self, port):
+    def __init__(self, port, capacity=3600):
         self.port = port
+
+        # Sentences are parsed as they arrive (see nmea.py), fixes go to a fixed-size track log (newest `capacity` fixes)
+        self.parser = NmeaParser()
+        self.track = RingBuffer(capacity, fixDtype)
         
     def configuratePort(self):
         self.gps_port = serial.Serial(port=self.port, baudrate=9600, timeout=1)
@@ -15,65 +20,27 @@ class GPS:
     def readSentence(self):
         self.sentence = self.gps_port.readline().decode('ascii', errors='replace').strip()
 
-    def parseGPGGA(self, sentence):
-        parts = sentence.split(',')
+    def read(self):
+        # Everything received so far (waits up to the port timeout for the first byte), returns the number of new fixes
+        data = self.gps_port.read(max(self.gps_port.in_waiting, 1))
+        fixes = self.parser.feed(data, time.time())
+        if fixes:
+            self.track.extend(np.array(fixes, dtype=fixDtype))
+        return len(fixes)
 
-        # 0. Identifier (in this case it must be GPGGA)
-        if parts[0] != '$GPGGA' or len(parts) < 15:
+    def parseGPGGA(self, sentence):
+        # One sentence: latitude, longitude, fix quality, satellites and altitude of a GGA sentence (any talker, checksum
+        # verified), None for other sentences or without a fix
+        fixes = NmeaParser().feed(sentence.encode('ascii', errors='replace') + b'\n', time.time())
+        if not fixes:
             return None
-        
-        # 1. Time (UTC) format hhmmss
-        time_utc = parts[1]
-
-        # 2. Latitude, format DDMM.MMMM (D is degrees, M is minutes)
-        latitude_degmin = parts[2]
-        degrees = int(latitude_degmin[:2])
-        minutes = float(latitude_degmin[2:])
-        latitude = degrees + minutes/60
-
-        # 3. Latitude direction (north or south)
-        lat_direction = parts[3]
-        if lat_direction == 'S':
-            latitude *= -1 # Invert latitude value depending on direction
-
-        # 4. Longitude, format DDMM.MMMM (D is degrees, M is minutes)
-        longitude_degmin = parts[4]
-        degrees = int(longitude_degmin[:2])
-        minutes = float(longitude_degmin[2:])
-        longitude = degrees + minutes/60
-
-        # 5. Longitude direction (east or west)
-        lon_direction = parts[5]
-        if lon_direction == 'W':
-            longitude *= -1 # Invert longitude value depending on direction
-
-        # 6. Fix quality
-        fix_quality = parts[6]
-
-        # 7. Number of satellites
-        satellites = parts[7]
-
-        # 8. Horizontal dilution
-        dilution = parts[8]
-
-        # 9. Altitude (m)
-        altitude = parts[9]
-
+        now, utc, latitude, longitude, altitude, fix_quality, satellites = fixes[0][:7]
         return latitude, longitude, fix_quality, satellites, altitude
     
     def getPosition(self):
-        latitude, longitude, fix_quality, satellites, altitude = self.parseGPGGA(self.sentence)
-
-        # Save data into a dataframe
-        self.gps_data = pd.DataFrame([{
-            'latitude': latitude,
-            'longitude': longitude,
-            'fix_quality': fix_quality,
-            'satellites': satellites,
-            'altitude': altitude
-        }])
-
-        #print(gps_data)
+        # Newest fix (fixDtype record), None before the first one
+        self.gps_data = self.track.latest()
+        return self.gps_data
 
     def closePort(self):
         self.gps_port.close()
\ No newline at end of file
@@ -1,18 +1,101 @@
-import smbus
+import json
+import time
 import numpy as np
 from time import sleep
 
+try:
+    import smbus
+except ImportError:
+    smbus = None # Only on the Pi: off the Pi pass a fake bus (see sensor_sim.py)
+
+# Registers
+configRegisterA = 0x00
+configRegisterB = 0x01
+modeRegister = 0x02
+dataRegister = 0x03 # 6-byte block: X, Z, Y (big-endian int16)
+statusRegister = 0x09
+
+# Output rates (Hz) in continuous mode and averaged samples per output, with their codes in configuration register A
+outputRates = {0.75: 0, 1.5: 1, 3: 2, 7.5: 3, 15: 4, 30: 5, 75: 6}
+averagedSamples = {1: 0, 2: 1, 4: 2, 8: 3}
+overflowValue = -4096 # Reading of an axis out of range
+
+# Hard/soft iron calibration of the last fit (see HMC5883L.calibrate)
+magCalibrationFileName = 'mag_calibration.json'
+
+def tiltCompensatedHeading(m, pitch, roll):
+
+    # Heading (º, 0-360) of readings m (n, 3) with the attitude of MPU6050 (º, pitch about x, roll about y)
+    # The readings are rotated to the horizontal plane with the rotation that takes the accelerometer's gravity to z
+    m = np.atleast_2d(m)
+    pitch = np.radians(pitch)
+    roll = np.radians(roll)
+
+    x = m[:, 0]*np.cos(roll) + m[:, 2]*np.sin(roll)
+    y = m[:, 1]*np.cos(pitch) + np.sin(pitch)*(m[:, 0]*np.sin(roll) - m[:, 2]*np.cos(roll))
+    return np.rad2deg(np.arctan2(y, x)) % 360
+
+def fitCalibration(samples):
+
+    # Hard and soft iron from raw readings (n, 3) taken while rotating the sensor in every direction:
+    # least-squares fit of the ellipsoid they lie on, mapped to a sphere of the same volume
+    # Returns offset (3,) and matrix (3, 3): calibrated = (raw - offset) @ matrix.T
+    samples = np.asarray(samples, dtype=np.float64)
+    if len(samples) < 9:
+        raise ValueError("At least 9 readings are needed to fit the calibration")
+
+    # a x² + b y² + c z² + 2d xy + 2e xz + 2f yz + 2g x + 2h y + 2i z = 1
+    x, y, z = samples.T
+    design = np.column_stack([x*x, y*y, z*z, 2*x*y, 2*x*z, 2*y*z, 2*x, 2*y, 2*z])
+    a, b, c, d, e, f, g, h, i = np.linalg.lstsq(design, np.ones(len(samples)), rcond=None)[0]
+    quadric = np.array([[a, d, e], [d, b, f], [e, f, c]])
+    linear = np.array([g, h, i])
+
+    offset = -np.linalg.solve(quadric, linear)
+    shape = quadric / (1 + offset @ quadric @ offset)
+    eigenvalues, eigenvectors = np.linalg.eigh(shape)
+    if np.any(eigenvalues <= 0):
+        raise ValueError("The readings do not cover enough orientations to fit the calibration")
+
+    # Square root of the shape (maps the ellipsoid to the unit sphere), scaled to the geometric mean radius
+    matrix = eigenvectors @ np.diag(np.sqrt(eigenvalues)) @ eigenvectors.T
+    matrix *= np.prod(eigenvalues) ** (-1/6)
+    return offset, matrix
+
 class HMC5883L:
-    def __init__(self, address=0x1E):
-        self.bus = smbus.SMBus(1)
+    def __init__(self, address=0x1E, bus=None, rate=15, samples=8, calibrationFileName=magCalibrationFileName):
+        self.bus = bus if bus is not None else smbus.SMBus(1)
         self.address = address
 
         # Initialize the sensor
-        self.bus.write_byte_data(self.address, 0x00, 0x70) # Measurement and frequency config (default)
-        self.bus.write_byte_data(self.address, 0x01, 0x20) # Gain (default)
-        self.bus.write_byte_data(self.address, 0x02, 0x00) # Measurement mode (continuous)
+        self.setRate(rate, samples) # Measurement and frequency config (default: 15 Hz, 8 samples averaged)
+        self.bus.write_byte_data(self.address, configRegisterB, 0x20) # Gain (default)
+        self.bus.write_byte_data(self.address, modeRegister, 0x00) # Measurement mode (continuous)
         sleep(0.01)
 
+        # Hard/soft iron calibration (none until fitted with calibrate or loaded from the file)
+        self.calibrationFileName = calibrationFileName
+        self.offset = np.zeros(3)
+        self.matrix = np.eye(3)
+        self.loadCalibration()
+
+        self.Mx, self.My, self.Mz = None, None, None # Last raw reading
+        self.yaw = None
+        self.lastSample = None # Last new sample (see readData with a timeout) and when it was read (time.perf_counter)
+        self.lastSampleTime = None
+
+        # Statistics
+        self.staleReads = 0 # No new sample within the timeout
+        self.overflows = 0 # Readings out of range (discarded)
+        self.repeats = 0 # Same sample read again (data-ready bit set before a new output, discarded)
+
+    def setRate(self, rate=15, samples=8):
+        # Continuous-mode output rate (Hz, up to 75) and samples averaged per output
+        if rate not in outputRates or samples not in averagedSamples:
+            raise ValueError(f"Rate must be one of {list(outputRates)} Hz and samples one of {list(averagedSamples)}")
+        self.bus.write_byte_data(self.address, configRegisterA, averagedSamples[samples] << 5 | outputRates[rate] << 2)
+        self.rate = rate
+
     def readAxis(self, reg_high, reg_low):
         high = self.bus.read_byte_data(self.address, reg_high)
         low = self.bus.read_byte_data(self.address, reg_low)
@@ -21,31 +104,97 @@ class HMC5883L:
             value -= 65536
         return value
 
-    def readData(self):
-        Mx = self.readAxis(reg_high=0x03, reg_low=0x04)
-        My = self.readAxis(reg_high=0x07, reg_low=0x08)
-        Mz = self.readAxis(reg_high=0x05, reg_low=0x06)
-        
+    def dataReady(self):
+        return bool(self.bus.read_byte_data(self.address, statusRegister) & 0x01)
+
+    def readData(self, timeout=None):
+        # Raw x, y, z of the newest sample in one 6-byte read (instead of six single-byte reads)
+        # With a timeout, waits for a new sample first: returns None if no new sample arrives in time
+        # In continuous mode the data-ready bit stays set until the data is read and can be set again during an update,
+        # so it is only polled from 0.8 output periods after the last sample and a repeat of it within one period is dropped
+        if timeout is not None:
+            deadline = time.perf_counter() + timeout
+            if self.lastSampleTime is not None:
+                sleep(max(min(self.lastSampleTime + 0.8 / self.rate, deadline) - time.perf_counter(), 0))
+            while not self.dataReady():
+                if time.perf_counter() >= deadline:
+                    self.staleReads += 1
+                    return None
+                sleep(min(0.1 / self.rate, max(deadline - time.perf_counter(), 0)))
+
+        Mx, Mz, My = np.frombuffer(bytes(self.bus.read_i2c_block_data(self.address, dataRegister, 6)), dtype='>i2').tolist()
+        if overflowValue in (Mx, My, Mz):
+            self.overflows += 1
+            return None
+
+        if timeout is not None:
+            now = time.perf_counter()
+            if (Mx, My, Mz) == self.lastSample and now - self.lastSampleTime < 1 / self.rate:
+                self.repeats += 1
+                return None
+            self.lastSample, self.lastSampleTime = (Mx, My, Mz), now
 
         return Mx, My, Mz
+
+    def calibrated(self, raw):
+        # Hard/soft iron correction of raw readings (n, 3) in one product
+        return (np.asarray(raw, dtype=np.float64) - self.offset) @ self.matrix.T
+
+    def headings(self, raw, pitch, roll):
+        # Tilt-compensated headings of arrays of raw readings (n, 3) and attitudes (º)
+        return tiltCompensatedHeading(self.calibrated(raw), pitch, roll)
     
     def computeYaw(self):
-        Mx,My,Mz = self.readData()
+        raw = self.readData()
+        if raw is None:
+            return None
+        Mx,My,Mz = self.calibrated(raw)
         yaw_rad = np.arctan2(My,Mx) # Radians
         yaw_deg = np.rad2deg(yaw_rad) # Degrees
         yaw = yaw_deg % 360 # Ensure angle is within 0-360º
 
         return yaw
     
-    def computeYawTiltCompensation(self, pitch, roll):
-        # Correct yaw angle with MPU measurements
-        Mx,My,Mz = self.readData()
-        Mx_corrected = Mx*np.cos(pitch) + Mz*np.sin(pitch)
-        My_corrected = Mx*np.sin(roll)*np.sin(pitch) + My*np.cos(roll) - Mz*np.sin(roll)*np.cos(pitch)
+    def computeYawTiltCompensation(self, pitch, roll, timeout=None):
+        # Correct yaw angle with MPU measurements (pitch and roll in degrees, as given by MPU6050)
+        # Returns None (and keeps the previous yaw) if there is no new reading, see readData
+        raw = self.readData(timeout)
+        if raw is None:
+            return None
+        self.Mx, self.My, self.Mz = raw # Last raw reading
 
-        yaw_rad = np.arctan2(My_corrected, Mx_corrected) # Radians
-        yaw_deg = np.rad2deg(yaw_rad) # Degrees
-        self.yaw = yaw_deg % 360 # Ensure angle is within 0-360º
+        self.yaw = float(self.headings(raw, pitch, roll)[0])
+        return self.yaw
+
+    def calibrate(self, duration=30.0):
+        # Rotate the sensor in every direction (full turns with different tilts) for `duration` seconds
+        readings = []
+        deadline = time.perf_counter() + duration
+        while time.perf_counter() < deadline:
+            raw = self.readData(timeout=2 / self.rate)
+            if raw is not None:
+                readings.append(raw)
+
+        self.offset, self.matrix = fitCalibration(readings)
+        self.saveCalibration()
+        return self.offset, self.matrix
+
+    def saveCalibration(self):
+        if self.calibrationFileName is None:
+            return
+        with open(self.calibrationFileName, 'w') as fp:
+            json.dump({'offset': self.offset.tolist(), 'matrix': self.matrix.tolist()}, fp)
+
+    def loadCalibration(self):
+        if self.calibrationFileName is None:
+            return
+        try:
+            with open(self.calibrationFileName, 'r') as fp:
+                calibration = json.load(fp)
+        except (FileNotFoundError, ValueError):
+            return
+        self.offset = np.array(calibration['offset'], dtype=np.float64)
+        self.matrix = np.array(calibration['matrix'], dtype=np.float64)
     
     def printYaw(self):
         #yaw = self.computeYaw()
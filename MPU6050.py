@@ -1,17 +1,45 @@
-import smbus
 import time
 import numpy as np
 
+try:
+    import smbus
+except ImportError:
+    smbus = None # Only on the Pi: off the Pi pass a fake bus (see sensor_sim.py)
+
+# Registers
+sampleRateDivider = 0x19
+configRegister = 0x1A
+fifoEnableRegister = 0x23
+intStatusRegister = 0x3A
+dataRegister = 0x3B # 14-byte block: accel x, y, z, temperature, gyro x, y, z (big-endian int16)
+userControlRegister = 0x6A
+powerRegister = 0x6B
+fifoCountRegister = 0x72
+fifoRegister = 0x74
+
+fifoSampleSize = 12 # Bytes per FIFO sample (accel x, y, z, gyro x, y, z)
+maxBlockRead = 32 # SMBus block read limit
+
 class MPU6050:
-    def __init__(self, address=0x68):
-        self.bus = smbus.SMBus(1)
+    def __init__(self, address=0x68, bus=None):
+        self.bus = bus if bus is not None else smbus.SMBus(1)
         self.address = address
-        self.bus.write_byte_data(self.address, 0x6B, 0)  # Wake up the MPU6050
+        self.bus.write_byte_data(self.address, powerRegister, 0)  # Wake up the MPU6050
 
         self.accel_sensitivity = 16384.0  # Sensitivity for accelerometer (2g range)
         self.gyro_sensitivity = 131.0      # Sensitivity for gyroscope (250 degrees/s range)
         self.last_time = time.time()
 
+        # Scale of each word of the data block and of a FIFO sample
+        self.blockScale = np.array([1/self.accel_sensitivity]*3 + [1/340] + [1/self.gyro_sensitivity]*3)
+        self.fifoScale = self.blockScale[[0, 1, 2, 4, 5, 6]]
+        self.temperature = None # ºC, from the last block read
+
+        # FIFO mode (see enableFifo)
+        self.sampleRate = None
+        self.fifoTime = None # Timestamp of the last sample read from the FIFO
+        self.fifoOverflows = 0
+
         # Initial angles for gyro
         self.pitch_gyro = 0.0
         self.roll_gyro = 0.0
@@ -31,17 +59,73 @@ class MPU6050:
             return value
     
     def readAngles(self):
-        # Read accelerometer data
-        Ax = self.readWord(0x3B)/self.accel_sensitivity
-        Ay = self.readWord(0x3D)/self.accel_sensitivity
-        Az = self.readWord(0x3F)/self.accel_sensitivity
-
-        # Read gyroscope data
-        Gx = self.readWord(0x43)/self.gyro_sensitivity
-        Gy = self.readWord(0x45)/self.gyro_sensitivity
-        Gz = self.readWord(0x47)/self.gyro_sensitivity
+        # Accelerometer (g) and gyroscope (º/s) in one 14-byte read: the six axes always come from the same sample
+        # (reading them byte by byte took twelve transactions, and the registers could update between the high and low byte)
+        block = np.frombuffer(bytes(self.bus.read_i2c_block_data(self.address, dataRegister, 14)), dtype='>i2') * self.blockScale
+        self.temperature = block[3] + 36.53
 
+        Ax, Ay, Az = block[0:3].tolist()
+        Gx, Gy, Gz = block[4:7].tolist()
         return Ax, Ay, Az, Gx, Gy, Gz
+
+    def setSampleRate(self, rate):
+        # Digital low-pass filter on (1 kHz internal rate, ~185 Hz bandwidth), sample rate = 1 kHz / (1 + divider)
+        divider = int(np.clip(round(1000 / rate) - 1, 0, 255))
+        self.bus.write_byte_data(self.address, configRegister, 0x01)
+        self.bus.write_byte_data(self.address, sampleRateDivider, divider)
+        self.sampleRate = 1000 / (1 + divider)
+        return self.sampleRate
+
+    def enableFifo(self, rate=200, tolerance=None):
+        # The sensor stores every sample (accel + gyro) in its 1024-byte FIFO (85 samples), drained in batches with readFifo
+        self.setSampleRate(rate)
+        self.fifoTolerance = tolerance if tolerance is not None else 2 / self.sampleRate # See readFifo
+        self.bus.write_byte_data(self.address, userControlRegister, 0x04) # Reset
+        self.bus.write_byte_data(self.address, fifoEnableRegister, 0x78) # Accel and gyro x, y, z
+        self.bus.write_byte_data(self.address, userControlRegister, 0x40) # Enable
+        self.fifoTime = None
+
+    def disableFifo(self):
+        self.bus.write_byte_data(self.address, fifoEnableRegister, 0)
+        self.bus.write_byte_data(self.address, userControlRegister, 0x04)
+        self.fifoTime = None
+
+    def fifoCount(self):
+        high, low = self.bus.read_i2c_block_data(self.address, fifoCountRegister, 2)
+        return (high << 8) | low
+
+    def readFifo(self):
+        # Every complete sample in the FIFO: timestamps (s, time.time()) and rows of Ax, Ay, Az (g), Gx, Gy, Gz (º/s)
+        if self.bus.read_byte_data(self.address, intStatusRegister) & 0x10:
+            # Overflow: the oldest bytes were overwritten, so the sample boundaries are lost
+            self.fifoOverflows += 1
+            self.bus.write_byte_data(self.address, userControlRegister, 0x44) # Reset, keep enabled
+            self.fifoTime = None
+            return np.zeros(0), np.zeros((0, 6))
+
+        nOfBytes = self.fifoCount() // fifoSampleSize * fifoSampleSize
+        now = time.time()
+        data = bytearray()
+        while len(data) < nOfBytes:
+            data += bytes(self.bus.read_i2c_block_data(self.address, fifoRegister, min(maxBlockRead, nOfBytes - len(data))))
+        samples = np.frombuffer(bytes(data), dtype='>i2').reshape(-1, 6) * self.fifoScale
+        if len(samples) == 0:
+            return np.zeros(0), samples
+
+        # The FIFO has no timestamps: samples are 1/sampleRate apart and each batch continues the previous one.
+        # The newest sample was taken during the last period before the count was read: the timestamps are pulled slowly
+        # towards that (sensor clock drift), or reset to it if they are more than fifoTolerance away (first batch, lost samples)
+        period = 1 / self.sampleRate
+        anchor = now - period / 2
+        if self.fifoTime is None:
+            last = anchor
+        else:
+            last = self.fifoTime + len(samples) * period
+            last = anchor if abs(anchor - last) > self.fifoTolerance else last + 0.05 * (anchor - last)
+        self.fifoTime = last
+
+        times = last - period * np.arange(len(samples) - 1, -1, -1)
+        return times, samples
     
     def computeAngles(self):
         Ax, Ay, Az, Gx, Gy, Gz = self.readAngles()
@@ -50,13 +134,18 @@ class MPU6050:
         dt = now - self.last_time
         self.last_time = now
 
+        return self.updateAngles(Ax, Ay, Az, Gx, Gy, Gz, dt)
+
+    def updateAngles(self, Ax, Ay, Az, Gx, Gy, Gz, dt):
+        # Complementary filter step for one sample taken dt seconds after the previous one
+
         # Calculate pitch and roll from accelerometer
         pitch_acc = np.arctan2(Ay, np.sqrt(Ax**2+Az**2)) * 180/np.pi
         roll_acc = np.arctan2(-Ax,Az) * 180/np.pi
 
-        # Calculate pitch and roll from gyroscope
-        self.pitch_gyro += Gy * dt
-        self.roll_gyro += Gx * dt
+        # Calculate pitch and roll from gyroscope (rates around the x and y axes, integrated from the filtered angles)
+        self.pitch_gyro = self.pitch + Gx * dt
+        self.roll_gyro = self.roll + Gy * dt
 
         # Combine sensor data using complementary filter
         alpha = 0.98
@@ -0,0 +1,129 @@
+import os
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from test_class import Test
+from result_cache import ResultCache
+
+# Headless batch analysis of many captures (readData --> filterData --> averageData --> dataMetrics)
+# Each manifest row is processed in a worker process, results are collected in two tables:
+#   summary: one row per capture (ratio of filtered/gross points, mean SNR, RCS and error)
+#   metrics: one row per capture and cycle (see metrics.cycleMetrics)
+# Plotting is a separate, optional step (plotResults)
+
+# Manifest columns (.csv): file, label, axis, distance, threshold
+# Optional columns l, w, h (drone dimensions): filter with a sphere (filterDataOutdoors) instead of the axis limits
+manifestColumns = ['file', 'label', 'axis', 'distance', 'threshold']
+
+def readManifest(manifestFileName):
+
+    manifest = pd.read_csv(manifestFileName)
+    missing = [name for name in manifestColumns if name not in manifest.columns]
+    if missing:
+        raise ValueError(f"Manifest {manifestFileName} is missing columns: {missing}")
+
+    # Relative paths are relative to the manifest
+    baseDir = os.path.dirname(os.path.abspath(manifestFileName))
+    manifest['file'] = [name if os.path.isabs(name) else os.path.join(baseDir, name) for name in manifest['file']]
+
+    return manifest
+
+def analyseEntry(entry, cacheDir=None):
+
+    cache = ResultCache(cacheDir) if cacheDir is not None else None
+    test = Test(entry['file'], entry['label'], entry['axis'], entry['distance'], entry['threshold'], cache=cache)
+    test.readData()
+
+    if all(name in entry and pd.notna(entry[name]) for name in ['l', 'w', 'h']):
+        test.filterDataOutdoors(entry['l'], entry['w'], entry['h'], entry['threshold'])
+    else:
+        test.filterData()
+
+    test.averageData()
+    test.dataMetrics()
+
+    metrics = test.metrics.reset_index()
+    metrics.insert(0, 'label', entry['label'])
+    metrics.insert(0, 'file', entry['file'])
+
+    summary = {
+        'file': entry['file'],
+        'label': entry['label'],
+        'axis': entry['axis'],
+        'distance': entry['distance'],
+        'threshold': entry['threshold'],
+        'gross_points': test.gross_points,
+        'filtered_points': test.filtered_points,
+        'ratio': test.ratio,
+        'snr_db': np.nanmean(test.metrics.snr_db) if len(test.metrics) > 0 else np.nan,
+        'snr_linear': np.nanmean(test.metrics.snr_linear) if len(test.metrics) > 0 else np.nan,
+        'rcs': np.nanmean(test.metrics.rcs) if len(test.metrics) > 0 else np.nan,
+        'error': np.nanmean(test.metrics.error) if len(test.metrics) > 0 else np.nan,
+    }
+
+    return summary, metrics
+
+def runBatch(manifest, workers=None, cacheDir=None):
+
+    # manifest: DataFrame (see readManifest) or manifest file name
+    # workers: number of processes (None = number of cores, 1 = run in this process)
+    # cacheDir: result cache directory shared by the workers (see result_cache.py), None to always recompute
+    if isinstance(manifest, str):
+        manifest = readManifest(manifest)
+
+    entries = manifest.to_dict('records')
+
+    if workers == 1:
+        results = [analyseEntry(entry, cacheDir) for entry in entries]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(analyseEntry, entries, [cacheDir] * len(entries)))
+
+    summary = pd.DataFrame([result[0] for result in results])
+    metrics = pd.concat([result[1] for result in results], ignore_index=True) if results else pd.DataFrame()
+
+    return summary, metrics
+
+def plotResults(summary):
+
+    import matplotlib.pyplot as plt
+
+    fig, axs = plt.subplots(1, 3, figsize=(18, 5))
+
+    axs[0].scatter(summary.distance, summary.ratio)
+    axs[0].set_title('Ratio of Filtered/Gross Points')
+    axs[0].set_xlabel('Distance (m)')
+    axs[0].set_ylim(0, 1)
+
+    axs[1].scatter(summary.distance, summary.snr_db)
+    axs[1].set_title('Average SNR')
+    axs[1].set_xlabel('Distance (m)')
+    axs[1].set_ylabel('SNR (dB)')
+
+    axs[2].scatter(summary.distance, summary.error)
+    axs[2].set_title('Average error')
+    axs[2].set_xlabel('Distance (m)')
+    axs[2].set_ylabel('Error (m)')
+
+    for ax in axs:
+        ax.grid(True)
+
+    plt.tight_layout()
+    plt.show()
+
+if __name__ == '__main__':
+
+    manifestFileName = 'batch_manifest.csv'
+    summaryFileName = 'batch_summary.csv'
+    metricsFileName = 'batch_metrics.csv'
+    workers = None # Number of processes (None = number of cores)
+    cacheDir = '.cuas_cache' # Result cache (None to always recompute)
+    plotData = False
+
+    summary, metrics = runBatch(manifestFileName, workers, cacheDir)
+    summary.to_csv(summaryFileName, index=False)
+    metrics.to_csv(metricsFileName, index=False)
+    print(summary)
+
+    if(plotData):
+        plotResults(summary)
@@ -0,0 +1,184 @@
+import os
+import numpy as np
+import pandas as pd
+from frame_store import storeDtype
+
+# -------------------------------------------------------------------------
+# BINARY POINT CLOUD CAPTURE (.npc)
+# -------------------------------------------------------------------------
+
+# File header (8 bytes), followed by fixed-size point records (28 bytes):
+# cycle, object (uint32) | x, y, z, v (float32) | snr, noise (uint16)
+# Records are appended frame by frame, a capture interrupted by a crash is still readable
+# (a partially written last record is ignored)
+
+# Each capture has a cycle index next to it (.npc.idx): one (cycle, start, end) record per frame,
+# start and end being record offsets in the capture. It is rebuilt from the cycle column if missing or stale
+
+captureExtension = '.npc'
+captureMagic = b'CUASPC01'
+captureDtype = storeDtype
+indexExtension = '.idx'
+indexDtype = np.dtype([('cycle', '<u4'), ('start', '<u8'), ('end', '<u8')])
+
+class CaptureWriter:
+
+    def __init__(self, captureFileName, syncEvery=10):
+
+        self.captureFileName = captureFileName
+        self.syncEvery = syncEvery # Frames between fsync calls (0 = only flush)
+        self.nOfFrames = 0
+
+        self.captureFile = open(captureFileName, 'wb')
+        self.captureFile.write(captureMagic)
+        self.captureFile.flush()
+
+        # Cycle index, written next to the capture
+        self.indexFile = open(captureFileName + indexExtension, 'wb')
+        self.nOfRecords = 0
+
+    def append(self, cycleCounter, frame):
+
+        # Write one decoded frame (tlv.frameDtype) as capture records
+        records = np.empty(len(frame), dtype=captureDtype)
+        records['cycle'] = cycleCounter
+        for name in frame.dtype.names:
+            records[name] = frame[name]
+
+        self.appendRecords(records)
+
+    def appendRecords(self, records):
+
+        records = np.ascontiguousarray(records, dtype=captureDtype)
+        self.captureFile.write(records.tobytes())
+        self.captureFile.flush()
+
+        # Index entries are written after the records they point to
+        entries = buildIndex(records['cycle'])
+        entries['start'] += self.nOfRecords
+        entries['end'] += self.nOfRecords
+        self.indexFile.write(entries.tobytes())
+        self.indexFile.flush()
+        self.nOfRecords += len(records)
+
+        self.nOfFrames += 1
+        if self.syncEvery and self.nOfFrames % self.syncEvery == 0:
+            os.fsync(self.captureFile.fileno())
+
+    def close(self):
+        if not self.captureFile.closed:
+            self.captureFile.flush()
+            os.fsync(self.captureFile.fileno())
+            self.captureFile.close()
+            self.indexFile.close()
+
+def cycleOffsets(cycle):
+
+    # Start/end offsets of each run of equal cycle values (one run per cycle if the column is sorted)
+    cycle = np.asarray(cycle)
+    if len(cycle) == 0:
+        return cycle[:0], np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+    starts = np.concatenate(([0], np.flatnonzero(cycle[1:] != cycle[:-1]) + 1))
+    ends = np.concatenate((starts[1:], [len(cycle)]))
+
+    return cycle[starts], starts, ends
+
+def buildIndex(cycle):
+
+    cycles, starts, ends = cycleOffsets(cycle)
+    index = np.empty(len(cycles), dtype=indexDtype)
+    index['cycle'] = cycles
+    index['start'] = starts
+    index['end'] = ends
+
+    return index
+
+class Capture:
+
+    # Memory-mapped capture with a cycle --> (start, end) index
+    # getCycle returns the records of one cycle as a slice of the memory map (no copy)
+
+    def __init__(self, captureFileName):
+
+        self.captureFileName = captureFileName
+
+        with open(captureFileName, 'rb') as fp:
+            if fp.read(len(captureMagic)) != captureMagic:
+                raise ValueError(f"{captureFileName} is not a point cloud capture")
+            nOfRecords = (os.fstat(fp.fileno()).st_size - len(captureMagic)) // captureDtype.itemsize
+
+        if nOfRecords > 0:
+            self.records = np.memmap(captureFileName, dtype=captureDtype, mode='r', offset=len(captureMagic), shape=(nOfRecords,))
+        else:
+            self.records = np.zeros(0, dtype=captureDtype)
+
+        self.readIndex()
+
+    def readIndex(self):
+
+        index = None
+        indexFileName = self.captureFileName + indexExtension
+        if os.path.exists(indexFileName):
+            index = np.fromfile(indexFileName, dtype=indexDtype)
+            # Entries pointing past the last complete record belong to a frame that was not fully written
+            index = index[index['end'] <= len(self.records)]
+            if (index['end'][-1] if len(index) > 0 else 0) != len(self.records):
+                index = None # Stale index, rebuild it
+
+        if index is None:
+            index = buildIndex(self.records['cycle'])
+
+        # A cycle split in several runs (unsorted capture) is served from a sorted copy
+        if len(np.unique(index['cycle'])) != len(index):
+            order = np.argsort(self.records['cycle'], kind='stable')
+            self.records = np.asarray(self.records)[order]
+            index = buildIndex(self.records['cycle'])
+
+        self.index = index
+        self.offsets = {int(entry['cycle']): (int(entry['start']), int(entry['end'])) for entry in index}
+
+    def __len__(self):
+        return len(self.records)
+
+    @property
+    def cycles(self):
+        return self.index['cycle']
+
+    def getCycle(self, cycle):
+        start, end = self.offsets.get(cycle, (0, 0))
+        return self.records[start:end]
+
+    def __iter__(self):
+        # (cycle, records) for every cycle, in capture order
+        for entry in self.index:
+            yield int(entry['cycle']), self.records[entry['start']:entry['end']]
+
+    def toDataFrame(self):
+        return pd.DataFrame({name: np.array(self.records[name]) for name in captureDtype.names})
+
+def readCapture(captureFileName):
+
+    # Read a capture as a structured array (captureDtype)
+    with open(captureFileName, 'rb') as fp:
+        if fp.read(len(captureMagic)) != captureMagic:
+            raise ValueError(f"{captureFileName} is not a point cloud capture")
+        nOfBytes = os.fstat(fp.fileno()).st_size - len(captureMagic)
+        return np.fromfile(fp, dtype=captureDtype, count=nOfBytes // captureDtype.itemsize)
+
+def readCaptureDataFrame(captureFileName):
+
+    # Same columns as the .csv files written by Radar.saveData
+    return Capture(captureFileName).toDataFrame()
+
+def csvToCapture(csvFileName, captureFileName):
+
+    # Convert an existing .csv point cloud to a binary capture
+    data = pd.read_csv(csvFileName)
+    records = np.empty(len(data), dtype=captureDtype)
+    for name in captureDtype.names:
+        records[name] = data[name].to_numpy()
+
+    writer = CaptureWriter(captureFileName)
+    writer.appendRecords(records)
+    writer.close()
@@ -0,0 +1,288 @@
+import sys
+import math
+from collections import namedtuple
+from tlv import headerLength, tlvHeaderLength, pointDtype, sideInfoDtype
+
+# Typed commands of a mmWave SDK 3.x .cfg file (fields in the order of the CLI arguments, units of the SDK user guide)
+ChannelCfg = namedtuple('ChannelCfg', ['rxChannelEn', 'txChannelEn', 'cascading'])
+AdcCfg = namedtuple('AdcCfg', ['numADCBits', 'adcOutputFmt'])
+ProfileCfg = namedtuple('ProfileCfg', ['profileId', 'startFreq', 'idleTime', 'adcStartTime', 'rampEndTime', 'txOutPower', 'txPhaseShifter',
+                                       'freqSlopeConst', 'txStartTime', 'numAdcSamples', 'digOutSampleRate', 'hpfCornerFreq1', 'hpfCornerFreq2', 'rxGain'])
+FrameCfg = namedtuple('FrameCfg', ['chirpStartIdx', 'chirpEndIdx', 'numLoops', 'numFrames', 'framePeriodicity', 'triggerSelect', 'frameTriggerDelay'])
+GuiMonitor = namedtuple('GuiMonitor', ['subFrameIdx', 'detectedObjects', 'logMagRange', 'noiseProfile', 'rangeAzimuthHeatMap', 'rangeDopplerHeatMap', 'statsInfo'])
+CfarCfg = namedtuple('CfarCfg', ['subFrameIdx', 'procDirection', 'mode', 'noiseWin', 'guardLen', 'divShift', 'cyclicMode', 'thresholdScale', 'peakGrouping'])
+AoaFovCfg = namedtuple('AoaFovCfg', ['subFrameIdx', 'minAzimuthDeg', 'maxAzimuthDeg', 'minElevationDeg', 'maxElevationDeg'])
+CfarFovCfg = namedtuple('CfarFovCfg', ['subFrameIdx', 'procDirection', 'min', 'max'])
+
+# Command name --> (type, converter of each field)
+commandTypes = {
+    'channelCfg': (ChannelCfg, int),
+    'adcCfg': (AdcCfg, int),
+    'profileCfg': (ProfileCfg, float),
+    'frameCfg': (FrameCfg, float),
+    'guiMonitor': (GuiMonitor, int),
+    'cfarCfg': (CfarCfg, float),
+    'aoaFovCfg': (AoaFovCfg, float),
+    'cfarFovCfg': (CfarFovCfg, float),
+}
+
+c = 3e8 # Speed of light (m/s)
+uartBaudrate = 921600 # Standard (data) port
+uartBitsPerByte = 10 # 8N1: start + 8 data + stop bits
+packetAlignment = 32 # The demo pads every packet to a multiple of 32 bytes
+
+def nextPowerOf2(n):
+    return 1 << max(0, math.ceil(math.log2(max(n, 1))))
+
+class ChirpConfig:
+
+    # Parsed .cfg file: typed commands, derived radar parameters and a capacity plan of the data port
+    # Commands that are not parsed are kept as text (commands), so the file can still be sent as is
+
+    def __init__(self, lines):
+
+        self.commands = []
+        self.channelCfg = None
+        self.adcCfg = None
+        self.profileCfg = None
+        self.frameCfg = None
+        self.guiMonitor = None
+        self.cfarCfg = [] # One per processing direction (0 = range, 1 = Doppler)
+        self.aoaFovCfg = None
+        self.cfarFovCfg = []
+
+        for line in lines:
+            if len(line.strip()) == 0 or line[0] == '%':
+                continue
+            self.commands.append(line)
+
+            fields = line.split()
+            if fields[0] not in commandTypes:
+                continue
+            commandType, convert = commandTypes[fields[0]]
+            if len(fields) - 1 != len(commandType._fields):
+                raise ValueError(f"{fields[0]} expects {len(commandType._fields)} arguments, got {len(fields) - 1}: {line.strip()}")
+            command = commandType(*(convert(field) for field in fields[1:]))
+
+            if fields[0] in ['cfarCfg', 'cfarFovCfg']:
+                getattr(self, fields[0]).append(command)
+            else:
+                setattr(self, fields[0], command)
+
+        for name in ['channelCfg', 'adcCfg', 'profileCfg', 'frameCfg', 'guiMonitor']:
+            if getattr(self, name) is None:
+                raise ValueError(f"Configuration without {name}")
+
+    @classmethod
+    def read(cls, configFileName):
+        with open(configFileName, 'r') as fp:
+            return cls(fp.readlines())
+
+    # -------------------------------------------------------------------------
+    # Derived radar parameters
+    # -------------------------------------------------------------------------
+
+    @property
+    def numTx(self): # Chirps per loop (TDM-MIMO: one per transmitter)
+        return int(self.frameCfg.chirpEndIdx - self.frameCfg.chirpStartIdx + 1)
+
+    @property
+    def numRx(self):
+        return bin(self.channelCfg.rxChannelEn).count('1')
+
+    @property
+    def complexAdc(self): # adcOutputFmt: 0 = real, 1 = complex 1x, 2 = complex 2x
+        return self.adcCfg.adcOutputFmt != 0
+
+    @property
+    def sampleRate(self): # Hz
+        return self.profileCfg.digOutSampleRate * 1e3
+
+    @property
+    def slope(self): # Hz/s
+        return self.profileCfg.freqSlopeConst * 1e12
+
+    @property
+    def samplingTime(self): # ADC sampling window (s)
+        return self.profileCfg.numAdcSamples / self.sampleRate
+
+    @property
+    def bandwidth(self): # Swept bandwidth during the ADC sampling window (Hz)
+        return self.slope * self.samplingTime
+
+    @property
+    def centerFrequency(self): # Hz, in the middle of the ADC sampling window
+        return self.profileCfg.startFreq * 1e9 + self.slope * (self.profileCfg.adcStartTime * 1e-6 + self.samplingTime / 2)
+
+    @property
+    def wavelength(self):
+        return c / self.centerFrequency
+
+    @property
+    def chirpTime(self): # Idle + ramp (s)
+        return (self.profileCfg.idleTime + self.profileCfg.rampEndTime) * 1e-6
+
+    @property
+    def rangeResolution(self): # m
+        return c / (2 * self.bandwidth)
+
+    @property
+    def maxRange(self): # m, limited by the IF bandwidth (90% of the usable ADC bandwidth)
+        ifBandwidth = 0.9 * self.sampleRate * (1 if self.complexAdc else 0.5)
+        return ifBandwidth * c / (2 * self.slope)
+
+    @property
+    def maxVelocity(self): # m/s, maximum unambiguous radial velocity
+        return self.wavelength / (4 * self.numTx * self.chirpTime)
+
+    @property
+    def velocityResolution(self): # m/s
+        return self.wavelength / (2 * self.frameCfg.numLoops * self.numTx * self.chirpTime)
+
+    @property
+    def framePeriod(self): # s
+        return self.frameCfg.framePeriodicity * 1e-3
+
+    @property
+    def frameRate(self): # Hz
+        return 1 / self.framePeriod
+
+    @property
+    def activeFrameTime(self): # Time spent chirping in each frame (s)
+        return self.frameCfg.numLoops * self.numTx * self.chirpTime
+
+    @property
+    def numRangeBins(self):
+        return nextPowerOf2(self.profileCfg.numAdcSamples)
+
+    @property
+    def numDopplerBins(self):
+        return nextPowerOf2(self.frameCfg.numLoops)
+
+    # -------------------------------------------------------------------------
+    # Data port capacity
+    # -------------------------------------------------------------------------
+
+    def packetBytes(self, nOfPoints):
+
+        # Bytes of one packet with nOfPoints detected points and the TLVs enabled in guiMonitor
+        gui = self.guiMonitor
+        nOfBytes = headerLength
+        if gui.detectedObjects in [1, 2]:
+            nOfBytes += tlvHeaderLength + pointDtype.itemsize * nOfPoints
+        if gui.detectedObjects == 1:
+            nOfBytes += tlvHeaderLength + sideInfoDtype.itemsize * nOfPoints
+        if gui.logMagRange:
+            nOfBytes += tlvHeaderLength + 2 * self.numRangeBins
+        if gui.noiseProfile:
+            nOfBytes += tlvHeaderLength + 2 * self.numRangeBins
+        if gui.rangeAzimuthHeatMap:
+            nOfBytes += tlvHeaderLength + 4 * self.numRangeBins * self.numTx * self.numRx
+        if gui.rangeDopplerHeatMap:
+            nOfBytes += tlvHeaderLength + 2 * self.numRangeBins * self.numDopplerBins
+        if gui.statsInfo:
+            nOfBytes += tlvHeaderLength + 24
+        return math.ceil(nOfBytes / packetAlignment) * packetAlignment
+
+    @property
+    def uartCapacity(self): # Bytes/s of the standard port
+        return uartBaudrate / uartBitsPerByte
+
+    def bytesPerSecond(self, nOfPoints):
+        return self.packetBytes(nOfPoints) * self.frameRate
+
+    def utilization(self, nOfPoints): # Fraction of the data port used with nOfPoints per frame (> 1: frames are dropped)
+        return self.bytesPerSecond(nOfPoints) / self.uartCapacity
+
+    @property
+    def maxPoints(self): # Points per frame the data port can carry at the frame rate
+        budget = self.uartCapacity * self.framePeriod
+        low, high = 0, int(budget) # Binary search of the largest packet that fits in one frame period
+        while low < high:
+            middle = (low + high + 1) // 2
+            if self.packetBytes(middle) <= budget:
+                low = middle
+            else:
+                high = middle - 1
+        return low if self.packetBytes(low) <= budget else 0
+
+    def bufferSizes(self, queueSeconds=2.0):
+
+        # Reader buffers sized from the worst case the data port can deliver:
+        #   readSize: one frame period of data per read
+        #   maxPacketLength: packets needing more than 4 frame periods of the port cannot come from this configuration
+        #   queueSize: decoded frames kept for queueSeconds when the consumer falls behind
+        bytesPerFrame = self.uartCapacity * self.framePeriod
+        return {
+            'readSize': nextPowerOf2(bytesPerFrame),
+            'maxPacketLength': max(16384, nextPowerOf2(4 * bytesPerFrame)),
+            'queueSize': max(4, math.ceil(queueSeconds * self.frameRate)),
+        }
+
+    # -------------------------------------------------------------------------
+    # Checks
+    # -------------------------------------------------------------------------
+
+    def check(self, expectedPoints=None):
+
+        # Configuration mistakes (list of messages, empty if none)
+        problems = []
+        profile = self.profileCfg
+
+        if profile.adcStartTime * 1e-6 + self.samplingTime > profile.rampEndTime * 1e-6:
+            problems.append(f"ADC sampling ({profile.adcStartTime + self.samplingTime * 1e6:.2f} us) ends after the ramp ({profile.rampEndTime} us)")
+
+        if self.activeFrameTime > self.framePeriod:
+            problems.append(f"Chirps take {self.activeFrameTime * 1e3:.2f} ms, longer than the frame period ({self.framePeriod * 1e3:.2f} ms)")
+
+        if self.numTx != bin(self.channelCfg.txChannelEn).count('1'):
+            problems.append(f"frameCfg uses {self.numTx} chirps per loop but channelCfg enables {bin(self.channelCfg.txChannelEn).count('1')} transmitters")
+
+        for cfarFov in self.cfarFovCfg:
+            # 5% margin: the visualizer rounds the limits it writes
+            if cfarFov.procDirection == 0 and cfarFov.max > 1.05 * self.maxRange:
+                problems.append(f"cfarFovCfg range limit ({cfarFov.max} m) beyond the maximum range ({self.maxRange:.2f} m)")
+            if cfarFov.procDirection == 1 and max(abs(cfarFov.min), abs(cfarFov.max)) > 1.05 * self.maxVelocity:
+                problems.append(f"cfarFovCfg velocity limit ({cfarFov.max} m/s) beyond the maximum velocity ({self.maxVelocity:.2f} m/s)")
+
+        if self.aoaFovCfg is not None:
+            fov = self.aoaFovCfg
+            if not (-90 <= fov.minAzimuthDeg < fov.maxAzimuthDeg <= 90 and -90 <= fov.minElevationDeg < fov.maxElevationDeg <= 90):
+                problems.append(f"Invalid aoaFovCfg: {fov}")
+
+        if self.packetBytes(0) * self.frameRate > self.uartCapacity:
+            problems.append(f"The enabled TLVs alone need {self.packetBytes(0) * self.frameRate:.0f} B/s, the data port carries {self.uartCapacity:.0f} B/s")
+        elif expectedPoints is not None and self.utilization(expectedPoints) > 1:
+            problems.append(f"{expectedPoints} points/frame need {self.bytesPerSecond(expectedPoints):.0f} B/s, the data port carries "
+                            f"{self.uartCapacity:.0f} B/s (at most {self.maxPoints} points/frame): frames will be dropped")
+
+        return problems
+
+    def summary(self, expectedPoints=None):
+
+        lines = [f"Range resolution: {self.rangeResolution:.3f} m | Max range: {self.maxRange:.2f} m",
+                 f"Velocity resolution: {self.velocityResolution:.3f} m/s | Max velocity: {self.maxVelocity:.2f} m/s",
+                 f"Frame period: {self.framePeriod * 1e3:.1f} ms (chirping {self.activeFrameTime * 1e3:.2f} ms)",
+                 f"Data port: {self.uartCapacity:.0f} B/s, at most {self.maxPoints} points/frame"]
+        if expectedPoints is not None:
+            lines.append(f"{expectedPoints} points/frame: {self.bytesPerSecond(expectedPoints):.0f} B/s ({100 * self.utilization(expectedPoints):.1f}% of the data port)")
+        lines += ["WARNING: " + problem for problem in self.check(expectedPoints)]
+        return "\n".join(lines)
+
+if __name__ == '__main__':
+
+    # Check configuration files before deployment: python chirp_config.py file.cfg [file.cfg ...] [--points N]
+    arguments = sys.argv[1:] or ['chirp_default.cfg']
+    expectedPoints = None
+    if '--points' in arguments:
+        position = arguments.index('--points')
+        expectedPoints = int(arguments[position + 1])
+        del arguments[position:position + 2]
+
+    failed = False
+    for configFileName in arguments:
+        config = ChirpConfig.read(configFileName)
+        print(f"{configFileName}\n{config.summary(expectedPoints)}\n")
+        failed |= len(config.check(expectedPoints)) > 0
+
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,108 @@
+import time
+import numpy as np
+from spatial_index import VoxelGrid
+
+# One detection per cluster: SNR-weighted centroid, extent (max - min per axis), number of points, mean SNR and mean v
+detectionDtype = np.dtype([('x', '<f4'), ('y', '<f4'), ('z', '<f4'),
+                           ('dx', '<f4'), ('dy', '<f4'), ('dz', '<f4'),
+                           ('points', '<u4'), ('snr', '<f4'), ('v', '<f4')])
+
+class PointClusterer:
+
+    # DBSCAN-style clustering of one decoded frame (tlv.frameDtype or any array with x, y, z, v and snr)
+    # Neighbors are found with a voxel grid of cell size eps, and each neighbor counts with its SNR weight
+    # (snr / snrReference, capped at maxWeight) so a few strong returns can form a cluster while weak clutter cannot
+    # Frames with more than maxPoints points are reduced to the strongest maxPoints, which bounds the latency
+
+    def __init__(self, eps=0.3, minPoints=4, snrReference=None, maxWeight=3.0, maxPoints=2000):
+
+        self.eps = eps # Neighborhood radius (m)
+        self.minPoints = minPoints # Weighted neighbors needed for a core point (the point itself included)
+        self.snrReference = snrReference # SNR with weight 1 (None: every point has weight 1)
+        self.maxWeight = maxWeight
+        self.maxPoints = maxPoints
+
+        self.lastLatency = 0.0 # Seconds spent in the last call to cluster
+
+    def cluster(self, frame):
+
+        start = time.perf_counter()
+
+        points = np.column_stack((frame['x'], frame['y'], frame['z'])).astype(np.float64)
+        snr = np.asarray(frame['snr'], dtype=np.float64)
+        v = np.asarray(frame['v'], dtype=np.float64)
+
+        labels = np.full(len(points), -1, dtype=np.int64)
+        selected = np.arange(len(points))
+        if len(points) > self.maxPoints:
+            selected = np.sort(np.argpartition(-snr, self.maxPoints)[:self.maxPoints])
+            points, snr, v = points[selected], snr[selected], v[selected]
+
+        nOfPoints = len(points)
+        if nOfPoints == 0:
+            self.lastLatency = time.perf_counter() - start
+            return np.zeros(0, dtype=detectionDtype), labels
+
+        if self.snrReference is None:
+            weights = np.ones(nOfPoints)
+        else:
+            weights = np.minimum(snr / self.snrReference, self.maxWeight)
+
+        # Neighbor pairs (i, j) within eps, each point is its own neighbor
+        grid = VoxelGrid(points, self.eps)
+        pairI, pairJ = grid.radiusQuery(points, self.eps)
+
+        core = np.bincount(pairI, weights=weights[pairJ], minlength=nOfPoints) >= self.minPoints
+
+        # Connected components of the core points: minimum label propagation with pointer jumping
+        coreI, coreJ = pairI[core[pairI] & core[pairJ]], pairJ[core[pairI] & core[pairJ]]
+        component = np.arange(nOfPoints)
+        while True:
+            updated = component.copy()
+            np.minimum.at(updated, coreI, component[coreJ])
+            updated = updated[updated]
+            if np.array_equal(updated, component):
+                break
+            component = updated
+
+        # Border points join the cluster of a core neighbor, the rest is noise
+        clusterOf = np.full(nOfPoints, -1, dtype=np.int64)
+        clusterOf[core] = component[core]
+        border = ~core[pairI] & core[pairJ]
+        np.maximum.at(clusterOf, pairI[border], component[pairJ[border]])
+
+        # Consecutive cluster numbers
+        clustered = clusterOf >= 0
+        clusterIds, clusterIndex = np.unique(clusterOf[clustered], return_inverse=True)
+        frameLabels = np.full(nOfPoints, -1, dtype=np.int64)
+        frameLabels[clustered] = clusterIndex
+        labels[selected] = frameLabels
+
+        detections = self.describe(points[clustered], snr[clustered], v[clustered], weights[clustered], clusterIndex, len(clusterIds))
+
+        self.lastLatency = time.perf_counter() - start
+        return detections, labels
+
+    def describe(self, points, snr, v, weights, clusterIndex, nOfClusters):
+
+        detections = np.zeros(nOfClusters, dtype=detectionDtype)
+        if nOfClusters == 0:
+            return detections
+
+        counts = np.bincount(clusterIndex, minlength=nOfClusters)
+        weightSum = np.bincount(clusterIndex, weights=weights, minlength=nOfClusters)
+
+        for axis, name in enumerate(['x', 'y', 'z']):
+            detections[name] = np.bincount(clusterIndex, weights=points[:, axis] * weights, minlength=nOfClusters) / weightSum
+
+            low = np.full(nOfClusters, np.inf)
+            high = np.full(nOfClusters, -np.inf)
+            np.minimum.at(low, clusterIndex, points[:, axis])
+            np.maximum.at(high, clusterIndex, points[:, axis])
+            detections['d' + name] = high - low
+
+        detections['points'] = counts
+        detections['snr'] = np.bincount(clusterIndex, weights=snr, minlength=nOfClusters) / counts
+        detections['v'] = np.bincount(clusterIndex, weights=v, minlength=nOfClusters) / counts
+
+        return detections
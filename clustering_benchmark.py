@@ -0,0 +1,39 @@
+import time
+import numpy as np
+from tlv import frameDtype
+from radar_sim import TlvGenerator
+from clustering import PointClusterer
+
+# Per-frame latency of the clustering stage with synthetic frames (targets + clutter, see radar_sim.py)
+# At 10 Hz the whole chain (read, decode, store, cluster) has 100 ms per frame, clustering should stay well below it
+
+pointCounts = [100, 500, 1000, 2000, 5000] # Points per frame
+nOfFrames = 100 # Frames per measurement
+frameRate = 10 # Hz
+targets = [[0, 3, 0, 0.5, 0, 0], [-1, 6, 0.5, 0, -1, 0], [2, 8, -0.5, -0.5, 0, 0]] # x, y, z, vx, vy, vz
+
+print("Points/frame | clusters | median (ms) | p99 (ms) | max (ms) | frame budget used")
+
+for nOfPoints in pointCounts:
+
+    generator = TlvGenerator(nOfPoints = nOfPoints, frameRate = frameRate, targets = targets, seed = 1)
+    clusterer = PointClusterer(eps = 0.3, minPoints = 4, snrReference = 150)
+
+    latencies = np.empty(nOfFrames)
+    clusters = np.empty(nOfFrames)
+    for i in range(nOfFrames):
+
+        points, sideInfo = generator.framePoints()
+        frame = np.zeros(nOfPoints, dtype=frameDtype)
+        for name in ['x', 'y', 'z', 'v']:
+            frame[name] = points[name]
+        frame['snr'] = sideInfo['snr']
+        frame['noise'] = sideInfo['noise']
+
+        start = time.perf_counter()
+        detections, labels = clusterer.cluster(frame)
+        latencies[i] = time.perf_counter() - start
+        clusters[i] = len(detections)
+
+    median, p99, worst = np.percentile(latencies, 50) * 1e3, np.percentile(latencies, 99) * 1e3, latencies.max() * 1e3
+    print(f"{nOfPoints:12d} | {clusters.mean():8.1f} | {median:11.2f} | {p99:8.2f} | {worst:8.2f} | {100 * worst * frameRate / 1e3:16.1f}%")
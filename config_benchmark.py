@@ -0,0 +1,41 @@
+import time
+from urad import *
+from radar_sim import FakeCliPort
+
+# Radar startup time: fixed 20 ms sleep per command + byte-by-byte reads (previous writeCommands)
+# vs waiting for each command's Done/Error reply (config_sender.py), with a simulated CLI port
+# sensorStop/sensorStart reply later than the rest, as on the IWR6843
+
+configFileName = 'chirp_default.cfg'
+replyDelay = 0.002 # Seconds until a command is answered
+
+def writeCommandsFixedSleep(port, commands):
+
+    # Previous implementation: replies that take longer than 20 ms end up in the output of the next command
+    mixed = 0
+    for command in commands:
+        port.write(bytearray(command.encode()))
+        sleep(0.02)
+        response = bytearray([])
+        while(port.in_waiting > 0):
+            response += port.read(1)
+        if not response.decode().startswith(command.strip()):
+            mixed += 1
+    return mixed
+
+radar = Radar(None, None, 'CONFIG', configFileName, None, 0)
+radar.readConfigFile()
+
+port = FakeCliPort(replyDelay)
+start = time.perf_counter()
+mixed = writeCommandsFixedSleep(port, radar.commands)
+print(f"Fixed sleep: {time.perf_counter() - start:.3f} s, {mixed} of {radar.counter} replies mixed with another command")
+
+radar.enhancedPort = FakeCliPort(replyDelay)
+radar.standardPort = None
+radar.writeCommands()
+slowest = max(radar.configResults, key=lambda result: result.elapsed)
+print(f"Done/Error handshake: {radar.configTime:.3f} s (slowest: {slowest.command} {slowest.elapsed * 1e3:.1f} ms)")
+
+radar.enhancedPort = FakeCliPort(replyDelay, failCommands=('lowPower',))
+radar.writeCommands()
@@ -0,0 +1,126 @@
+import json
+import time
+import hashlib
+from collections import namedtuple
+
+# Replies of the mmWave demo CLI: the command is echoed, followed by "Done" or an error message and the prompt
+prompt = b'mmwDemo:/>'
+doneMarker = b'Done'
+errorMarkers = (b'Error', b'not recognized', b'Invalid')
+
+# Result of one command
+CommandResult = namedtuple('CommandResult', ['command', 'ok', 'response', 'elapsed'])
+
+# Hash of the last configuration applied on each port, to skip resending it (see ConfigSender.sendConfig)
+configStateFileName = '.radar_config'
+
+def configHash(commands):
+    # Content of the configuration, ignoring spacing and line endings
+    normalized = "\n".join(" ".join(command.split()) for command in commands if command.strip())
+    return hashlib.sha1(normalized.encode()).hexdigest()
+
+class ConfigSender:
+
+    # Writes a configuration to the enhanced (CLI) port, one command at a time:
+    # each command waits for its own reply (Done / Error + prompt) with a timeout, instead of a fixed sleep,
+    # so late replies are never mixed into the next command and fast replies do not wait for nothing
+    # Replies are read in blocks (everything in the input buffer at once)
+
+    def __init__(self, port, timeout=1.0, stateFileName=configStateFileName):
+
+        self.port = port
+        self.timeout = timeout # Seconds to wait for the reply of one command
+        self.stateFileName = stateFileName
+
+    def readReply(self, timeout):
+
+        # Bytes until the reply is complete (status marker followed by the prompt) or the timeout expires
+        response = bytearray()
+        deadline = time.perf_counter() + timeout
+        while time.perf_counter() < deadline:
+            data = self.port.read(max(self.port.in_waiting, 1))
+            if data:
+                response += data
+                status = max(response.rfind(doneMarker), max(response.rfind(marker) for marker in errorMarkers))
+                if status >= 0 and response.find(prompt, status) >= 0:
+                    break
+        return bytes(response)
+
+    def readPending(self):
+
+        # Whatever is already in the input buffer (boot banner, prompt)
+        response = bytearray()
+        while self.port.in_waiting > 0:
+            response += self.port.read(self.port.in_waiting)
+        return bytes(response)
+
+    def sendCommand(self, command):
+
+        start = time.perf_counter()
+        self.port.write((command.strip() + '\n').encode())
+        response = self.readReply(self.timeout)
+
+        ok = doneMarker in response and not any(marker in response for marker in errorMarkers)
+        return CommandResult(command.strip(), ok, response.decode(errors='replace'), time.perf_counter() - start)
+
+    def sendConfig(self, commands, stopOnError=True):
+
+        # Send every command, returns the list of CommandResult (shorter if stopOnError and a command failed)
+        commands = [command for command in commands if command.strip()]
+        self.readPending()
+
+        results = []
+        for command in commands:
+            result = self.sendCommand(command)
+            results.append(result)
+            if not result.ok and stopOnError:
+                break
+
+        if all(result.ok for result in results) and len(results) == len(commands):
+            self.saveState(configHash(commands))
+        else:
+            self.saveState(None) # The device is in an unknown state now
+
+        return results
+
+    def stateKey(self):
+        return str(getattr(self.port, 'port', None) or getattr(self.port, 'name', 'radar'))
+
+    def readState(self):
+        try:
+            with open(self.stateFileName, 'r') as fp:
+                return json.load(fp)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def saveState(self, hashValue):
+
+        if self.stateFileName is None:
+            return
+        state = self.readState()
+        state[self.stateKey()] = hashValue
+        with open(self.stateFileName, 'w') as fp:
+            json.dump(state, fp)
+
+    def isApplied(self, commands, dataPort=None, wait=0.3):
+
+        # Same configuration hash as the last successful sendConfig on this port, and (if a data port is given)
+        # the sensor is still streaming: otherwise the device was reset and must be configured again
+        if self.stateFileName is None or self.readState().get(self.stateKey()) != configHash(commands):
+            return False
+        if dataPort is None:
+            return True
+
+        deadline = time.perf_counter() + wait
+        while time.perf_counter() < deadline:
+            if dataPort.in_waiting > 0:
+                return True
+            time.sleep(0.01)
+        return False
+
+def printResults(results, elapsed):
+
+    failed = [result for result in results if not result.ok]
+    for result in failed:
+        print(f"Command failed: {result.command}\n{result.response}")
+    print(f"Configuration: {len(results)} commands in {elapsed:.2f} s ({len(failed)} failed)")
@@ -0,0 +1,155 @@
+import os
+import sys
+import queue
+import pickle
+import shutil
+import tempfile
+import threading
+import subprocess
+import numpy as np
+import pandas as pd
+from capture import Capture, captureExtension
+
+# Frame images (.png) rendered by worker processes, away from the acquisition loop
+# Each worker is a new interpreter running this file with --worker (the acquisition script is not imported again),
+# it keeps one figure and receives jobs (file name, title, x, y, z) pickled through its standard input
+
+limits = ((-5, 5), (5, -5), (-5, 5)) # Same axes as Radar.plotData
+
+def runWorker(jobStream):
+
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    fig = plt.figure()
+    ax = fig.add_subplot(111, projection='3d')
+    ax.set(xlabel='X [m]')
+    ax.set(ylabel='Y [m]')
+    ax.set(zlabel='Z [m]')
+    ax.set_xlim(limits[0])
+    ax.set_ylim(limits[1])
+    ax.set_zlim(limits[2])
+    scatter = ax.scatter([], [], [])
+
+    while True:
+        try:
+            fileName, title, points = pickle.load(jobStream)
+        except EOFError:
+            break
+        scatter._offsets3d = (points[0], points[1], points[2])
+        ax.set_title(title)
+        fig.savefig(fileName)
+
+class FrameExporter:
+
+    # Frames are copied into a bounded queue and rendered by a pool of worker processes
+    # submit() never waits during acquisition: if the workers fall behind and the queue is full the frame is skipped
+    # (it is still in the point cloud store/capture and can be rendered after the run with renderCapture)
+
+    def __init__(self, testName='', fileNamePattern='cycle_{cycle}_test_{test}.png', workers=2, queueSize=16):
+
+        self.testName = testName
+        self.fileNamePattern = fileNamePattern
+        self.jobs = queue.Queue(queueSize)
+
+        self.workers = [subprocess.Popen([sys.executable, os.path.abspath(__file__), '--worker'], stdin=subprocess.PIPE) for i in range(workers)]
+        self.feeders = [threading.Thread(target=self.feed, args=(worker,), daemon=True) for worker in self.workers]
+        for feeder in self.feeders:
+            feeder.start()
+
+        # Statistics
+        self.fileNames = [] # Images queued for rendering, in cycle order
+        self.framesDropped = 0
+
+    def feed(self, worker):
+
+        # One thread per worker: jobs go to whichever worker is free first
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                break
+            pickle.dump(job, worker.stdin, protocol=pickle.HIGHEST_PROTOCOL)
+            worker.stdin.flush()
+        worker.stdin.close()
+
+    def submit(self, cycleCounter, frame, block=False):
+
+        fileName = self.fileNamePattern.format(cycle=cycleCounter, test=self.testName)
+        title = f"Cycle {cycleCounter} | Detected objects: {len(frame)}"
+        points = np.vstack((frame['x'], frame['y'], frame['z'])).astype(np.float32)
+
+        try:
+            self.jobs.put((fileName, title, points), block=block)
+        except queue.Full:
+            self.framesDropped += 1
+            return False
+
+        self.fileNames.append(fileName)
+        return True
+
+    def close(self):
+
+        # Wait until every queued frame is rendered
+        for feeder in self.feeders:
+            self.jobs.put(None)
+        for feeder in self.feeders:
+            feeder.join()
+        for worker in self.workers:
+            worker.wait()
+
+def writeVideo(fileNames, videoFileName, fps=10):
+
+    # Join rendered images into one video with ffmpeg (concat list, so any file names work)
+    ffmpeg = shutil.which('ffmpeg')
+    if ffmpeg is None:
+        raise RuntimeError("ffmpeg was not found, the frames are kept as .png images")
+
+    fd, listFileName = tempfile.mkstemp(suffix='.txt', text=True)
+    with os.fdopen(fd, 'w') as fp:
+        for fileName in fileNames:
+            fp.write(f"file '{os.path.abspath(fileName)}'\nduration {1 / fps}\n")
+
+    try:
+        subprocess.run([ffmpeg, '-y', '-loglevel', 'error', '-f', 'concat', '-safe', '0', '-i', listFileName,
+                        '-vf', 'fps=' + str(fps), '-pix_fmt', 'yuv420p', videoFileName], check=True)
+    finally:
+        os.remove(listFileName)
+
+def captureCycles(captureFileName):
+
+    # (cycle, records) of a binary capture (.npc) or a .csv point cloud
+    if captureFileName.endswith(captureExtension):
+        yield from Capture(captureFileName)
+    else:
+        data = pd.read_csv(captureFileName)
+        for cycle, records in data.groupby('cycle', sort=False):
+            yield cycle, records
+
+def renderCapture(captureFileName, testName, fileNamePattern='cycle_{cycle}_test_{test}.png', workers=None):
+
+    # Post-run rendering of every cycle of a saved point cloud, in parallel on all the cores
+    exporter = FrameExporter(testName, fileNamePattern, workers or os.cpu_count(), queueSize=64)
+    for cycle, records in captureCycles(captureFileName):
+        exporter.submit(cycle, records, block=True)
+    exporter.close()
+
+    return exporter.fileNames
+
+if __name__ == '__main__':
+
+    if '--worker' in sys.argv:
+        runWorker(sys.stdin.buffer)
+        sys.exit()
+
+    captureFileName = 'SURROUND_RFL_1.5m.npc' # .npc or .csv point cloud
+    testName = 'SURROUND_RFL_1.5m'
+    videoFileName = None # e.g. 'SURROUND_RFL_1.5m.mp4' (needs ffmpeg), None to keep only the .png images
+    fps = 10
+    workers = None # Number of processes (None = number of cores)
+
+    fileNames = renderCapture(captureFileName, testName, workers=workers)
+    print(f"{len(fileNames)} frames rendered")
+
+    if videoFileName is not None:
+        writeVideo(fileNames, videoFileName, fps)
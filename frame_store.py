@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+from tlv import frameDtype
+
+# Columns of the accumulated point cloud (same order as the saved .csv files)
+storeDtype = np.dtype([('cycle', '<u4')] + [(name, frameDtype.fields[name][0]) for name in frameDtype.names])
+
+class FrameStore:
+
+    def __init__(self, chunkSize=65536):
+
+        # Points are kept in typed NumPy chunks, a new chunk is allocated only when the current one is full
+        # Appending a frame copies only that frame, so the cost per cycle does not grow with the run length
+        self.chunkSize = chunkSize
+        self.chunks = []
+        self.current = np.empty(chunkSize, dtype=storeDtype)
+        self.fill = 0
+
+        # Cycle --> (chunk index, start, end), a cycle never spans two chunks
+        self.cycleOffsets = {}
+
+    def __len__(self):
+        return sum(len(chunk) for chunk in self.chunks) + self.fill
+
+    def append(self, cycleCounter, frame):
+
+        nOfObjects = len(frame)
+
+        # Seal the current chunk if the frame does not fit in the remaining space
+        if self.fill + nOfObjects > len(self.current):
+            if self.fill > 0:
+                self.chunks.append(self.current[:self.fill])
+            self.current = np.empty(max(self.chunkSize, nOfObjects), dtype=storeDtype)
+            self.fill = 0
+
+        start = self.fill
+        end = start + nOfObjects
+        block = self.current[start:end]
+        block['cycle'] = cycleCounter
+        for name in frameDtype.names:
+            block[name] = frame[name]
+
+        self.fill = end
+        self.cycleOffsets[cycleCounter] = (len(self.chunks), start, end)
+
+    def getCycle(self, cycleCounter):
+
+        # Points of one cycle as a view into its chunk (no copy)
+        if cycleCounter not in self.cycleOffsets:
+            return self.current[:0]
+
+        chunkIndex, start, end = self.cycleOffsets[cycleCounter]
+        chunk = self.chunks[chunkIndex] if chunkIndex < len(self.chunks) else self.current
+        return chunk[start:end]
+
+    def toArray(self):
+        return np.concatenate(self.chunks + [self.current[:self.fill]])
+
+    def toDataFrame(self):
+
+        # Build the DataFrame only when requested (e.g. when saving the data)
+        data = self.toArray()
+        return pd.DataFrame({name: data[name] for name in storeDtype.names})
@@ -0,0 +1,131 @@
+import numpy as np
+from collections import namedtuple
+
+# Radar points (sensor frame) to local ENU (east, north, up) and WGS-84 coordinates:
+#   radar frame --mounting--> IMU/magnetometer frame --attitude + heading--> ENU at the GPS antenna --offset--> ENU at the origin
+# The rotations are combined into one matrix per frame, so a frame costs one (n, 3) x (3, 3) product plus the geodetic conversion
+
+# WGS-84 ellipsoid
+semiMajorAxis = 6378137.0
+flattening = 1 / 298.257223563
+semiMinorAxis = semiMajorAxis * (1 - flattening)
+eccentricity2 = flattening * (2 - flattening)
+secondEccentricity2 = eccentricity2 / (1 - eccentricity2)
+
+# Platform pose when a frame is taken:
+#   yaw: heading of the sensor x axis (º clockwise from north, as given by HMC5883L), pitch/roll: as given by MPU6050 (º)
+#   latitude, longitude (º), altitude (m): GPS antenna
+Pose = namedtuple('Pose', ['yaw', 'pitch', 'roll', 'latitude', 'longitude', 'altitude'])
+
+# One row per point
+geoDtype = np.dtype([('east', '<f8'), ('north', '<f8'), ('up', '<f8'), # m from the origin of the tangent plane
+                     ('latitude', '<f8'), ('longitude', '<f8'), ('altitude', '<f4')])
+
+def rotationX(angle):
+    c, s = np.cos(np.radians(angle)), np.sin(np.radians(angle))
+    return np.array([[1, 0, 0], [0, c, -s], [0, s, c]])
+
+def rotationY(angle):
+    c, s = np.cos(np.radians(angle)), np.sin(np.radians(angle))
+    return np.array([[c, 0, s], [0, 1, 0], [-s, 0, c]])
+
+def rotationZ(angle):
+    c, s = np.cos(np.radians(angle)), np.sin(np.radians(angle))
+    return np.array([[c, -s, 0], [s, c, 0], [0, 0, 1]])
+
+def attitudeMatrix(yaw, pitch, roll):
+
+    # Sensor frame to ENU. Pitch (about x) and roll (about y) level the sensor as in HMC5883L.tiltCompensatedHeading,
+    # then the level x axis is turned to its heading (clockwise from north, i.e. 90º - yaw counterclockwise from east)
+    return rotationZ(90 - yaw) @ rotationX(pitch) @ rotationY(roll)
+
+def mountingMatrix(mounting):
+    # Radar frame to sensor frame: a 3x3 matrix, or the radar's (yaw, pitch, roll) relative to the sensor axes (º, counterclockwise)
+    mounting = np.asarray(mounting, dtype=np.float64)
+    if mounting.shape == (3, 3):
+        return mounting
+    yaw, pitch, roll = mounting
+    return rotationZ(yaw) @ rotationX(pitch) @ rotationY(roll)
+
+def geodeticToEcef(latitude, longitude, altitude):
+
+    latitude = np.radians(latitude)
+    longitude = np.radians(longitude)
+    n = semiMajorAxis / np.sqrt(1 - eccentricity2 * np.sin(latitude)**2) # Prime vertical radius
+    return np.stack([(n + altitude) * np.cos(latitude) * np.cos(longitude),
+                     (n + altitude) * np.cos(latitude) * np.sin(longitude),
+                     (n * (1 - eccentricity2) + altitude) * np.sin(latitude)], axis=-1)
+
+def ecefToGeodetic(ecef):
+
+    # Bowring's closed form (sub-millimetre near the surface), ecef (n, 3) -> latitude, longitude (º), altitude (m)
+    x, y, z = np.moveaxis(np.asarray(ecef, dtype=np.float64), -1, 0)
+    p = np.hypot(x, y)
+    theta = np.arctan2(z * semiMajorAxis, p * semiMinorAxis)
+    latitude = np.arctan2(z + secondEccentricity2 * semiMinorAxis * np.sin(theta)**3,
+                          p - eccentricity2 * semiMajorAxis * np.cos(theta)**3)
+    longitude = np.arctan2(y, x)
+    sinLat = np.sin(latitude)
+    altitude = p * np.cos(latitude) + z * sinLat - semiMajorAxis * np.sqrt(1 - eccentricity2 * sinLat**2)
+    return np.degrees(latitude), np.degrees(longitude), altitude
+
+class LocalTangentPlane:
+
+    # ENU frame tangent to the ellipsoid at an origin, origin and ECEF rotation computed once
+
+    def __init__(self, latitude, longitude, altitude=0.0):
+
+        self.origin = (latitude, longitude, altitude)
+        self.originEcef = geodeticToEcef(latitude, longitude, altitude)
+
+        sinLat, cosLat = np.sin(np.radians(latitude)), np.cos(np.radians(latitude))
+        sinLon, cosLon = np.sin(np.radians(longitude)), np.cos(np.radians(longitude))
+        self.rotation = np.array([[-sinLon, cosLon, 0], # ECEF to ENU
+                                  [-sinLat * cosLon, -sinLat * sinLon, cosLat],
+                                  [cosLat * cosLon, cosLat * sinLon, sinLat]])
+
+    def toEnu(self, latitude, longitude, altitude):
+        return (geodeticToEcef(latitude, longitude, altitude) - self.originEcef) @ self.rotation.T
+
+    def toGeodetic(self, enu):
+        return ecefToGeodetic(np.asarray(enu) @ self.rotation + self.originEcef)
+
+class Georeferencer:
+
+    # mounting: radar frame to sensor frame (see mountingMatrix), leverArm: position of the radar relative to the GPS antenna
+    # in the sensor frame (m), declination: magnetic declination (º, east positive) added to the magnetometer heading,
+    # origin: (latitude, longitude, altitude) of the tangent plane, the first pose if None
+
+    def __init__(self, mounting=(0.0, 0.0, 0.0), leverArm=(0.0, 0.0, 0.0), declination=0.0, origin=None):
+
+        self.mounting = mountingMatrix(mounting)
+        self.leverArm = np.asarray(leverArm, dtype=np.float64)
+        self.declination = declination
+        self.plane = LocalTangentPlane(*origin) if origin is not None else None
+
+    def transform(self, pose):
+
+        # Rotation (3, 3) and translation (3,) from the radar frame to ENU for one pose
+        if self.plane is None:
+            self.plane = LocalTangentPlane(pose.latitude, pose.longitude, pose.altitude)
+
+        attitude = attitudeMatrix(pose.yaw + self.declination, pose.pitch, pose.roll)
+        antenna = self.plane.toEnu(pose.latitude, pose.longitude, pose.altitude)
+        return attitude @ self.mounting, attitude @ self.leverArm + antenna
+
+    def toEnu(self, points, pose):
+        rotation, translation = self.transform(pose)
+        return np.asarray(points, dtype=np.float64).reshape(-1, 3) @ rotation.T + translation
+
+    def georeference(self, points, pose):
+
+        # Points (n, 3) in the radar frame to geoDtype rows
+        enu = self.toEnu(points, pose)
+        latitude, longitude, altitude = self.plane.toGeodetic(enu)
+
+        rows = np.zeros(len(enu), dtype=geoDtype)
+        rows['east'], rows['north'], rows['up'] = enu.T
+        rows['latitude'] = latitude
+        rows['longitude'] = longitude
+        rows['altitude'] = altitude
+        return rows
@@ -0,0 +1,78 @@
+import time
+import numpy as np
+from georeference import Georeferencer, LocalTangentPlane, Pose, attitudeMatrix, mountingMatrix
+from radar_sim import TlvGenerator, FakeSerialPort
+import matplotlib
+matplotlib.use('Agg')
+from urad import Radar
+
+# Georeferencing of radar frames (georeference.py):
+#   - Accuracy: known targets placed around a tilted platform, converted to the radar frame and back to WGS-84
+#   - Cost per frame: point by point (rotation and geodetic conversion per point) vs the whole frame at once
+#   - urad.Radar frame rate with and without georeferencing (synthetic traffic, fixed pose)
+
+pointCounts = [100, 1000, 5000]
+nOfFrames = 200
+pose = Pose(yaw=123.0, pitch=8.0, roll=-5.0, latitude=40.4168, longitude=-3.7038, altitude=667.0)
+options = dict(mounting=(90.0, 10.0, 0.0), leverArm=(0.1, -0.2, 0.3), declination=1.2)
+
+def radarFrame(georeferencer, latitude, longitude, altitude, pose):
+
+    # Inverse transform: WGS-84 targets to the radar frame for the given pose
+    rotation, translation = georeferencer.transform(pose)
+    return (georeferencer.plane.toEnu(latitude, longitude, altitude) - translation) @ rotation
+
+def georeferencePointByPoint(georeferencer, points, pose):
+
+    rows = []
+    for point in points:
+        attitude = attitudeMatrix(pose.yaw + georeferencer.declination, pose.pitch, pose.roll)
+        rotation = attitude @ mountingMatrix(options['mounting'])
+        antenna = georeferencer.plane.toEnu(pose.latitude, pose.longitude, pose.altitude)
+        enu = rotation @ point + attitude @ georeferencer.leverArm + antenna
+        rows.append((*enu, *georeferencer.plane.toGeodetic(enu)))
+    return rows
+
+# Accuracy
+rng = np.random.default_rng(0)
+georeferencer = Georeferencer(origin=(pose.latitude - 0.01, pose.longitude + 0.01, 600.0), **options)
+plane = LocalTangentPlane(pose.latitude, pose.longitude, pose.altitude)
+latitude, longitude, altitude = plane.toGeodetic(rng.uniform([-500, -500, 0], [500, 500, 200], (1000, 3)))
+rows = georeferencer.georeference(radarFrame(georeferencer, latitude, longitude, altitude, pose), pose)
+error = georeferencer.plane.toEnu(rows['latitude'], rows['longitude'], rows['altitude']) - georeferencer.plane.toEnu(latitude, longitude, altitude)
+print(f"Accuracy (1000 targets up to 700 m away, origin 1.4 km away): max error {np.abs(error).max() * 1e3:.3f} mm")
+
+# Cost per frame
+print("Points/frame | point by point (ms) | whole frame (ms)")
+for nOfPoints in pointCounts:
+    points = rng.uniform([-5, 0, -2], [5, 10, 2], (nOfPoints, 3))
+
+    start = time.perf_counter()
+    georeferencePointByPoint(georeferencer, points[:100], pose)
+    pointTime = (time.perf_counter() - start) / 100 * nOfPoints
+
+    start = time.perf_counter()
+    for i in range(20):
+        georeferencer.georeference(points, pose)
+    frameTime = (time.perf_counter() - start) / 20
+
+    print(f"{nOfPoints:12d} | {pointTime * 1e3:19.1f} | {frameTime * 1e3:16.3f}")
+
+# urad.Radar frame rate
+print("Points/frame | frames/s | frames/s georeferenced")
+for nOfPoints in pointCounts:
+    rates = []
+    for georeference in [False, True]:
+        radar = Radar(None, None, 'SIM', None, None, nOfFrames)
+        radar.enhancedPort = None
+        radar.standardPort = FakeSerialPort(TlvGenerator(nOfPoints = nOfPoints, seed = 1), realTime = False)
+        if georeference:
+            radar.enableGeoreferencing(lambda at: pose, **options)
+
+        start = time.perf_counter()
+        for cycleCounter in range(1, nOfFrames+1):
+            if radar.unpackData():
+                radar.extractData(cycleCounter)
+        rates.append(nOfFrames / (time.perf_counter() - start))
+
+    print(f"{nOfPoints:12d} | {rates[0]:8.1f} | {rates[1]:22.1f}")
@@ -0,0 +1,94 @@
+import time
+import numpy as np
+import pandas as pd
+from nmea import NmeaParser, fixDtype, sentence
+from ring_buffer import RingBuffer
+
+# GPS parsing cost per fix on a synthetic NMEA stream (RMC + VTG + GGA per epoch, GP and GN talkers,
+# epochs without fix with empty fields and sentences with corrupted checksums):
+#   - Previous: readline + str split + parseGPGGA + one-row DataFrame per fix (GPS.getPosition)
+#   - Now: bulk reads fed to nmea.NmeaParser, fixes appended to a ring buffer
+
+nOfEpochs = 20000
+noFixProbability = 0.05
+corruptProbability = 0.01
+chunkSize = 1024 # Bytes per read
+
+def makeStream(rng):
+
+    sentences = []
+    latitude, longitude = 40.4168, -3.7038
+    for epoch in range(nOfEpochs):
+        talker = b'GN' if epoch % 2 else b'GP'
+        utc = b'%02d%02d%05.2f' % (epoch // 3600 % 24, epoch // 60 % 60, epoch % 60)
+        latitude += rng.normal(0, 1e-6)
+        longitude += rng.normal(0, 1e-6)
+
+        if rng.random() < noFixProbability:
+            epochSentences = [talker + b'RMC,' + utc + b',V,,,,,,,,,,N', talker + b'VTG,,,,,,,,,N',
+                              talker + b'GGA,' + utc + b',,,,,0,00,99.99,,,,,,']
+        else:
+            lat = b'%02d%07.4f,%s' % (int(abs(latitude)), abs(latitude) % 1 * 60, b'N' if latitude >= 0 else b'S')
+            lon = b'%03d%07.4f,%s' % (int(abs(longitude)), abs(longitude) % 1 * 60, b'E' if longitude >= 0 else b'W')
+            epochSentences = [talker + b'RMC,' + utc + b',A,' + lat + b',' + lon + b',0.5,90.0,180925,,,A',
+                              talker + b'VTG,90.0,T,,M,0.5,N,0.9,K,A',
+                              talker + b'GGA,' + utc + b',' + lat + b',' + lon + b',1,08,1.01,667.0,M,51.0,M,,']
+
+        for body in epochSentences:
+            data = sentence(body)
+            if rng.random() < corruptProbability:
+                data = data[:10] + b'X' + data[11:]
+            sentences.append(data)
+
+    return b''.join(sentences)
+
+def parseGPGGA(sentence):
+
+    # Previous GPS.parseGPGGA
+    parts = sentence.split(',')
+    if parts[0] != '$GPGGA' or len(parts) < 15:
+        return None
+    degrees = int(parts[2][:2])
+    minutes = float(parts[2][2:])
+    latitude = degrees + minutes/60
+    if parts[3] == 'S':
+        latitude *= -1
+    degrees = int(parts[4][:2])
+    minutes = float(parts[4][2:])
+    longitude = degrees + minutes/60
+    if parts[5] == 'W':
+        longitude *= -1
+    return latitude, longitude, parts[6], parts[7], parts[9]
+
+stream = makeStream(np.random.default_rng(0))
+print(f"Stream: {nOfEpochs} epochs, {len(stream) / 1e6:.1f} MB")
+
+# Previous
+fixes = crashes = 0
+start = time.perf_counter()
+for line in stream.splitlines():
+    try:
+        fix = parseGPGGA(line.decode('ascii', errors='replace').strip())
+    except (ValueError, IndexError):
+        crashes += 1
+        continue
+    if fix is not None:
+        latitude, longitude, fix_quality, satellites, altitude = fix
+        gps_data = pd.DataFrame([{'latitude': latitude, 'longitude': longitude, 'fix_quality': fix_quality,
+                                  'satellites': satellites, 'altitude': altitude}])
+        fixes += 1
+elapsed = time.perf_counter() - start
+print(f"Previous: {fixes} fixes ($GPGGA only, {crashes} exceptions on empty fields), {elapsed / fixes * 1e6:.0f} µs per fix")
+
+# Now
+parser = NmeaParser()
+track = RingBuffer(3600, fixDtype)
+start = time.perf_counter()
+for offset in range(0, len(stream), chunkSize):
+    chunkFixes = parser.feed(stream[offset:offset + chunkSize], time.time())
+    if chunkFixes:
+        track.extend(np.array(chunkFixes, dtype=fixDtype))
+elapsed = time.perf_counter() - start
+print(f"Now:      {track.count} fixes (GGA of any talker), {parser.checksumErrors} checksum errors, {parser.noFix} sentences without fix, "
+      f"{elapsed / track.count * 1e6:.1f} µs per fix ({elapsed / parser.sentences * 1e6:.1f} µs per sentence)")
+print(f"Newest fix: {track.latest()}")
@@ -0,0 +1,97 @@
+import time
+import numpy as np
+from MPU6050 import MPU6050
+from sensor_sim import FakeSMBus, FakeMPU6050
+
+# MPU6050 acquisition on a simulated I2C bus (sensor_sim.py):
+#   - Byte reads: twelve read_byte_data transactions per sample (previous readAngles)
+#   - Block read: the 14-byte data block in one transaction (readAngles)
+#   - FIFO: the sensor buffers every sample, drained in batches (readFifo)
+# A reading is "mixed" if its six axes do not all belong to one sample of the sensor
+
+busSpeeds = [100000, 400000] # Hz
+duration = 2.0 # Seconds per test
+sensorRate = 1000 # Hz, sample rate of the sensor for the byte/block tests
+fifoRate = 200 # Hz (draining takes ~60% of a 100 kHz bus at 500 Hz)
+drainPeriod = 0.05 # Seconds between FIFO reads
+
+def readAnglesBytes(mpu):
+
+    # Previous implementation
+    Ax = mpu.readWord(0x3B)/mpu.accel_sensitivity
+    Ay = mpu.readWord(0x3D)/mpu.accel_sensitivity
+    Az = mpu.readWord(0x3F)/mpu.accel_sensitivity
+    Gx = mpu.readWord(0x43)/mpu.gyro_sensitivity
+    Gy = mpu.readWord(0x45)/mpu.gyro_sensitivity
+    Gz = mpu.readWord(0x47)/mpu.gyro_sensitivity
+    return Ax, Ay, Az, Gx, Gy, Gz
+
+def isMixed(device, reading, start, end):
+
+    # The reading must match one of the samples in the registers between start and end
+    raw = np.round(np.array(reading) * ([device.accelSensitivity]*3 + [device.gyroSensitivity]*3))
+    candidates = device.rawSamples(np.arange(device.sampleIndex(start), device.sampleIndex(end) + 1))[:, [0, 1, 2, 4, 5, 6]]
+    return not np.any(np.all(candidates == raw, axis=1))
+
+def runPolling(busSpeed, read):
+
+    device = FakeMPU6050()
+    bus = FakeSMBus({0x68: device}, busSpeed)
+    mpu = MPU6050(bus=bus)
+    mpu.setSampleRate(sensorRate)
+
+    samples = mixed = 0
+    bus.transactions = 0
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        start = time.time()
+        reading = read(mpu)
+        end = time.time()
+        samples += 1
+        mixed += isMixed(device, reading, start, end)
+
+    return samples / duration, bus.transactions / samples, mixed / samples
+
+def runFifo(busSpeed):
+
+    device = FakeMPU6050()
+    bus = FakeSMBus({0x68: device}, busSpeed)
+    mpu = MPU6050(bus=bus)
+    mpu.enableFifo(fifoRate)
+
+    times = []
+    readings = []
+    bus.transactions = 0
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        time.sleep(drainPeriod)
+        batchTimes, batch = mpu.readFifo()
+        times.append(batchTimes)
+        readings.append(batch)
+
+    times = np.concatenate(times)
+    readings = np.concatenate(readings)
+
+    # Samples come out in order (until an overflow resets the FIFO): compare with the true sample times and values
+    if mpu.fifoOverflows > 0:
+        return len(times) / duration, bus.transactions / max(len(times), 1), None, None, mpu.fifoOverflows
+    trueTimes = np.array(device.fifoTimes[:len(times)])
+    raw = np.round(readings / mpu.fifoScale)
+    trueRaw = device.rawSamples(np.round((trueTimes - device.startTime) * device.sampleRate).astype(int))[:, [0, 1, 2, 4, 5, 6]]
+    mismatched = np.count_nonzero(np.any(raw != trueRaw, axis=1))
+    timeError = np.abs(times - trueTimes)
+
+    return len(times) / duration, bus.transactions / max(len(times), 1), mismatched, timeError, mpu.fifoOverflows
+
+for busSpeed in busSpeeds:
+    print(f"--- I2C bus at {busSpeed // 1000} kHz ---")
+    rate, transactions, mixed = runPolling(busSpeed, readAnglesBytes)
+    print(f"Byte reads:  {rate:7.0f} samples/s, {transactions:.1f} transactions/sample, {mixed:.0%} mixed readings")
+    rate, transactions, mixed = runPolling(busSpeed, lambda mpu: mpu.readAngles())
+    print(f"Block read:  {rate:7.0f} samples/s, {transactions:.1f} transactions/sample, {mixed:.0%} mixed readings")
+    rate, transactions, mismatched, timeError, overflows = runFifo(busSpeed)
+    if overflows > 0:
+        print(f"FIFO:        {rate:7.0f} samples/s, {transactions:.2f} transactions/sample, {overflows} overflows (drain faster)")
+    else:
+        print(f"FIFO:        {rate:7.0f} samples/s, {transactions:.2f} transactions/sample, {mismatched} wrong samples, "
+              f"timestamp error mean {timeError.mean() * 1e3:.2f} ms / max {timeError.max() * 1e3:.2f} ms")
@@ -0,0 +1,164 @@
+import sys
+import time
+import subprocess
+import numpy as np
+from multiprocessing import shared_memory, resource_tracker
+
+# Slot header (uint64): sequence, number of points, cycle, detected objects, stop flag
+headerFields = 5
+headerBytes = 8 * headerFields
+
+class FrameSlot:
+
+    # Newest frame shared between the acquisition process (writer) and the viewer process (reader)
+    # Single slot in shared memory guarded by a sequence counter (seqlock): the writer never waits,
+    # a frame that is overwritten before the viewer gets to it is simply never drawn
+    # The sequence is odd while the writer is copying, the reader retries if it changed during its copy
+
+    def __init__(self, maxPoints=5000, name=None):
+
+        if name is None:
+            self.memory = shared_memory.SharedMemory(create=True, size=headerBytes + 12 * maxPoints)
+            self.owner = True
+        else:
+            self.memory = shared_memory.SharedMemory(name=name)
+            resource_tracker.unregister(self.memory._name, 'shared_memory') # Only the owner removes the block
+            self.owner = False
+            maxPoints = (self.memory.size - headerBytes) // 12
+
+        self.name = self.memory.name
+        self.maxPoints = maxPoints
+        self.header = np.ndarray(headerFields, dtype=np.uint64, buffer=self.memory.buf)
+        self.data = np.ndarray((3, maxPoints), dtype=np.float32, buffer=self.memory.buf, offset=headerBytes) # x, y, z
+
+    def write(self, cycleCounter, frame):
+
+        n = min(len(frame), self.maxPoints)
+
+        self.header[0] += 1
+        self.data[0, :n] = frame['x'][:n]
+        self.data[1, :n] = frame['y'][:n]
+        self.data[2, :n] = frame['z'][:n]
+        self.header[1] = n
+        self.header[2] = cycleCounter
+        self.header[3] = len(frame)
+        self.header[0] += 1
+
+    def read(self, lastSequence):
+
+        # (sequence, cycle, objects, x, y, z) of the newest frame, None if there is nothing new (or a write is in progress)
+        sequence = int(self.header[0])
+        if sequence == lastSequence or sequence % 2 == 1:
+            return None
+
+        n = int(self.header[1])
+        points = self.data[:, :n].copy()
+        cycle = int(self.header[2])
+        objects = int(self.header[3])
+
+        if int(self.header[0]) != sequence:
+            return None # Overwritten while copying, the next read gets the newer frame
+        return sequence, cycle, objects, points[0], points[1], points[2]
+
+    def requestStop(self):
+        self.header[4] = 1
+
+    def stopRequested(self):
+        return self.header[4] != 0
+
+    def close(self):
+
+        # Views must be released before the shared memory is closed
+        del self.header, self.data
+        self.memory.close()
+        if self.owner:
+            self.memory.unlink()
+
+def runViewer(slot, limits=((-5, 5), (5, -5), (-5, 5)), refreshPeriod=0.02):
+
+    # Viewer process: the axes are drawn once and kept as a background,
+    # each new frame only moves the scatter offsets and blits the animated artists over it
+    import matplotlib.pyplot as plt
+
+    fig = plt.figure()
+    ax = fig.add_subplot(111, projection='3d')
+    ax.set(xlabel='X [m]')
+    ax.set(ylabel='Y [m]')
+    ax.set(zlabel='Z [m]')
+    ax.set_xlim(limits[0])
+    ax.set_ylim(limits[1])
+    ax.set_zlim(limits[2])
+
+    scatter = ax.scatter([], [], [], animated=True)
+    title = ax.text2D(0.02, 0.95, "Waiting for frames...", transform=ax.transAxes, animated=True)
+    shown = {'background': None}
+
+    def drawAnimated():
+        scatter.do_3d_projection()
+        ax.draw_artist(scatter)
+        ax.draw_artist(title)
+
+    def onDraw(event):
+        # Full redraw (first show, resize, view rotated with the mouse): keep the new background
+        shown['background'] = fig.canvas.copy_from_bbox(fig.bbox)
+        drawAnimated()
+
+    fig.canvas.mpl_connect('draw_event', onDraw)
+    plt.show(block=False)
+    fig.canvas.draw()
+
+    lastSequence = 0
+    while not slot.stopRequested() and plt.fignum_exists(fig.number):
+
+        newest = slot.read(lastSequence)
+        if newest is not None:
+            lastSequence, cycle, objects, x, y, z = newest
+            scatter._offsets3d = (x, y, z)
+            title.set_text(f"Cycle {cycle} | Detected objects: {objects}")
+
+            if fig.canvas.supports_blit and shown['background'] is not None:
+                fig.canvas.restore_region(shown['background'])
+                drawAnimated()
+                fig.canvas.blit(fig.bbox)
+            else:
+                fig.canvas.draw_idle()
+
+        fig.canvas.flush_events()
+        time.sleep(refreshPeriod)
+
+    plt.close(fig)
+
+class LiveViewer:
+
+    # Live 3D view of the newest frame in a separate process, so drawing never delays acquisition
+    # show() only copies the frame to shared memory (a few microseconds), frames arriving faster than
+    # the viewer can draw them are dropped, the view always jumps to the newest one
+    # The viewer is a new interpreter running this file (the acquisition script is not imported again)
+
+    def __init__(self, maxPoints=5000):
+
+        self.slot = FrameSlot(maxPoints)
+        self.process = None
+
+    def start(self):
+        self.process = subprocess.Popen([sys.executable, __file__, self.slot.name])
+
+    def show(self, cycleCounter, frame):
+        self.slot.write(cycleCounter, frame)
+
+    def stop(self, timeout=2.0):
+
+        self.slot.requestStop()
+        if self.process is not None:
+            try:
+                self.process.wait(timeout)
+            except subprocess.TimeoutExpired:
+                self.process.terminate()
+        self.slot.close()
+
+if __name__ == '__main__':
+
+    # Started by LiveViewer: python live_view.py <shared memory name>
+    slot = FrameSlot(name=sys.argv[1])
+    runViewer(slot)
+    slot.close()
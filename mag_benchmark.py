@@ -0,0 +1,89 @@
+import time
+import numpy as np
+from HMC5883L import HMC5883L, fitCalibration, tiltCompensatedHeading
+from sensor_sim import FakeSMBus, FakeHMC5883L
+
+# HMC5883L heading on a simulated I2C bus (sensor_sim.py), sensor turning with ±20º/±10º tilt and hard/soft iron distortion:
+#   - Previous: six single-byte reads per sample at 15 Hz, raw counts, degrees passed to the trig functions
+#   - Now: one 6-byte read per sample (after the data-ready bit) at 75 Hz, calibrated, tilt compensation in radians
+# The true attitude is given to both, so only the magnetometer pipeline is compared
+
+busSpeed = 100000 # Hz
+duration = 3.0 # Seconds per test
+calibrationReadings = 500 # Readings of the calibration sweep
+batchSize = 100000 # Samples of the batch test
+
+def oldHeading(Mx, My, Mz, pitch, roll):
+
+    # Previous computeYawTiltCompensation
+    Mx_corrected = Mx*np.cos(pitch) + Mz*np.sin(pitch)
+    My_corrected = Mx*np.sin(roll)*np.sin(pitch) + My*np.cos(roll) - Mz*np.sin(roll)*np.cos(pitch)
+    yaw_rad = np.arctan2(My_corrected, Mx_corrected)
+    yaw_deg = np.rad2deg(yaw_rad)
+    return yaw_deg % 360
+
+def readOld(mag):
+    Mx = mag.readAxis(reg_high=0x03, reg_low=0x04)
+    My = mag.readAxis(reg_high=0x07, reg_low=0x08)
+    Mz = mag.readAxis(reg_high=0x05, reg_low=0x06)
+    return Mx, My, Mz
+
+def headingError(heading, truth):
+    return np.abs((np.asarray(heading) - truth + 180) % 360 - 180)
+
+def run(rate, read, heading):
+
+    device = FakeHMC5883L()
+    bus = FakeSMBus({0x1E: device}, busSpeed)
+    mag = HMC5883L(bus=bus, rate=rate, calibrationFileName=None)
+
+    headings = []
+    truth = []
+    indices = set() # Samples read at least once (the previous loop read the same sample several times)
+    bus.transactions = 0
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        raw = read(mag)
+        if raw is None:
+            continue
+        index = device.sampleIndex(time.time())
+        indices.add(index)
+        trueHeading, pitch, roll = device.attitude(device.startTime + index / device.outputRate)
+        headings.append(heading(mag, raw, pitch[0], roll[0]))
+        truth.append(trueHeading[0])
+
+    error = headingError(headings, truth)
+    return len(indices) / duration, bus.transactions / len(indices), error
+
+# Calibration sweep: the sensor turned in every direction
+device = FakeHMC5883L()
+rng = np.random.default_rng(1)
+sweep = device.rawReadings(rng.uniform(0, 360, calibrationReadings), rng.uniform(-90, 90, calibrationReadings),
+                           rng.uniform(-180, 180, calibrationReadings), indices=np.arange(calibrationReadings))
+offset, matrix = fitCalibration(sweep)
+print(f"Calibration: offset {np.round(offset, 1)} (true {device.hardIron})")
+
+rate, transactions, error = run(15, readOld, lambda mag, raw, pitch, roll: oldHeading(*raw, pitch, roll))
+print(f"Previous: {rate:5.1f} new samples/s, {transactions:.1f} transactions/sample, heading error mean {error.mean():.1f}º / max {error.max():.1f}º")
+
+def calibratedHeading(mag, raw, pitch, roll):
+    mag.offset, mag.matrix = offset, matrix
+    return mag.headings(raw, pitch, roll)[0]
+
+rate, transactions, error = run(75, lambda mag: mag.readData(timeout=2 / mag.rate), calibratedHeading)
+print(f"Now:      {rate:5.1f} new samples/s, {transactions:.1f} transactions/sample, heading error mean {error.mean():.1f}º / max {error.max():.1f}º")
+
+# Batch: heading of a block of stored samples
+heading, pitch, roll = device.attitude(device.startTime + np.arange(batchSize) / 75)
+raw = device.rawReadings(heading, pitch, roll, indices=np.arange(batchSize))
+
+start = time.perf_counter()
+for i in range(10000):
+    oldHeading(raw[i, 0], raw[i, 1], raw[i, 2], pitch[i], roll[i])
+scalarTime = (time.perf_counter() - start) / 10000 * batchSize
+
+start = time.perf_counter()
+batch = tiltCompensatedHeading((raw - offset) @ matrix.T, pitch, roll)
+batchTime = time.perf_counter() - start
+print(f"{batchSize} samples: {scalarTime * 1e3:.0f} ms one by one, {batchTime * 1e3:.1f} ms in batch "
+      f"(error mean {headingError(batch, heading).mean():.2f}º)")
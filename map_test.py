@@ -1,24 +1,21 @@
 import matplotlib.pyplot as plt
+import pandas as pd
 import geopandas as gpd
-from shapely.geometry import Point
 import contextily as ctx
 
-# Sample GPS points
-gps_points = [
-    (-3.7038, 40.4168),  # lon, lat (notice the order!)
-    (-3.7040, 40.4170),
-    (-3.7042, 40.4172)
-]
+# Georeferenced points written by radar_code.py (georeferenceFileName, see georeference.py)
+georeferenceFileName = 'SURROUND_RFL_1.5m_geo.csv'
 
-# Create GeoDataFrame
-geometry = [Point(lon, lat) for lon, lat in gps_points]
-gdf = gpd.GeoDataFrame(geometry=geometry, crs="EPSG:4326")
+data = pd.read_csv(georeferenceFileName)
+
+# Create GeoDataFrame (all points at once)
+gdf = gpd.GeoDataFrame(data, geometry=gpd.points_from_xy(data.longitude, data.latitude), crs="EPSG:4326")
 
 # Project to Web Mercator (for tiles)
 gdf = gdf.to_crs(epsg=3857)
 
-# Plot
-ax = gdf.plot(figsize=(8, 8), marker='o', color='red', markersize=50)
+# Plot (color: measuring cycle)
+ax = gdf.plot(figsize=(8, 8), marker='o', column='cycle', cmap='viridis', markersize=5, legend=True)
 buffer = 200  # meters to zoom out from center
 
 # Get map center
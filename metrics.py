@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+
+# Radar equation parameters (IWR6843, see snr_distance.py)
+k = 1.38e-23 # Boltzmann constant (J/K)
+T = 290 # Temperature (K)
+B = 4e9 # Bandwidth (Hz)
+G = 1 # Antenna gain (linear)
+L = 1 # Loss factor (linear)
+Pt = 0.0316 # Transmitted power (W)
+f = 62e9 # Frequency (Hz)
+c = 3e8 # Speed of light (m/s)
+lamb = c / f # Wavelength (m)
+
+def rcsFromSNR(snrLinear, distance):
+    # RCS (m²) from linear SNR at the given distance (m)
+    return (snrLinear*(4*np.pi)**3*(distance**4)*k*T*B*L)/(Pt*(G**2)*(lamb**2))
+
+def cycleMetrics(data, distance=None, cycles=None, axis='y'):
+
+    # Per-cycle statistics of a point cloud in a single grouped pass:
+    # number of points, centroid (x, y, z), mean SNR in dB and linear, RCS and range error
+    # data: DataFrame or structured array with cycle, x, y, z and snr columns
+    # cycles: cycles to report (e.g. all cycles of the gross data), cycles without points give NaN
+    # distance: measured distance along axis, used for RCS and error (NaN if not given)
+
+    cycle = np.asarray(data['cycle'])
+    order = None
+    if len(cycle) > 1 and np.any(cycle[1:] < cycle[:-1]):
+        order = np.argsort(cycle, kind='stable')
+        cycle = cycle[order]
+
+    def column(name):
+        values = np.asarray(data[name], dtype=np.float64)
+        return values[order] if order is not None else values
+
+    # Start of each group of points with the same cycle
+    if len(cycle) > 0:
+        starts = np.concatenate(([0], np.flatnonzero(cycle[1:] != cycle[:-1]) + 1))
+    else:
+        starts = np.zeros(0, dtype=np.int64)
+    groupCycles = cycle[starts]
+    counts = np.diff(np.concatenate((starts, [len(cycle)])))
+
+    snr = column('snr')
+    with np.errstate(divide='ignore'):
+        snrDB = 10 * np.log10(snr)
+
+    metrics = pd.DataFrame({'points': counts}, index=pd.Index(groupCycles, name='cycle'))
+    if len(starts) > 0:
+        metrics['centroid_x'] = np.add.reduceat(column('x'), starts) / counts
+        metrics['centroid_y'] = np.add.reduceat(column('y'), starts) / counts
+        metrics['centroid_z'] = np.add.reduceat(column('z'), starts) / counts
+        metrics['snr_db'] = np.add.reduceat(snrDB, starts) / counts
+        metrics['snr_linear'] = np.add.reduceat(snr, starts) / counts
+    else:
+        for name in ['centroid_x', 'centroid_y', 'centroid_z', 'snr_db', 'snr_linear']:
+            metrics[name] = np.zeros(0)
+
+    # Report every requested cycle (cycles without points: 0 points, NaN statistics)
+    if cycles is not None:
+        metrics = metrics.reindex(pd.Index(cycles, name='cycle'))
+        metrics['points'] = metrics['points'].fillna(0).astype(np.int64)
+
+    if distance is not None:
+        metrics['rcs'] = rcsFromSNR(metrics['snr_linear'], distance)
+        metrics['error'] = np.abs(metrics[f'centroid_{axis}'] - distance)
+    else:
+        metrics['rcs'] = np.nan
+        metrics['error'] = np.nan
+
+    return metrics
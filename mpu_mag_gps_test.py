@@ -9,29 +9,30 @@ import contextily as ctx
 from MPU6050 import *
 from HMC5883L import *
 from GPS import *
+from sensor_sampler import SensorSampler
 
 # Define sensors
 mpu = MPU6050(address=0x68)
 gps = GPS('/dev/tty/USB0') # CHECK FIRST!!! dmesg | grep tty
-mag = HMC5883L(address=0x1E)
+mag = HMC5883L(address=0x1E) # Hard/soft iron calibration from mag_calibration.json (mag.calibrate() to fit it)
 
 # Configurate sensors
 gps.configuratePort()
 
-# Start reading
-mpu.readAngles()
-gps.readSentence()
-mag.readData()
-
-while True:
-    # Compute values
-    mpu.computeAngles()
-    gps.getPosition()
-    mag.computeYawTiltCompensation(mpu.pitch, mpu.roll)
-
-    # Display data
-    print(f'Pitch: {mpu.pitch} | Roll: {mpu.roll} | Yaw: {mag.yaw}')
-    print('--------GPS DATA--------')
-    print(gps.gps_data)
-    sleep(1)
+# Each sensor is sampled in its own thread at its own rate (see sensor_sampler.py)
+sampler = SensorSampler(mpu, mag, gps, imuRate=200, magRate=75)
+sampler.start()
 
+try:
+    while True:
+        # Display the newest values (the sampling threads keep running between prints)
+        pitch, roll = sampler.attitude()
+        rates = sampler.rates()
+        print(f'Pitch: {pitch} | Roll: {roll} | Yaw: {sampler.heading()}')
+        print(f"Rates (Hz) | IMU: {rates['imu']:.0f} | Mag: {rates['mag']:.0f} | GPS: {rates['gps']:.0f}")
+        print('--------GPS DATA--------')
+        print(sampler.position())
+        sleep(1)
+except KeyboardInterrupt:
+    sampler.stop()
+    gps.closePort()
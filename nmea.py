@@ -0,0 +1,149 @@
+import numpy as np
+
+# -------------------------------------------------------------------------
+# NMEA 0183 sentences: $<talker><type>,<field>,...*<checksum>\r\n
+# The checksum is the XOR of every byte between '$' and '*' (two hex digits)
+# -------------------------------------------------------------------------
+
+# Sentence types we decode (any talker: GP, GN, GL, GA, GB...)
+sentenceGga = b'GGA' # Fix: time, position, quality, satellites, HDOP, altitude
+sentenceRmc = b'RMC' # Recommended minimum: time, status, position, speed (knots), course
+sentenceVtg = b'VTG' # Course and speed (km/h)
+
+maxSentenceLength = 128 # NMEA allows 82 characters, longer lines are garbage
+knots = 0.514444 # m/s
+
+# One row per fix (GGA with a valid position), speed and course from the newest RMC/VTG
+fixDtype = np.dtype([('time', '<f8'), # Host time.time() when the sentence was read
+                     ('utc', '<f8'), # Seconds since midnight (UTC)
+                     ('latitude', '<f8'), ('longitude', '<f8'), # º (south and west negative)
+                     ('altitude', '<f4'), # m above mean sea level
+                     ('fix_quality', '<i2'), ('satellites', '<i2'), ('hdop', '<f4'),
+                     ('speed', '<f4'), ('course', '<f4')]) # m/s, º from true north
+
+def checksum(body):
+    return np.bitwise_xor.reduce(np.frombuffer(body, dtype=np.uint8)) if len(body) > 0 else 0
+
+def sentence(body):
+    # Complete sentence (bytes) for a body without '$' and checksum, e.g. b'GPGGA,...'
+    return b'$' + body + b'*%02X\r\n' % checksum(body)
+
+# Field conversions: bytes in, numbers out (no decoding to str), NaN/0 for empty fields
+
+def number(field):
+    return float(field) if field else np.nan
+
+def integer(field):
+    return int(field) if field else 0
+
+def coordinate(field, hemisphere):
+    # (D)DDMM.MMMM to degrees
+    if not field:
+        return np.nan
+    value = float(field)
+    degrees = value // 100
+    value = degrees + (value - degrees * 100) / 60
+    return -value if hemisphere in (b'S', b'W') else value
+
+def utcSeconds(field):
+    # hhmmss.ss to seconds since midnight
+    if not field:
+        return np.nan
+    value = float(field)
+    return value // 10000 * 3600 + value // 100 % 100 * 60 + value % 100
+
+class NmeaParser:
+
+    # Incremental parser: chunks of any size are fed as they are read (bulk reads), sentences split between chunks are
+    # kept until complete. Checksums of all the sentences of a chunk are computed at once (prefix XOR over the buffer)
+
+    def __init__(self):
+
+        self.buffer = bytearray()
+
+        # Speed and course of the newest RMC/VTG, stored with the next fix
+        self.speed = np.nan
+        self.course = np.nan
+
+        # Statistics
+        self.sentences = 0 # Valid sentences (any type)
+        self.checksumErrors = 0
+        self.malformed = 0 # Valid checksum but fields that cannot be converted
+        self.noFix = 0 # GGA/RMC without a valid position
+        self.bytesDiscarded = 0 # Garbage between sentences
+
+    def feed(self, chunk, now):
+
+        # Returns the fixes (list of fixDtype tuples) of the complete sentences, `now` is the time stored with them
+        self.buffer += chunk
+        end = self.buffer.rfind(b'\n') + 1
+        if end == 0:
+            if len(self.buffer) > maxSentenceLength:
+                self.bytesDiscarded += len(self.buffer)
+                self.buffer.clear()
+            return []
+
+        data = bytes(self.buffer[:end])
+        del self.buffer[:end]
+
+        # prefix[i] = XOR of data[:i + 1], so the XOR of data[a + 1:b] is prefix[b - 1] ^ prefix[a]
+        prefix = np.bitwise_xor.accumulate(np.frombuffer(data, dtype=np.uint8)).tolist()
+
+        fixes = []
+        lineStart = 0
+        for line in data.split(b'\n')[:-1]:
+            offset = lineStart
+            lineStart += len(line) + 1
+
+            # Bytes before the last '$' are garbage or a truncated sentence
+            start = line.rfind(b'$')
+            star = line.rfind(b'*')
+            if start < 0 or star < start or len(line) - star < 3 or star - start > maxSentenceLength:
+                self.bytesDiscarded += len(line) + 1
+                continue
+            self.bytesDiscarded += start
+
+            try:
+                valid = int(line[star + 1:star + 3], 16) == prefix[offset + star - 1] ^ prefix[offset + start]
+            except ValueError:
+                valid = False
+            if not valid:
+                self.checksumErrors += 1
+                continue
+
+            self.sentences += 1
+            fix = self.parseSentence(line[start + 1:star].split(b','), now)
+            if fix is not None:
+                fixes.append(fix)
+
+        return fixes
+
+    def parseSentence(self, fields, now):
+
+        # Fields of one sentence (checksum verified), returns a fix or None
+        kind = fields[0][2:]
+        try:
+            if kind == sentenceGga and len(fields) >= 10:
+                quality = integer(fields[6])
+                latitude = coordinate(fields[2], fields[3])
+                longitude = coordinate(fields[4], fields[5])
+                if quality == 0 or latitude != latitude or longitude != longitude:
+                    self.noFix += 1
+                    return None
+                return (now, utcSeconds(fields[1]), latitude, longitude, number(fields[9]),
+                        quality, integer(fields[7]), number(fields[8]), self.speed, self.course)
+
+            if kind == sentenceRmc and len(fields) >= 9:
+                if fields[2] != b'A':
+                    self.noFix += 1
+                    return None
+                self.speed = number(fields[7]) * knots
+                self.course = number(fields[8])
+
+            elif kind == sentenceVtg and len(fields) >= 8:
+                self.course = number(fields[1])
+                self.speed = number(fields[7]) / 3.6
+
+        except ValueError:
+            self.malformed += 1
+        return None
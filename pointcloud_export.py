@@ -0,0 +1,106 @@
+import numpy as np
+import plotly.graph_objects as go
+from spatial_index import cellKey
+
+# Interactive HTML export of large point clouds with a bounded size
+#   - Levels of detail: the whole cloud decimated on voxel grids of increasing size, selected with buttons
+#   - Per-cycle frames behind a slider (consecutive cycles are grouped if there are more than maxFrames)
+#   - Every level/frame has a point budget, points beyond it are sampled with probability proportional to the SNR
+#   - Coordinates and SNR are written as float32 arrays, which plotly stores as base64 typed arrays instead of JSON numbers
+
+def voxelDecimate(points, snr, voxelSize):
+
+    # One point per occupied voxel: the strongest one (indices into points, in their original order)
+    if len(points) == 0:
+        return np.zeros(0, dtype=np.int64)
+
+    keys = cellKey(np.floor(points / voxelSize).astype(np.int64))
+    order = np.argsort(keys)
+    sortedKeys = keys[order]
+    sortedSnr = snr[order]
+
+    starts = np.flatnonzero(np.r_[True, sortedKeys[1:] != sortedKeys[:-1]])
+    counts = np.diff(np.r_[starts, len(order)])
+    strongest = np.maximum.reduceat(sortedSnr, starts)
+
+    # First point of each voxel that reaches the maximum SNR
+    candidates = np.flatnonzero(sortedSnr == np.repeat(strongest, counts))
+    voxel = np.searchsorted(starts, candidates, 'right') - 1
+    first = np.r_[True, voxel[1:] != voxel[:-1]]
+    return np.sort(order[candidates[first]])
+
+def snrSample(snr, maxPoints, rng):
+
+    # At most maxPoints indices, drawn without replacement with probability proportional to the (linear) SNR
+    if len(snr) <= maxPoints:
+        return np.arange(len(snr))
+    weights = np.maximum(snr, 1e-12)
+    return np.sort(rng.choice(len(snr), maxPoints, replace=False, p=weights / weights.sum()))
+
+def reduceCloud(points, snr, voxelSize, maxPoints, rng):
+    selected = voxelDecimate(points, snr, voxelSize) if voxelSize else np.arange(len(points))
+    return selected[snrSample(snr[selected], maxPoints, rng)]
+
+def scatterTrace(points, snrDb, name, snrRange, visible=True):
+
+    return go.Scatter3d(x=points[:, 0].astype(np.float32), y=points[:, 1].astype(np.float32), z=points[:, 2].astype(np.float32),
+                        mode='markers', name=name, visible=visible,
+                        marker=dict(size=2, color=snrDb.astype(np.float32), colorscale='Viridis', cmin=snrRange[0], cmax=snrRange[1],
+                                    colorbar=dict(title='SNR (dB)')))
+
+def lodFigure(points, snr, cycle, title='', voxelSizes=(0.02, 0.05, 0.1), maxPoints=20000, maxFrames=100, framePoints=2000, seed=0):
+
+    # points: (n, 3), snr: linear SNR, cycle: cycle of each point
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+    snr = np.asarray(snr, dtype=np.float64)
+    cycle = np.asarray(cycle)
+    snrDb = 10 * np.log10(np.maximum(snr, 1e-12))
+    rng = np.random.default_rng(seed)
+
+    # Same colors in every level and frame
+    snrRange = (float(snrDb.min()), float(snrDb.max())) if len(snrDb) > 0 else (0.0, 1.0)
+
+    # Levels of detail of the whole cloud (finest first), one trace each
+    traces = []
+    names = []
+    for voxelSize in voxelSizes:
+        selected = reduceCloud(points, snr, voxelSize, maxPoints, rng)
+        names.append(f"{voxelSize * 100:g} cm voxels ({len(selected)} points)")
+        traces.append(scatterTrace(points[selected], snrDb[selected], names[-1], snrRange, visible=len(traces) == 0))
+
+    # Per-cycle frames behind the slider, drawn in their own trace (the levels of detail are hidden while it is used)
+    cycles = np.unique(cycle)
+    groups = np.array_split(cycles, min(maxFrames, len(cycles))) if len(cycles) > 0 else []
+    order = np.argsort(cycle, kind='stable')
+    sortedCycle = cycle[order]
+
+    cycleTrace = len(traces)
+    hidden = [go.Scatter3d(visible=False) for trace in traces]
+    frames = []
+    steps = []
+    for group in groups:
+        rows = order[np.searchsorted(sortedCycle, group[0], 'left'):np.searchsorted(sortedCycle, group[-1], 'right')]
+        selected = rows[reduceCloud(points[rows], snr[rows], voxelSizes[0] if voxelSizes else None, framePoints, rng)]
+        label = f"{group[0]}" if len(group) == 1 else f"{group[0]}-{group[-1]}"
+        frames.append(go.Frame(name=label, data=[scatterTrace(points[selected], snrDb[selected], f"Cycle {label}", snrRange)] + hidden,
+                               traces=[cycleTrace] + list(range(len(traces)))))
+        steps.append(dict(label=label, method='animate', args=[[label], dict(mode='immediate', frame=dict(duration=0, redraw=True))]))
+
+    if frames:
+        traces.append(scatterTrace(np.zeros((0, 3)), np.zeros(0), "Cycle", snrRange, visible=False))
+
+    fig = go.Figure(data=traces, frames=frames)
+
+    # Buttons: one per level of detail (whole cloud)
+    buttons = [dict(label=name, method='update', args=[dict(visible=[i == j for j in range(len(traces))])]) for i, name in enumerate(names)]
+
+    # Axes fixed to the whole cloud, so they do not jump between frames
+    low = points.min(axis=0) if len(points) > 0 else np.zeros(3)
+    high = points.max(axis=0) if len(points) > 0 else np.ones(3)
+    scene = {axis + 'axis': dict(range=[float(low[i]), float(high[i])]) for i, axis in enumerate('xyz')}
+    scene['aspectmode'] = 'data'
+
+    fig.update_layout(title=title, scene=scene,
+                      updatemenus=[dict(type='buttons', direction='down', x=0, y=1, buttons=buttons)],
+                      sliders=[dict(active=0, currentvalue=dict(prefix='Cycle: '), steps=steps)] if steps else [])
+    return fig
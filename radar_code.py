@@ -1,4 +1,10 @@
 from urad import *
+from MPU6050 import MPU6050
+from HMC5883L import HMC5883L
+from GPS import GPS
+from sensor_sampler import SensorSampler
+from servo import Servo
+from sector_scan import SectorScanner, sectorSteps
 
 # Input parameters for class Radar
 
@@ -11,31 +17,104 @@ pointCloudFileName = 'SURROUND_RFL_1.5m.csv'
 # Configuration options for the program
 
 saveData = True # Save data frame to .csv
+captureFileName = None # Binary point cloud written frame by frame (e.g. 'SURROUND_RFL_1.5m.npc'), None to disable
 plotData = True # Plot data
-saveFrames = False # Save plot frames to .png
+liveView = False # Plot data in a separate viewer process instead (newest frame only, never slows down acquisition)
+saveFrames = False # Save every frame to .png (rendered in background processes)
+framesVideoFileName = None # Also join the saved frames into a video (e.g. 'SURROUND_RFL_1.5m.mp4', needs ffmpeg), None to disable
+backgroundReader = False # Read the standard port in a background thread (no frames lost while plotting)
+recordFileName = None # Raw capture of the standard port (e.g. 'SURROUND_RFL_1.5m.uart'), None to disable
+replayFileName = None # Play a raw capture back instead of opening the radar ports, None to disable
+replaySpeed = 1.0 # Replay speed (1 = real time, N = N times faster, None = as fast as possible)
+skipConfig = False # Do not send the configuration again if the radar already runs the same one (see config_sender.py)
+clusterData = False # Group the points of each frame into detections (centroid, extent, nº of points, SNR, v)
+trackData = False # Track the detections across frames (Kalman filters, IDs, tentative/confirmed tracks), implies clusterData
+georeferenceFileName = None # Points in ENU and WGS-84 coordinates from the IMU, magnetometer and GPS (e.g. 'SURROUND_RFL_1.5m_geo.csv'), None to disable
+gpsPortName = '/dev/ttyUSB0' # GPS serial port (only used to georeference)
+sectorScan = False # Pan/tilt the radar over a sector with the servos, one point cloud stitched per sweep (see sector_scan.py)
+sweepsFileName = None # Stitched sweeps .csv (e.g. 'SURROUND_RFL_1.5m_sweeps.csv'), None to disable
+yawPin = 13 # Servo GPIO pins (BCM)
+pitchPin = 12
 
 nOfCycles = 20 # Number of readings
 
 radar = Radar(enhancedPortName, standardPortName, testName, configFileName, pointCloudFileName, nOfCycles)
 radar.readConfigFile()
-radar.configuratePorts()
-radar.writeCommands()
+radar.configuratePorts(recordFileName, replayFileName, replaySpeed)
+if not radar.writeCommands(skipConfig):
+    print("Radar configuration failed, check the commands above")
 
-for cycleCounter in range(1, nOfCycles+1):
+if(captureFileName is not None):
+    radar.openCapture(captureFileName)
 
-    radar.standardPort.reset_input_buffer()
-    radar.standardPort.reset_output_buffer()
+if(liveView):
+    radar.startViewer()
 
-    if radar.unpackData():
-        radar.extractData(cycleCounter)
-        if(plotData):
-            radar.plotData(cycleCounter, saveFrames)
-    
-    #sleep(0.5)
+if(saveFrames):
+    radar.startFrameExport()
+
+if(clusterData):
+    radar.enableClustering()
+
+if(trackData):
+    radar.enableTracking()
+
+if(sectorScan):
+    yawServo = Servo(yawPin)
+    pitchServo = Servo(pitchPin)
+    yawServo.setup()
+    pitchServo.setup()
+    radar.enableSectorScan(SectorScanner(yawServo, pitchServo, sectorSteps(yawRange=(30, 150), yawStep=30, pitchAngles=(90,))))
+
+if(georeferenceFileName is not None):
+    gps = GPS(gpsPortName)
+    gps.configuratePort()
+    sampler = SensorSampler(MPU6050(), HMC5883L(), gps)
+    sampler.start()
+    radar.enableGeoreferencing(sampler.pose)
+
+if(backgroundReader):
+
+    radar.startAcquisition()
+
+    for cycleCounter in range(1, nOfCycles+1):
+
+        if radar.readFrame(cycleCounter):
+            if(plotData and not liveView):
+                radar.plotData(cycleCounter)
+
+    radar.stopAcquisition()
+
+else:
+
+    for cycleCounter in range(1, nOfCycles+1):
+
+        radar.flushInput()
+
+        if radar.unpackData():
+            radar.extractData(cycleCounter)
+            if(plotData and not liveView):
+                radar.plotData(cycleCounter)
+        
+        #sleep(0.5)
 
 if(saveData):
     radar.saveData()
 
+if(saveFrames):
+    radar.stopFrameExport(framesVideoFileName)
+
+if(georeferenceFileName is not None):
+    sampler.stop()
+    gps.closePort()
+    radar.saveGeoData(georeferenceFileName)
+
+if(sectorScan):
+    if(sweepsFileName is not None):
+        radar.saveSweeps(sweepsFileName)
+    yawServo.stop()
+    pitchServo.stop()
+
 radar.closePorts()
 
 plt.ioff()
@@ -0,0 +1,259 @@
+import os
+import threading
+import time
+import numpy as np
+from tlv import headerStruct, tlvHeaderStruct, syncPattern, pointDtype, sideInfoDtype, tlvDetectedPoints, tlvSideInfo
+
+# Header fields written by the generator (SDK 3.6, xWR68xx)
+sdkVersion = 0x03060000
+platform = 0xA6843
+
+def buildPacket(frameNumber, points, sideInfo, timeCpuCycles=0):
+
+    # Byte-exact mmWave SDK packet: 40-byte header + TLV type 1 (x, y, z, v) + TLV type 7 (SNR, noise)
+    pointsBody = np.ascontiguousarray(points, dtype=pointDtype).tobytes()
+    sideInfoBody = np.ascontiguousarray(sideInfo, dtype=sideInfoDtype).tobytes()
+
+    payload = (tlvHeaderStruct.pack(tlvDetectedPoints, len(pointsBody)) + pointsBody +
+               tlvHeaderStruct.pack(tlvSideInfo, len(sideInfoBody)) + sideInfoBody)
+    header = headerStruct.pack(syncPattern, sdkVersion, headerStruct.size + len(payload), platform,
+                               frameNumber, timeCpuCycles, len(points), 2, 0)
+
+    return header + payload
+
+class TlvGenerator:
+
+    # Synthetic radar traffic: clutter points plus clusters around moving targets
+    # Errors can be injected with the given probabilities (per frame):
+    #   garbage:      random bytes before the packet
+    #   corruptSync:  corrupted syncronization word (the packet must be skipped)
+    #   corruptTlv:   TLV header with an invalid type/length (the packet must be rejected by the decoder)
+    #   truncate:     packet cut short (the next sync word must still be found)
+
+    def __init__(self, nOfPoints=500, frameRate=10, targets=None, pointsPerTarget=20, seed=0,
+                 garbage=0.0, corruptSync=0.0, corruptTlv=0.0, truncate=0.0):
+
+        self.nOfPoints = nOfPoints # Points per frame (int or (min, max))
+        self.frameRate = frameRate # Frames per second
+        self.pointsPerTarget = pointsPerTarget
+        self.rng = np.random.default_rng(seed)
+
+        # Targets: rows of x, y, z, vx, vy, vz (m, m/s)
+        if targets is None:
+            targets = [[0.0, 3.0, 0.5, 0.5, 0.0, 0.0]]
+        self.targets = np.array(targets, dtype=float).reshape(-1, 6)
+
+        self.garbage = garbage
+        self.corruptSync = corruptSync
+        self.corruptTlv = corruptTlv
+        self.truncate = truncate
+
+        self.frameNumber = 0
+
+    def framePoints(self):
+
+        # Number of points in this frame
+        if np.isscalar(self.nOfPoints):
+            nOfPoints = int(self.nOfPoints)
+        else:
+            nOfPoints = int(self.rng.integers(self.nOfPoints[0], self.nOfPoints[1] + 1))
+
+        points = np.empty(nOfPoints, dtype=pointDtype)
+        sideInfo = np.empty(nOfPoints, dtype=sideInfoDtype)
+
+        # Move the targets one frame period
+        self.targets[:, :3] += self.targets[:, 3:] / self.frameRate
+
+        # Target points first (radial velocity from the target velocity), clutter for the rest
+        nOfTarget = min(nOfPoints, self.pointsPerTarget * len(self.targets))
+        if nOfTarget > 0:
+            owner = np.arange(nOfTarget) % len(self.targets)
+            position = self.targets[owner, :3] + self.rng.normal(0, 0.1, (nOfTarget, 3))
+            direction = position / np.maximum(np.linalg.norm(position, axis=1, keepdims=True), 1e-6)
+            points['x'][:nOfTarget] = position[:, 0]
+            points['y'][:nOfTarget] = position[:, 1]
+            points['z'][:nOfTarget] = position[:, 2]
+            points['v'][:nOfTarget] = np.sum(direction * self.targets[owner, 3:], axis=1)
+            sideInfo['snr'][:nOfTarget] = self.rng.integers(150, 400, nOfTarget)
+
+        nOfClutter = nOfPoints - nOfTarget
+        points['x'][nOfTarget:] = self.rng.uniform(-5, 5, nOfClutter)
+        points['y'][nOfTarget:] = self.rng.uniform(0, 9, nOfClutter)
+        points['z'][nOfTarget:] = self.rng.uniform(-2, 2, nOfClutter)
+        points['v'][nOfTarget:] = 0
+        sideInfo['snr'][nOfTarget:] = self.rng.integers(50, 200, nOfClutter)
+        sideInfo['noise'] = self.rng.integers(500, 800, nOfPoints)
+
+        return points, sideInfo
+
+    def nextFrame(self):
+
+        # Bytes of the next frame (including any injected error)
+        points, sideInfo = self.framePoints()
+        timeCpuCycles = int(self.frameNumber * 600e6 / self.frameRate) & 0xFFFFFFFF
+        packet = bytearray(buildPacket(self.frameNumber, points, sideInfo, timeCpuCycles))
+        self.frameNumber += 1
+
+        if self.rng.random() < self.corruptSync:
+            packet[self.rng.integers(0, 8)] ^= 0xFF
+
+        if self.rng.random() < self.corruptTlv:
+            tlvHeaderStruct.pack_into(packet, headerStruct.size, int(self.rng.choice([tlvDetectedPoints, 99])), 0xFFFFFF)
+
+        if self.rng.random() < self.truncate:
+            packet = packet[:self.rng.integers(1, len(packet))]
+
+        if self.rng.random() < self.garbage:
+            packet = self.rng.bytes(int(self.rng.integers(1, 256))) + packet
+
+        return bytes(packet)
+
+class FakeSerialPort:
+
+    # In-process stand-in for the standard port, frames are produced at the generator frame rate
+    # (realTime = False produces a new frame whenever the buffer runs out, to measure the maximum ingest rate)
+
+    def __init__(self, generator, realTime=True, timeout=0.3):
+
+        self.generator = generator
+        self.realTime = realTime
+        self.timeout = timeout
+        self.is_open = True
+
+        self.pending = bytearray()
+        self.framesProduced = 0
+        self.start = time.monotonic()
+
+    def produce(self, size=1):
+
+        if self.realTime:
+            due = int((time.monotonic() - self.start) * self.generator.frameRate)
+            while self.framesProduced < due:
+                self.pending += self.generator.nextFrame()
+                self.framesProduced += 1
+        else:
+            while len(self.pending) < size:
+                self.pending += self.generator.nextFrame()
+                self.framesProduced += 1
+
+    @property
+    def in_waiting(self):
+        self.produce()
+        return len(self.pending)
+
+    def read(self, size=1):
+
+        deadline = time.monotonic() + (self.timeout or 0)
+
+        self.produce(size)
+        while len(self.pending) < size and time.monotonic() < deadline:
+            nextFrameTime = self.start + (self.framesProduced + 1) / self.generator.frameRate
+            time.sleep(max(0, min(nextFrameTime, deadline) - time.monotonic()))
+            self.produce(size)
+
+        data = bytes(self.pending[:size])
+        del self.pending[:size]
+        return data
+
+    def write(self, data):
+        return len(data)
+
+    def reset_input_buffer(self):
+        self.produce()
+        self.pending.clear()
+
+    def reset_output_buffer(self):
+        pass
+
+    def close(self):
+        self.is_open = False
+
+class FakeCliPort:
+
+    # In-process stand-in for the enhanced (CLI) port: each command is echoed and answered with Done (or Error)
+    # and the prompt after replyDelay seconds (slowCommands: {command name: delay} for the ones that take longer)
+
+    def __init__(self, replyDelay=0.002, slowCommands=None, failCommands=(), timeout=0.3, port='FAKE_CLI'):
+
+        self.replyDelay = replyDelay
+        self.slowCommands = slowCommands if slowCommands is not None else {'sensorStart': 0.05, 'sensorStop': 0.03}
+        self.failCommands = failCommands
+        self.timeout = timeout
+        self.port = port
+        self.is_open = True
+
+        self.replies = [] # (time, bytes) not yet readable
+        self.pending = bytearray()
+        self.commandsReceived = []
+
+    def deliver(self):
+        now = time.monotonic()
+        while self.replies and self.replies[0][0] <= now:
+            self.pending += self.replies.pop(0)[1]
+
+    @property
+    def in_waiting(self):
+        self.deliver()
+        return len(self.pending)
+
+    def read(self, size=1):
+
+        deadline = time.monotonic() + (self.timeout or 0)
+        self.deliver()
+        while len(self.pending) < size and self.replies and self.replies[0][0] < deadline:
+            time.sleep(max(0, self.replies[0][0] - time.monotonic()))
+            self.deliver()
+        if len(self.pending) < size and not self.replies:
+            time.sleep(max(0, deadline - time.monotonic()))
+
+        data = bytes(self.pending[:size])
+        del self.pending[:size]
+        return data
+
+    def write(self, data):
+
+        command = data.decode().strip()
+        self.commandsReceived.append(command)
+        name = command.split()[0] if command else ''
+        status = 'Error -1' if name in self.failCommands else 'Done'
+        delay = self.slowCommands.get(name, self.replyDelay)
+        self.replies.append((time.monotonic() + delay, f"{command}\n\n{status}\n\nmmwDemo:/>".encode()))
+        self.replies.sort(key=lambda reply: reply[0])
+        return len(data)
+
+    def reset_input_buffer(self):
+        self.pending.clear()
+
+    def reset_output_buffer(self):
+        pass
+
+    def close(self):
+        self.is_open = False
+
+def runPty(generator, nOfFrames=None):
+
+    # Write the generated frames at the generator frame rate to a pseudo terminal
+    # Returns the device name to open with serial.Serial (e.g. as standardPortName) and the writer thread
+    # POSIX only (pseudo terminals), imported here so the in-process fakes above also work on Windows
+    import tty
+
+    master, slave = os.openpty()
+    tty.setraw(slave) # Binary data, no line discipline
+    deviceName = os.ttyname(slave)
+    stopEvent = threading.Event()
+
+    def writeFrames():
+        period = 1 / generator.frameRate
+        nextTime = time.monotonic()
+        count = 0
+        while not stopEvent.is_set() and (nOfFrames is None or count < nOfFrames):
+            os.write(master, generator.nextFrame())
+            count += 1
+            nextTime += period
+            time.sleep(max(0, nextTime - time.monotonic()))
+
+    writer = threading.Thread(target=writeFrames, daemon=True)
+    writer.stopEvent = stopEvent
+    writer.start()
+
+    return deviceName, writer
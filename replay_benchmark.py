@@ -0,0 +1,36 @@
+import time
+from tlv import headerStruct, decodePayload, Framer
+from frame_store import FrameStore
+from uart_capture import ReplayPort
+
+# Offline benchmark of the ingest pipeline (framing + decoding + storing) with a raw UART capture
+# Captures are recorded with radar_code.py (recordFileName)
+
+captureFileName = 'SURROUND_RFL_1.5m.uart'
+replaySpeed = None # None = as fast as possible, 1 = real time
+readSize = 65536 # Bytes per read, as in the background reader
+
+port = ReplayPort(captureFileName, speed = replaySpeed, timeout = 0.3)
+framer = Framer()
+store = FrameStore()
+
+nOfBytes = 0
+cycleCounter = 0
+start = time.perf_counter()
+
+while not port.finished:
+
+    data = port.read(max(port.in_waiting, readSize))
+    nOfBytes += len(data)
+
+    for header, payload in framer.packetsIn(data):
+        sync, version, packetLength, platform, frameNumber, timeCpuCycles, numOfDetectedObj, numOfTlvs, subFrameNumber = headerStruct.unpack(header)
+        cycleCounter += 1
+        store.append(cycleCounter, decodePayload(payload, numOfDetectedObj, numOfTlvs))
+
+elapsed = time.perf_counter() - start
+port.close()
+
+print(f"Capture: {captureFileName}")
+print(f"Frames: {cycleCounter} | Points: {len(store)} | Bytes: {nOfBytes} | Garbage bytes skipped: {framer.bytesDiscarded}")
+print(f"Elapsed: {elapsed:.3f} s | {cycleCounter / elapsed:.1f} frames/s | {nOfBytes / elapsed / 1e6:.2f} MB/s")
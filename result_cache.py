@@ -0,0 +1,111 @@
+import hashlib
+import os
+import pickle
+import tempfile
+
+class ResultCache:
+
+    # Disk cache for analysis results (parsed captures, filtered subsets, per-cycle metrics)
+    # Entries are keyed on the content hash of the input file, the source of the modules that compute the stage and
+    # the parameters that produced them, so a changed capture, an edited stage or a new filter setting is recomputed
+    # and everything else is loaded from disk
+    # The least recently used entries are evicted when the cache grows above maxBytes
+
+    def __init__(self, cacheDir='.cuas_cache', maxBytes=512 * 1024**2):
+
+        self.cacheDir = cacheDir
+        self.maxBytes = maxBytes
+        os.makedirs(cacheDir, exist_ok=True)
+
+        # Content hashes already computed in this process: path --> (size, mtime, hash)
+        self.fileHashes = {}
+
+        # Statistics
+        self.hits = 0
+        self.misses = 0
+
+    def fileHash(self, fileName):
+
+        stat = os.stat(fileName)
+        cached = self.fileHashes.get(fileName)
+        if cached is not None and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+            return cached[2]
+
+        digest = hashlib.sha1()
+        with open(fileName, 'rb') as fp:
+            for block in iter(lambda: fp.read(1024**2), b''):
+                digest.update(block)
+
+        self.fileHashes[fileName] = (stat.st_size, stat.st_mtime_ns, digest.hexdigest())
+        return digest.hexdigest()
+
+    def key(self, fileName, stage, code=(), **params):
+
+        # Key of a result: input file content + processing stage + stage code (modules, e.g. [metrics]) + parameters
+        codeHash = ",".join(self.fileHash(module.__file__) for module in code)
+        description = f"{self.fileHash(fileName)}|{stage}|{codeHash}|" + "|".join(f"{name}={params[name]!r}" for name in sorted(params))
+        return hashlib.sha1(description.encode()).hexdigest()
+
+    def entryPath(self, key):
+        return os.path.join(self.cacheDir, key + '.pkl')
+
+    def get(self, key):
+
+        path = self.entryPath(key)
+        try:
+            with open(path, 'rb') as fp:
+                value = pickle.load(fp)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+            self.misses += 1
+            return None
+
+        os.utime(path) # Mark as recently used
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+
+        # Write to a temporary file first, so a concurrent reader never sees a partial entry
+        fd, tmpPath = tempfile.mkstemp(dir=self.cacheDir, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as fp:
+            pickle.dump(value, fp, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmpPath, self.entryPath(key))
+
+        self.evict()
+
+    def getOrCompute(self, key, compute):
+
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def evict(self):
+
+        entries = []
+        totalBytes = 0
+        for entry in os.scandir(self.cacheDir):
+            if entry.name.endswith('.pkl'):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue # Removed by another process
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                totalBytes += stat.st_size
+
+        # Remove least recently used entries first
+        entries.sort()
+        for mtime, size, path in entries:
+            if totalBytes <= self.maxBytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            totalBytes -= size
+
+    def clear(self):
+        for entry in os.scandir(self.cacheDir):
+            if entry.name.endswith('.pkl'):
+                os.remove(entry.path)
@@ -0,0 +1,54 @@
+import numpy as np
+
+class RingBuffer:
+
+    # Last `capacity` samples of a stream (structured array), written by one thread and read by any number of threads
+    # No locks: the writer announces the slots it is about to fill (writeEnd), fills them and then publishes them by
+    # incrementing count (a single assignment). Readers copy what they need and discard the samples whose slots were
+    # being written during the copy (writeEnd read after it)
+
+    def __init__(self, capacity, dtype):
+
+        self.capacity = capacity
+        self.data = np.zeros(capacity, dtype=dtype)
+        self.count = 0 # Samples written since the start (slot = count % capacity)
+        self.writeEnd = 0 # count once the write in progress is published
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    def append(self, sample):
+        self.writeEnd = self.count + 1
+        self.data[self.count % self.capacity] = sample
+        self.count = self.writeEnd
+
+    def extend(self, samples):
+
+        # Several samples at once (e.g. a FIFO burst)
+        samples = samples[-self.capacity:]
+        slots = (self.count + np.arange(len(samples))) % self.capacity
+        self.writeEnd = self.count + len(samples)
+        self.data[slots] = samples
+        self.count = self.writeEnd
+
+    def since(self, count):
+
+        # Samples written after `count` (at most capacity) and the count to pass in the next call
+        end = self.count
+        start = max(count, end - self.capacity, 0)
+        samples = self.data[np.arange(start, end) % self.capacity]
+
+        # Samples overwritten or being overwritten while copying are dropped (an in-progress write counts as done)
+        overwritten = self.writeEnd - self.capacity - start
+        if overwritten > 0:
+            samples = samples[overwritten:]
+        return samples, end
+
+    def last(self, n=1):
+        return self.since(self.count - n)[0]
+
+    def latest(self):
+
+        # Newest sample (None if empty)
+        samples = self.last(1)
+        return samples[0] if len(samples) > 0 else None
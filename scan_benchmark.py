@@ -0,0 +1,88 @@
+import time
+import numpy as np
+from collections import deque
+from servo import Servo
+from servo_sim import MockGPIO
+from sector_scan import SectorScanner, sectorSteps
+from tlv import frameDtype
+
+# Sector scan with simulated servos (servo_sim.py) and a simulated 10 Hz radar frame stream:
+#   - Blocking: each servo moved one after the other with a fixed 1 s sleep, frames taken after the move, fly-back to
+#     the first step at the end of the sweep
+#   - SectorScanner: both servos moved at once with the settle time estimate, serpentine sweeps, frames tagged with
+#     the servo pose at capture time (from their arrival time, also when they are consumed later)
+# The simulated servos are slower than the estimate in Servo (slewRate), as a real one may be
+
+steps = sectorSteps(yawRange=(30, 150), yawStep=30, pitchAngles=(90,))
+frameRate = 10.0 # Hz
+latency = 0.1 # s from capture to arrival
+dwellFrames = 2
+nOfSweeps = 4
+nOfPoints = 50
+yawPin, pitchPin = 13, 12
+
+rng = np.random.default_rng(0)
+
+def radarFrame():
+    frame = np.zeros(nOfPoints, dtype=frameDtype)
+    frame['x'] = rng.uniform(-5, 5, nOfPoints)
+    frame['y'] = rng.uniform(0, 10, nOfPoints)
+    frame['z'] = rng.uniform(-2, 2, nOfPoints)
+    return frame
+
+def servos(gpio):
+    yaw, pitch = Servo(yawPin, gpio=gpio), Servo(pitchPin, gpio=gpio)
+    yaw.setup()
+    pitch.setup()
+    return yaw, pitch
+
+# Blocking scan (previous Servo.setAngle, which slept 1 s after every command)
+gpio = MockGPIO(slewRate=250.0)
+yaw, pitch = servos(gpio)
+sweepTimes = []
+for sweep in range(2):
+    start = time.monotonic()
+    for yawAngle, pitchAngle in steps:
+        yaw.setAngle(yawAngle)
+        time.sleep(1)
+        pitch.setAngle(pitchAngle)
+        time.sleep(1)
+        time.sleep(dwellFrames / frameRate) # Frames at the step
+    sweepTimes.append(time.monotonic() - start)
+print(f"Blocking: {len(steps)} steps, revisit time {np.mean(sweepTimes[1:]):.2f} s")
+
+# SectorScanner, frames consumed queueDelay s after they arrive (as with frames queued by the background reader)
+def runScanner(queueDelay, stamped):
+
+    # stamped: frames passed with their arrival time, otherwise tagged when they are consumed
+    gpio = MockGPIO(slewRate=250.0)
+    yaw, pitch = servos(gpio)
+    scanner = SectorScanner(yaw, pitch, steps, dwellFrames=dwellFrames, latency=latency)
+    scanner.start()
+
+    yawErrors, pitchErrors = [], []
+    queued = deque()
+    cycle = 0
+    nextFrame = time.monotonic()
+    while len(scanner.sweepTimes) < nOfSweeps + 1:
+        nextFrame += 1 / frameRate
+        time.sleep(max(0.0, nextFrame - time.monotonic()))
+        cycle += 1
+        queued.append((cycle, radarFrame(), time.monotonic()))
+
+        while queued and time.monotonic() - queued[0][2] >= queueDelay - 1e-3:
+            frameCycle, frame, arrival = queued.popleft()
+            pose = scanner.addFrame(frameCycle, frame, arrival if stamped else None)
+            if pose.settled:
+                yawErrors.append(abs(pose.yaw - gpio.angle(yawPin, arrival - latency)))
+                pitchErrors.append(abs(pose.pitch - gpio.angle(pitchPin, arrival - latency)))
+
+    sweepTimes = scanner.sweepTimes[1:] # The first sweep starts from an unknown position
+    print(f"SectorScanner ({queueDelay:.1f} s queue, {'arrival time' if stamped else 'tagged when consumed'}): "
+          f"{len(steps)} steps, revisit time {np.mean(sweepTimes):.2f} s")
+    print(f"  {len(scanner.lastSweep())} points in the last sweep, {scanner.framesMoving} of {cycle} frames while moving")
+    print(f"  Pose tag error of stitched frames: yaw max {max(yawErrors):.2f} º, mean {np.mean(yawErrors):.2f} º")
+
+runScanner(0.0, True)
+runScanner(0.5, True)
+runScanner(0.5, False)
\ No newline at end of file
@@ -0,0 +1,146 @@
+import time
+import numpy as np
+from collections import namedtuple, deque
+from georeference import rotationX, rotationZ
+
+# Servo pose of one radar frame (angles of the servos at the capture time, estimated from the commanded moves)
+ScanPose = namedtuple('ScanPose', ['time', 'yaw', 'pitch', 'settled', 'step', 'sweep'])
+
+# One row per point of a stitched sweep: position in the platform frame (radar frame at the offsets, see SectorScanner)
+sweepDtype = np.dtype([('cycle', '<u4'), ('object', '<u4'),
+                       ('x', '<f4'), ('y', '<f4'), ('z', '<f4'), ('v', '<f4'),
+                       ('snr', '<u2'), ('noise', '<u2'),
+                       ('yaw', '<f4'), ('pitch', '<f4')]) # Servo angles of the frame
+
+def sectorSteps(yawRange=(30, 150), yawStep=30, pitchAngles=(90,)):
+
+    # (yaw, pitch) servo angles of a sweep: one row of yaw angles per pitch angle, alternating direction (serpentine),
+    # so every move is a single step
+    yaws = np.arange(yawRange[0], yawRange[1] + 1e-9, yawStep)
+    steps = []
+    for row, pitch in enumerate(pitchAngles):
+        for yaw in (yaws if row % 2 == 0 else yaws[::-1]):
+            steps.append((float(yaw), float(pitch)))
+    return steps
+
+class SectorScanner:
+
+    # Steps the radar through a sector with a pan (yaw) and a tilt (pitch) servo.Servo without blocking:
+    #   - Both servos are commanded at once and the scan waits until both are estimated to have settled (Servo.settled),
+    #     then stays dwellFrames settled frames at the step
+    #   - Consecutive sweeps run the steps in opposite directions (no fly-back to the first step): the frames of the
+    #     turning step are used by both sweeps
+    #   - Every frame (addFrame) is tagged with the servo pose at its capture time (arrival - latency). Settled frames
+    #     are rotated to the platform frame and added to the sweep, which is stitched into one cloud when it ends
+    # Offsets: servo angles with the radar looking forward and level; yawSign/pitchSign = -1 if a servo turns the other way
+    # (positive yaw turns the radar to the left seen from above, positive pitch up)
+
+    def __init__(self, yawServo, pitchServo, steps, dwellFrames=2, latency=0.1, yawOffset=90.0, pitchOffset=90.0,
+                 yawSign=1.0, pitchSign=1.0, keepSweeps=10):
+
+        self.yawServo = yawServo
+        self.pitchServo = pitchServo
+        self.steps = list(steps)
+        self.dwellFrames = dwellFrames
+        self.latency = latency # s from the capture of a frame to its arrival
+        self.yawOffset = yawOffset
+        self.pitchOffset = pitchOffset
+        self.yawSign = yawSign
+        self.pitchSign = pitchSign
+
+        self.step = 0 # Index in self.steps
+        self.sweep = 0
+        self.direction = 1
+        self.dwellCount = 0 # Settled frames at the current step
+        self.moveTime = None # When the current step was commanded
+
+        # Points of the current sweep and the last stitched sweeps
+        self.sweepFrames = []
+        self.stepFrames = [] # Settled frames of the current step
+        self.sweepStart = None
+        self.sweeps = deque(maxlen=keepSweeps)
+        self.sweepTimes = [] # Revisit time of every completed sweep (s)
+
+        # Statistics
+        self.framesMoving = 0 # Frames captured while a servo was moving (tagged, not stitched)
+
+    def start(self):
+        self.sweepStart = time.monotonic()
+        self.moveTo(self.step)
+
+    def moveTo(self, step):
+
+        # Both servos at once
+        yaw, pitch = self.steps[step]
+        self.yawServo.setAngle(yaw)
+        self.pitchServo.setAngle(pitch)
+        self.moveTime = time.monotonic()
+        self.dwellCount = 0
+        self.stepFrames = []
+
+    def settleTime(self):
+        return max(self.yawServo.moveEnd, self.pitchServo.moveEnd)
+
+    def pose(self, now=None):
+
+        # Servo pose of a frame captured at `now` (time.monotonic)
+        now = time.monotonic() if now is None else now
+        settled = now >= self.settleTime() and now >= self.moveTime
+        return ScanPose(now, self.yawServo.currentAngle(now), self.pitchServo.currentAngle(now), settled, self.step, self.sweep)
+
+    def rotation(self, pose):
+        # Radar frame to platform frame: pan about z, then tilt about x
+        return rotationZ(self.yawSign * (pose.yaw - self.yawOffset)) @ rotationX(self.pitchSign * (pose.pitch - self.pitchOffset))
+
+    def addFrame(self, cycle, frame, arrival=None):
+
+        # Tags the frame (frameDtype) with its servo pose and, if settled, adds it to the sweep. Returns the pose
+        arrival = time.monotonic() if arrival is None else arrival
+        pose = self.pose(arrival - self.latency)
+
+        if pose.settled:
+            points = np.column_stack([frame['x'], frame['y'], frame['z']]) @ self.rotation(pose).T
+
+            rows = np.zeros(len(frame), dtype=sweepDtype)
+            rows['cycle'] = cycle
+            for name in ['object', 'v', 'snr', 'noise']:
+                rows[name] = frame[name]
+            rows['x'], rows['y'], rows['z'] = points.T
+            rows['yaw'] = pose.yaw
+            rows['pitch'] = pose.pitch
+            self.sweepFrames.append(rows)
+            self.stepFrames.append(rows)
+            self.dwellCount += 1
+        else:
+            self.framesMoving += 1
+
+        self.update()
+        return pose
+
+    def update(self):
+
+        # Next step once the current one has its settled frames (non-blocking, called after every frame)
+        if self.dwellCount < self.dwellFrames:
+            return
+
+        nextStep = self.step + self.direction
+        if not 0 <= nextStep < len(self.steps):
+            self.finishSweep()
+            self.direction = -self.direction
+            nextStep = self.step + self.direction if len(self.steps) > 1 else self.step
+
+        self.step = nextStep
+        self.moveTo(self.step)
+
+    def finishSweep(self):
+
+        # One cloud with every settled frame of the sweep
+        now = time.monotonic()
+        self.sweeps.append(np.concatenate(self.sweepFrames) if self.sweepFrames else np.zeros(0, dtype=sweepDtype))
+        self.sweepTimes.append(now - self.sweepStart)
+        self.sweepFrames = list(self.stepFrames) # The turning step starts the next sweep
+        self.sweepStart = now
+        self.sweep += 1
+
+    def lastSweep(self):
+        return self.sweeps[-1] if self.sweeps else None
@@ -0,0 +1,191 @@
+import time
+import threading
+import numpy as np
+from ring_buffer import RingBuffer
+from nmea import fixDtype
+from georeference import Pose
+
+# Samples published by SensorSampler (time: host time.time(), same clock as the radar frames)
+imuDtype = np.dtype([('time', '<f8'),
+                     ('ax', '<f4'), ('ay', '<f4'), ('az', '<f4'), # g
+                     ('gx', '<f4'), ('gy', '<f4'), ('gz', '<f4'), # º/s
+                     ('pitch', '<f4'), ('roll', '<f4')]) # º, complementary filter
+magDtype = np.dtype([('time', '<f8'), ('mx', '<f4'), ('my', '<f4'), ('mz', '<f4'), ('yaw', '<f4')]) # Raw counts, calibrated tilt-compensated heading (º)
+
+def interpolate(samples, at, names, angles=False):
+
+    # Fields `names` of time-ordered samples at time `at`: linear between the samples around it, held before the first
+    # and after the last one (no extrapolation). angles: the fields are in º and interpolated along the shorter arc
+    if len(samples) == 0:
+        return None
+    values = np.column_stack([samples[name] for name in names]).astype(np.float64)
+    if angles:
+        values = np.degrees(np.unwrap(np.radians(values), axis=0))
+    result = [np.interp(at, samples['time'], values[:, i]) for i in range(len(names))]
+    return [value % 360 for value in result] if angles else result
+
+class SensorSampler:
+
+    # Each sensor is sampled by its own thread at its own rate, so a slow sensor never delays the others:
+    #   IMU (MPU6050): imuRate Hz, the complementary filter uses the real time between samples
+    #     (imuFifo: the sensor buffers the samples at imuRate and the thread drains them in batches at drainRate)
+    #   Magnetometer (HMC5883L): magRate Hz (output rate of the sensor), heading tilt-compensated with the newest IMU attitude
+    #   GPS: bulk reads parsed as they arrive (the blocking read only holds the GPS thread)
+    # Samples are published to ring buffers (see ring_buffer.py) that any thread can read without locks
+
+    def __init__(self, mpu=None, mag=None, gps=None, imuRate=200, magRate=30, capacity=4096, imuFifo=False, drainRate=20):
+
+        self.mpu = mpu
+        self.mag = mag
+        self.gps = gps
+        self.imuRate = imuRate
+        self.magRate = magRate
+        self.imuFifo = imuFifo
+        self.drainRate = drainRate
+
+        self.imu = RingBuffer(capacity, imuDtype)
+        self.magnetometer = RingBuffer(capacity, magDtype)
+        self.fixes = gps.track if gps is not None else RingBuffer(capacity, fixDtype) # GPS track log (see GPS.read)
+
+        # Statistics
+        self.overruns = {'imu': 0, 'mag': 0} # Periods skipped because a read took longer than the period
+        self.errors = {'imu': 0, 'mag': 0, 'gps': 0} # Failed reads (I2C and serial port errors)
+
+        self.stopEvent = threading.Event()
+        self.threads = []
+
+    def start(self):
+
+        if self.mpu is not None and self.imuFifo:
+            self.mpu.enableFifo(self.imuRate)
+            self.threads.append(threading.Thread(target=self.runPeriodic, args=('imu', 1 / self.drainRate, self.sampleImuFifo), daemon=True))
+        elif self.mpu is not None:
+            self.threads.append(threading.Thread(target=self.runPeriodic, args=('imu', 1 / self.imuRate, self.sampleImu), daemon=True))
+        if self.mag is not None:
+            self.mag.setRate(self.magRate)
+            self.threads.append(threading.Thread(target=self.runPeriodic, args=('mag', 1 / self.magRate, self.sampleMag), daemon=True))
+        if self.gps is not None:
+            self.threads.append(threading.Thread(target=self.runGps, daemon=True))
+
+        for thread in self.threads:
+            thread.start()
+
+    def stop(self):
+
+        self.stopEvent.set()
+        for thread in self.threads:
+            thread.join(2.0)
+        self.threads = []
+        if self.mpu is not None and self.imuFifo:
+            self.mpu.disableFifo()
+
+    def runPeriodic(self, name, period, sample):
+
+        # Absolute deadlines, so the rate does not drift with the time spent reading
+        nextTime = time.monotonic()
+        while not self.stopEvent.is_set():
+            try:
+                sample()
+            except (OSError, ValueError):
+                self.errors[name] += 1
+
+            nextTime += period
+            delay = nextTime - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            elif delay < -period:
+                self.overruns[name] += int(-delay // period)
+                nextTime = time.monotonic()
+
+    def sampleImu(self):
+
+        Ax, Ay, Az, Gx, Gy, Gz = self.mpu.readAngles()
+        now = time.time()
+
+        latest = self.imu.latest()
+        dt = now - latest['time'] if latest is not None else 0.0
+        pitch, roll = self.mpu.updateAngles(Ax, Ay, Az, Gx, Gy, Gz, dt)
+
+        self.imu.append((now, Ax, Ay, Az, Gx, Gy, Gz, pitch, roll))
+
+    def sampleImuFifo(self):
+
+        times, samples = self.mpu.readFifo()
+        if len(times) == 0:
+            return
+
+        batch = np.zeros(len(times), dtype=imuDtype)
+        batch['time'] = times
+        for i, name in enumerate(['ax', 'ay', 'az', 'gx', 'gy', 'gz']):
+            batch[name] = samples[:, i]
+
+        # The filter is recursive: one step per sample, with the timestamps of the FIFO
+        latest = self.imu.latest()
+        previous = latest['time'] if latest is not None else times[0]
+        for i in range(len(batch)):
+            batch['pitch'][i], batch['roll'][i] = self.mpu.updateAngles(*samples[i], times[i] - previous)
+            previous = times[i]
+
+        self.imu.extend(batch)
+
+    def sampleMag(self):
+
+        # Waits for the data-ready bit (up to one period), so every sample is stored once
+        pitch, roll = self.attitude()
+        if self.mag.computeYawTiltCompensation(pitch, roll, timeout=1 / self.magRate) is None:
+            return
+        Mx, My, Mz = self.mag.Mx, self.mag.My, self.mag.Mz
+        self.magnetometer.append((time.time(), Mx, My, Mz, self.mag.yaw))
+
+    def runGps(self):
+
+        # Invalid sentences are counted by the parser (gps.parser), only port errors here
+        while not self.stopEvent.is_set():
+            try:
+                self.gps.read()
+            except OSError:
+                self.errors['gps'] += 1
+                self.stopEvent.wait(0.1)
+
+    # Newest values (any thread)
+
+    def attitude(self):
+        latest = self.imu.latest()
+        return (float(latest['pitch']), float(latest['roll'])) if latest is not None else (0.0, 0.0)
+
+    def heading(self):
+        latest = self.magnetometer.latest()
+        return float(latest['yaw']) if latest is not None else None
+
+    def position(self):
+        return self.fixes.latest()
+
+    def pose(self, at=None):
+
+        # Heading, attitude and position for georeference.Georeferencer, None until there is a heading and a fix
+        # at: time (time.time(), e.g. the arrival of a radar frame) of the pose, interpolated from the buffered samples;
+        # newest values if None
+        if at is None:
+            heading = self.heading()
+            fix = self.position()
+            if heading is None or fix is None:
+                return None
+            pitch, roll = self.attitude()
+            return Pose(heading, pitch, roll, float(fix['latitude']), float(fix['longitude']), float(fix['altitude']))
+
+        heading = interpolate(self.magnetometer.last(self.magnetometer.capacity), at, ['yaw'], angles=True)
+        position = interpolate(self.fixes.last(self.fixes.capacity), at, ['latitude', 'longitude', 'altitude'])
+        if heading is None or position is None:
+            return None
+        attitude = interpolate(self.imu.last(self.imu.capacity), at, ['pitch', 'roll']) or [0.0, 0.0]
+        return Pose(float(heading[0]), float(attitude[0]), float(attitude[1]), *(float(value) for value in position))
+
+    def rates(self, window=1.0):
+
+        # Measured sample rates (Hz) over the last `window` seconds
+        now = time.time()
+        rates = {}
+        for name, ring in [('imu', self.imu), ('mag', self.magnetometer), ('gps', self.fixes)]:
+            times = ring.last(ring.capacity)['time']
+            rates[name] = np.count_nonzero(times > now - window) / window
+        return rates
@@ -0,0 +1,249 @@
+import time
+import numpy as np
+
+# In-process stand-ins for the I2C sensors, to test and benchmark the drivers without the Pi:
+#   FakeSMBus: same calls as smbus.SMBus, each transaction takes its time on the bus (9 bits per byte)
+#   FakeMPU6050: registers updated at the sample rate from a known motion, FIFO with overflow
+#   FakeHMC5883L: earth field seen from a rotating, tilted sensor, with hard/soft iron distortion and data-ready bit
+
+class FakeSMBus:
+
+    def __init__(self, devices, busSpeed=100000):
+
+        self.devices = devices # {address: device}
+        self.busSpeed = busSpeed # Hz (Raspberry Pi default: 100 kHz, fast mode: 400 kHz)
+
+        # Statistics
+        self.transactions = 0
+        self.bytesTransferred = 0
+
+    def transfer(self, address, nOfBytes):
+
+        # Bus time of a transaction of nOfBytes (addresses, register and data), returns the device
+        if address not in self.devices:
+            raise OSError(121, 'Remote I/O error')
+        self.transactions += 1
+        self.bytesTransferred += nOfBytes
+        time.sleep(9 * nOfBytes / self.busSpeed)
+        return self.devices[address]
+
+    def write_byte_data(self, address, register, value):
+        self.transfer(address, 3).write(register, [value])
+
+    def read_byte_data(self, address, register):
+        return self.transfer(address, 4).read(register, 1)[0]
+
+    def write_i2c_block_data(self, address, register, values):
+        self.transfer(address, 2 + len(values)).write(register, list(values))
+
+    def read_i2c_block_data(self, address, register, length=32):
+        if length > 32:
+            raise ValueError("SMBus block reads are limited to 32 bytes")
+        return self.transfer(address, 3 + length).read(register, length)
+
+    def close(self):
+        pass
+
+class FakeMPU6050:
+
+    # Pitch and roll oscillate (amplitude º, frequency Hz): the accelerometer measures gravity, the gyroscope the angular
+    # rates (x: pitch, y: roll), plus noise (g, º/s). The data registers hold the newest sample of the sample rate
+    # (1 kHz / (1 + divider) with the low-pass filter on, 8 kHz otherwise) and the FIFO collects them if enabled
+
+    accelSensitivity = 16384.0
+    gyroSensitivity = 131.0
+    fifoSize = 1024
+
+    def __init__(self, amplitude=(20.0, 10.0), frequency=(0.5, 0.3), noise=(0.01, 0.5), seed=0):
+
+        self.amplitude = np.array(amplitude)
+        self.frequency = np.array(frequency)
+        self.startTime = time.time()
+
+        # Noise of each sample index (repeats every 4096 samples), so a sample can be rebuilt to check a reading
+        rng = np.random.default_rng(seed)
+        self.noise = rng.normal(0, 1, (4096, 6)) * np.repeat(noise, 3)
+
+        self.registers = bytearray(128)
+        self.registers[0x6B] = 0x40 # Sleep after power on
+        self.registers[0x75] = 0x68 # WHO_AM_I
+
+        self.fifo = bytearray()
+        self.fifoNext = 0 # Index of the next sample written to the FIFO
+        self.fifoTimes = [] # Time of every sample written to the FIFO
+        self.overflow = False
+
+    @property
+    def sampleRate(self):
+        base = 1000 if 1 <= self.registers[0x1A] & 0x07 <= 6 else 8000
+        return base / (1 + self.registers[0x19])
+
+    def sampleIndex(self, t):
+        return int((t - self.startTime) * self.sampleRate)
+
+    def sampleTimes(self, indices):
+        return self.startTime + np.asarray(indices) / self.sampleRate
+
+    def rawSamples(self, indices):
+
+        # Registers of the given samples: rows of accel x, y, z, temperature, gyro x, y, z (int16)
+        indices = np.atleast_1d(indices)
+        phase = 2 * np.pi * self.frequency * (indices[:, None] / self.sampleRate)
+        pitch, roll = np.radians(self.amplitude * np.sin(phase)).T
+        pitchRate, rollRate = (self.amplitude * 2 * np.pi * self.frequency * np.cos(phase)).T
+
+        accel = np.stack([-np.cos(pitch) * np.sin(roll), np.sin(pitch), np.cos(pitch) * np.cos(roll)], axis=1)
+        gyro = np.stack([pitchRate, rollRate, np.zeros(len(indices))], axis=1)
+        noise = self.noise[indices % len(self.noise)]
+        temperature = np.full((len(indices), 1), (25 - 36.53) * 340)
+
+        raw = np.hstack([(accel + noise[:, :3]) * self.accelSensitivity, temperature, (gyro + noise[:, 3:]) * self.gyroSensitivity])
+        return np.clip(np.round(raw), -32768, 32767).astype(np.int16)
+
+    def update(self, now):
+
+        # Samples taken since the last access go to the FIFO (if enabled), the oldest bytes are lost when it is full
+        if not self.registers[0x6A] & 0x40 or not self.registers[0x23] & 0x78:
+            return
+        last = self.sampleIndex(now)
+        if last < self.fifoNext:
+            return
+        indices = np.arange(max(self.fifoNext, last - self.fifoSize // 12), last + 1)
+        self.fifo += self.rawSamples(indices)[:, [0, 1, 2, 4, 5, 6]].astype('>i2').tobytes()
+        self.fifoTimes.extend(self.sampleTimes(indices).tolist())
+        self.fifoNext = last + 1
+
+        if len(self.fifo) > self.fifoSize:
+            del self.fifo[:len(self.fifo) - self.fifoSize]
+            self.overflow = True
+
+    def resetFifo(self, now):
+        self.fifo = bytearray()
+        self.fifoNext = self.sampleIndex(now) + 1
+        self.overflow = False
+
+    def read(self, register, length):
+
+        now = time.time()
+        self.update(now)
+
+        # FIFO_R_W does not auto-increment: every byte comes out of the FIFO
+        if register == 0x74:
+            data = list(self.fifo[:length]) + [0] * max(0, length - len(self.fifo))
+            del self.fifo[:length]
+            return data
+
+        # Data registers of the current sample
+        block = self.rawSamples(self.sampleIndex(now))[0].astype('>i2').tobytes()
+        values = []
+        for r in range(register, register + length):
+            if 0x3B <= r <= 0x48:
+                values.append(block[r - 0x3B])
+            elif r == 0x3A:
+                values.append(0x10 if self.overflow else 0x00)
+                self.overflow = False # Cleared on read
+            elif r in (0x72, 0x73):
+                values.append(len(self.fifo) >> 8 if r == 0x72 else len(self.fifo) & 0xFF)
+            else:
+                values.append(self.registers[r])
+        return values
+
+    def write(self, register, values):
+
+        now = time.time()
+        self.update(now)
+        for r, value in enumerate(values, register):
+            if r == 0x6A and value & 0x04:
+                self.resetFifo(now)
+                value &= ~0x04
+            if r == 0x6A and value & 0x40 and not self.registers[0x6A] & 0x40:
+                self.fifoNext = self.sampleIndex(now) + 1
+            self.registers[r] = value
+
+def levelToBody(vectors, pitch, roll):
+
+    # Vectors (n, 3) in the horizontal frame to the frame of a sensor with the attitude of MPU6050 (º, pitch about x, roll
+    # about y): inverse of the rotation used by HMC5883L.tiltCompensatedHeading
+    pitch = np.radians(pitch)
+    roll = np.radians(roll)
+    x, y, z = np.atleast_2d(vectors).T
+
+    y1 = np.cos(pitch) * y + np.sin(pitch) * z
+    z1 = -np.sin(pitch) * y + np.cos(pitch) * z
+    return np.column_stack([np.cos(roll) * x - np.sin(roll) * z1, y1, np.sin(roll) * x + np.cos(roll) * z1])
+
+class FakeHMC5883L:
+
+    # The sensor turns (yawRate º/s) with its attitude oscillating (amplitude º, frequency Hz, as FakeMPU6050) in an
+    # earth field (horizontal, vertical: Gauss). Readings are distorted by a hard iron offset (counts) and a soft iron matrix,
+    # plus noise (counts). Registers are updated at the configured output rate and the status register has the data-ready bit
+
+    gain = 1090.0 # Counts per Gauss (default gain)
+    rates = [0.75, 1.5, 3, 7.5, 15, 30, 75]
+
+    def __init__(self, yawRate=30.0, amplitude=(20.0, 10.0), frequency=(0.5, 0.3), field=(0.25, 0.40),
+                 hardIron=(120.0, -80.0, 40.0), softIron=((1.10, 0.05, 0.0), (0.05, 0.90, 0.02), (0.0, 0.02, 1.0)), noise=2.0, seed=0):
+
+        self.yawRate = yawRate
+        self.amplitude = np.array(amplitude)
+        self.frequency = np.array(frequency)
+        self.field = field
+        self.hardIron = np.array(hardIron)
+        self.softIron = np.array(softIron)
+        self.startTime = time.time()
+
+        rng = np.random.default_rng(seed)
+        self.noise = rng.normal(0, noise, (4096, 3))
+
+        self.registers = bytearray(13)
+        self.registers[0x00] = 0x10 # 15 Hz
+        self.registers[0x01] = 0x20
+        self.registers[0x02] = 0x01 # Single measurement (idle)
+        self.registers[0x0A:0x0D] = b'H43' # Identification
+        self.lastRead = -1 # Index of the last sample read
+
+    @property
+    def outputRate(self):
+        return self.rates[min((self.registers[0x00] >> 2) & 0x07, 6)]
+
+    def sampleIndex(self, t):
+        return int((t - self.startTime) * self.outputRate)
+
+    def attitude(self, t):
+        # Heading (º, as computed by HMC5883L), pitch and roll (º) at times t
+        t = np.atleast_1d(t) - self.startTime
+        pitch, roll = (self.amplitude * np.sin(2 * np.pi * self.frequency * t[:, None])).T
+        return (self.yawRate * t) % 360, pitch, roll
+
+    def rawReadings(self, heading, pitch, roll, indices=None):
+
+        # Raw counts (n, 3) seen with the given heading and attitude (º)
+        heading = np.radians(heading)
+        level = np.column_stack([self.field[0] * np.cos(heading), self.field[0] * np.sin(heading), np.full(len(heading), -self.field[1])])
+        raw = levelToBody(level, pitch, roll) @ self.softIron.T * self.gain + self.hardIron
+        if indices is not None:
+            raw += self.noise[np.asarray(indices) % len(self.noise)]
+        return np.clip(np.round(raw), -2048, 2047).astype(np.int16)
+
+    def read(self, register, length):
+
+        now = time.time()
+        index = self.sampleIndex(now)
+        x, y, z = self.rawReadings(*self.attitude(self.startTime + index / self.outputRate), indices=[index])[0]
+        data = np.array([x, z, y], dtype='>i2').tobytes()
+
+        values = []
+        for r in range(register, register + length):
+            r = r % 13 # The register pointer wraps around
+            if 0x03 <= r <= 0x08:
+                values.append(data[r - 0x03])
+                self.lastRead = index # Reading the data clears the data-ready bit
+            elif r == 0x09:
+                values.append(0x01 if index > self.lastRead else 0x00)
+            else:
+                values.append(self.registers[r])
+        return values
+
+    def write(self, register, values):
+        for r, value in enumerate(values, register):
+            self.registers[r] = value
@@ -0,0 +1,77 @@
+import queue
+import threading
+import time
+from collections import namedtuple
+from tlv import headerStruct, decodePayload, Framer, maxPacketLength
+
+# One decoded packet: host time of arrival (time.time() and time.monotonic()), packet header fields and the columnar frame
+# (see tlv.frameDtype)
+RadarFrame = namedtuple('RadarFrame', ['timestamp', 'monotonic', 'frameNumber', 'timeCpuCycles', 'numOfDetectedObj', 'frame'])
+
+class SerialReader(threading.Thread):
+
+    def __init__(self, port, queueSize=32, readSize=65536, maxPacketLength=maxPacketLength):
+
+        super().__init__(daemon=True)
+
+        self.port = port
+        self.readSize = readSize # Maximum number of bytes per read
+
+        # Decoded frames, the oldest frame is dropped when consumers fall behind
+        self.frames = queue.Queue(maxsize=queueSize)
+
+        # Splits the received bytes into packets
+        self.framer = Framer(maxPacketLength)
+
+        # Statistics
+        self.bytesRead = 0
+        self.framesDecoded = 0
+        self.framesDropped = 0
+
+        self.stopEvent = threading.Event()
+
+    def run(self):
+
+        while not self.stopEvent.is_set():
+
+            # Read everything waiting in the port in one call (blocks up to the port timeout when idle)
+            nOfBytes = min(max(self.port.in_waiting, 1), self.readSize)
+            data = self.port.read(nOfBytes)
+            if not data:
+                continue
+
+            self.bytesRead += len(data)
+            timestamp = time.time()
+            monotonic = time.monotonic()
+
+            for header, payload in self.framer.packetsIn(data):
+                sync, version, packetLength, platform, frameNumber, timeCpuCycles, numOfDetectedObj, numOfTlvs, subFrameNumber = headerStruct.unpack(header)
+                frame = decodePayload(payload, numOfDetectedObj, numOfTlvs)
+                self.putFrame(RadarFrame(timestamp, monotonic, frameNumber, timeCpuCycles, numOfDetectedObj, frame))
+
+    def putFrame(self, radarFrame):
+
+        # Never block the reader: if the queue is full, drop the oldest frame
+        while True:
+            try:
+                self.frames.put_nowait(radarFrame)
+                break
+            except queue.Full:
+                try:
+                    self.frames.get_nowait()
+                    self.framesDropped += 1
+                except queue.Empty:
+                    pass
+
+        self.framesDecoded += 1
+
+    def getFrame(self, timeout=None):
+
+        try:
+            return self.frames.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def stop(self):
+        self.stopEvent.set()
+        self.join()
@@ -1,17 +1,32 @@
-import RPi.GPIO as GPIO
 import time
 
+try:
+    import RPi.GPIO as GPIO
+except ImportError:
+    GPIO = None # Only on the Pi: off the Pi pass a mock backend (see servo_sim.py)
+
 class Servo:
-    def __init__(self, servo_pin):
+    def __init__(self, servo_pin, slewRate=300.0, settleTime=0.1, gpio=None):
         self.servo_pin = servo_pin
+        self.gpio = gpio if gpio is not None else GPIO
+
+        # Settle time estimate of a move: |angle change| / slewRate + settleTime (instead of a fixed 1 s sleep)
+        self.slewRate = slewRate # º/s (datasheet speed, e.g. 0.2 s/60º = 300 º/s)
+        self.settleTime = settleTime # s to stop oscillating once the angle is reached
+
+        # Last move (see setAngle)
+        self.angle = None # Commanded angle
+        self.startAngle = None
+        self.moveStart = 0.0
+        self.moveEnd = 0.0 # Estimated time when the servo has settled (time.monotonic)
 
     def setup(self):
         # Setup GPIO
-        GPIO.setmode(GPIO.BCM)
-        GPIO.setup(self.servo_pin, GPIO.OUT)
+        self.gpio.setmode(self.gpio.BCM)
+        self.gpio.setup(self.servo_pin, self.gpio.OUT)
     
         # Create PWM objects
-        self.pin_pwm = GPIO.PWM(self.servo_pin, 50)
+        self.pin_pwm = self.gpio.PWM(self.servo_pin, 50)
 
         # Start PWM
         self.pin_pwm.start(0)
@@ -19,14 +34,41 @@ class Servo:
     def calibrate(self):
         # Calibrate the servo to 0 degrees
         self.setAngle(0)
-        time.sleep(1)
+        self.wait()
 
     def setAngle(self, angle):
+        # Starts the move and returns immediately, with the estimated time (time.monotonic) when the servo has settled
+        # (the first move assumes the longest travel, the position is unknown)
+        now = time.monotonic()
+        self.startAngle = self.currentAngle(now)
+        travel = abs(angle - self.startAngle) if self.startAngle is not None else 180
+
         duty_cycle = 2 + (angle / 18) # Convert angle to duty cycle
-        GPIO.output(self.servo_pin, True)
+        self.gpio.output(self.servo_pin, True)
         self.pin_pwm.ChangeDutyCycle(duty_cycle)
-        time.sleep(1)
+
+        self.angle = angle
+        self.moveStart = now
+        self.moveEnd = now + travel / self.slewRate + self.settleTime
+        return self.moveEnd
+
+    def currentAngle(self, now=None):
+        # Estimated angle (moving at slewRate from the angle where the last move started), None before the first move
+        if self.startAngle is None:
+            return self.angle
+        now = time.monotonic() if now is None else now
+        travel = self.slewRate * max(0.0, now - self.moveStart)
+        if travel >= abs(self.angle - self.startAngle):
+            return self.angle
+        return self.startAngle + travel if self.angle > self.startAngle else self.startAngle - travel
+
+    def settled(self, now=None):
+        return (time.monotonic() if now is None else now) >= self.moveEnd
+
+    def wait(self):
+        # Block until the last move has settled
+        time.sleep(max(0.0, self.moveEnd - time.monotonic()))
 
     def stop(self):
-        GPIO.output(self.servo_pin, False)
-        self.pin_pwm.ChangeDutyCycle(0)
+        self.gpio.output(self.servo_pin, False)
+        self.pin_pwm.ChangeDutyCycle(0)
\ No newline at end of file
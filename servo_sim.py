@@ -0,0 +1,80 @@
+import time
+
+# Stand-in for RPi.GPIO (the calls used by servo.Servo), to test and benchmark the scan without the Pi
+# Each PWM pin drives a simulated servo: the duty cycle gives the target angle (duty = 2 + angle / 18) and the shaft
+# moves towards it at slewRate º/s (the real speed, which may differ from the estimate in Servo)
+
+class MockPWM:
+
+    def __init__(self, gpio, pin, frequency):
+
+        self.gpio = gpio
+        self.pin = pin
+        self.frequency = frequency
+        self.dutyCycle = 0.0
+
+    def start(self, dutyCycle):
+        self.ChangeDutyCycle(dutyCycle)
+
+    def ChangeDutyCycle(self, dutyCycle):
+        self.gpio.command(self.pin, dutyCycle)
+        self.dutyCycle = dutyCycle
+
+    def stop(self):
+        self.ChangeDutyCycle(0)
+
+class MockGPIO:
+
+    BCM = 11
+    BOARD = 10
+    OUT = 0
+    IN = 1
+
+    def __init__(self, slewRate=300.0, initialAngle=90.0):
+
+        self.slewRate = slewRate
+        self.initialAngle = initialAngle
+        self.mode = None
+        self.pins = {} # pin: direction
+        self.levels = {} # pin: output level
+
+        # Simulated shafts: pin -> (angle when the last command was received, time, target angle)
+        self.shafts = {}
+        self.commands = [] # (time, pin, duty cycle)
+
+    def setmode(self, mode):
+        self.mode = mode
+
+    def setup(self, pin, direction):
+        self.pins[pin] = direction
+
+    def output(self, pin, level):
+        self.levels[pin] = bool(level)
+
+    def PWM(self, pin, frequency):
+        return MockPWM(self, pin, frequency)
+
+    def cleanup(self):
+        self.pins.clear()
+
+    def command(self, pin, dutyCycle):
+
+        now = time.monotonic()
+        self.commands.append((now, pin, dutyCycle))
+        angle = self.angle(pin, now)
+        if dutyCycle > 0:
+            self.shafts[pin] = (angle, now, (dutyCycle - 2) * 18)
+        else:
+            self.shafts[pin] = (angle, now, angle) # No pulses: the servo stays where it is
+
+    def angle(self, pin, now=None):
+
+        # Simulated shaft angle
+        now = time.monotonic() if now is None else now
+        if pin not in self.shafts:
+            return self.initialAngle
+        startAngle, startTime, target = self.shafts[pin]
+        travel = self.slewRate * max(0.0, now - startTime) # Before the last command: the angle it was received at
+        if travel >= abs(target - startAngle):
+            return target
+        return startAngle + travel if target > startAngle else startAngle - travel
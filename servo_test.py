@@ -1,38 +1,32 @@
-import RPi.GPIO as GPIO
 import time
+from servo import Servo, GPIO
+from servo_sim import MockGPIO
 
 # Define servo pins
 pitch_pin = 12
 yaw_pin = 13
 
-# Setup GPIO
-GPIO.setmode(GPIO.BCM)
-GPIO.setup(pitch_pin, GPIO.OUT)
-GPIO.setup(yaw_pin, GPIO.OUT)
+# Servos on the Pi, simulated ones (servo_sim.py) anywhere else
+gpio = GPIO if GPIO is not None else MockGPIO()
 
-# Create PWM instances
-pitch_pwm = GPIO.PWM(pitch_pin, 50)  # 50 Hz
-yaw_pwm = GPIO.PWM(yaw_pin, 50)    # 50 Hz
+pitch = Servo(pitch_pin, gpio=gpio)
+yaw = Servo(yaw_pin, gpio=gpio)
+pitch.setup()
+yaw.setup()
 
-# Start PWM
-pitch_pwm.start(0)
-yaw_pwm.start(0)
+hold = 0.5 # Seconds at each angle once both servos have settled
 
-# Function to set angle
-def set_angle(angle):
-    duty_cycle = 2 + (angle/18)  # Convert angle to duty cycle
-    GPIO.output(pitch_pin, True)
-    pitch_pwm.ChangeDutyCycle(duty_cycle)
-    GPIO.output(yaw_pin, True)
-    yaw_pwm.ChangeDutyCycle(duty_cycle)
-    time.sleep(1)
-    GPIO.output(pitch_pin, False)
-    GPIO.output(yaw_pin, False)
-    pitch_pwm.ChangeDutyCycle(0)
-    yaw_pwm.ChangeDutyCycle(0)
-
-while True:
-    for angle in [0,90,180]:
-        print(f"Setting pitch and yaw to {angle} degrees")
-        set_angle(angle)
-        time.sleep(1)
\ No newline at end of file
+try:
+    while True:
+        for angle in [0,90,180]:
+            # Both servos move at the same time, wait for the slower one (settle time estimate instead of a fixed sleep)
+            start = time.monotonic()
+            pitch.setAngle(angle)
+            yaw.setAngle(angle)
+            pitch.wait()
+            yaw.wait()
+            print(f"Pitch and yaw at {angle} degrees after {time.monotonic() - start:.2f} s")
+            time.sleep(hold)
+except KeyboardInterrupt:
+    pitch.stop()
+    yaw.stop()
\ No newline at end of file
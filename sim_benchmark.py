@@ -0,0 +1,42 @@
+import time
+import matplotlib
+matplotlib.use('Agg') # No figure windows during the benchmark
+from urad import *
+from radar_sim import TlvGenerator, FakeSerialPort
+
+# Maximum sustainable frame rate of urad.Radar, with synthetic traffic instead of the IWR6843
+# Frames are produced as fast as they are consumed (unthrottled), with some injected errors
+
+pointCounts = [100, 500, 1000, 2000, 5000] # Points per frame
+nOfFrames = 200 # Frames per measurement
+
+print("Points/frame | unpackData+extractData (frames/s) | background reader (frames/s)")
+
+for nOfPoints in pointCounts:
+
+    # Synchronous path (unpackData + extractData)
+    generator = TlvGenerator(nOfPoints = nOfPoints, seed = 1, garbage = 0.05, corruptSync = 0.02, corruptTlv = 0.02, truncate = 0.02)
+    radar = Radar(None, None, 'SIM', None, None, nOfFrames)
+    radar.enhancedPort = None
+    radar.standardPort = FakeSerialPort(generator, realTime = False)
+
+    start = time.perf_counter()
+    for cycleCounter in range(1, nOfFrames+1):
+        if radar.unpackData():
+            radar.extractData(cycleCounter)
+    syncRate = nOfFrames / (time.perf_counter() - start)
+
+    # Background reader
+    generator = TlvGenerator(nOfPoints = nOfPoints, seed = 1, garbage = 0.05, corruptSync = 0.02, corruptTlv = 0.02, truncate = 0.02)
+    radar = Radar(None, None, 'SIM', None, None, nOfFrames)
+    radar.enhancedPort = None
+    radar.standardPort = FakeSerialPort(generator, realTime = False)
+
+    radar.startAcquisition(queueSize = nOfFrames)
+    start = time.perf_counter()
+    for cycleCounter in range(1, nOfFrames+1):
+        radar.readFrame(cycleCounter)
+    readerRate = nOfFrames / (time.perf_counter() - start)
+    radar.closePorts()
+
+    print(f"{nOfPoints:12d} | {syncRate:33.1f} | {readerRate:28.1f}")
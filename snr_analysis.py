@@ -2,6 +2,7 @@ import matplotlib.pyplot as plt
 import matplotlib.patches as patches
 import numpy as np
 import pandas as pd
+from metrics import cycleMetrics
 
 class Test:
     def __init__(self, filename, testname, axis, distance, threshold):
@@ -37,9 +38,11 @@ class Test:
     def averageData(self):
 
         self.snr = 10 * np.log10(self.filteredData.snr) # Convert to dB
-        snr_avg = self.snr.groupby(self.cycle).mean()
-        self.snr_plot = snr_avg.values
-        self.cycle_plot = snr_avg.index.values
+
+        # Per-cycle statistics of the filtered data in one grouped pass (see metrics.py)
+        self.metrics = cycleMetrics(self.filteredData, self.distance, axis=self.axis)
+        self.snr_plot = self.metrics.snr_db.values
+        self.cycle_plot = self.metrics.index.values
 
     def plotData(self):
         plt.plot(self.cycle_plot, self.snr_plot)
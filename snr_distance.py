@@ -2,19 +2,23 @@ import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 from test_class import *
+from result_cache import ResultCache
 
 # Estimate SNR variation with distance with indoors tests
 
 threshold = 0.25
 
+# Cache of parsed, filtered and averaged data (only changed files or parameters are recomputed)
+cache = ResultCache()
+
 # Model 1: BASE ONLY (no reflectors)
 
-test1 = Test('BASE_ONLY_0.5m.csv', '0.5 m', 'y', 0.5, threshold)
-test2 = Test('BASE_ONLY_1m.csv', '1.0 m', 'y', 1.0, threshold)
-test3 = Test('BASE_ONLY_1.5m.csv', '1.5 m', 'y', 1.5, threshold)
-test4 = Test('BASE_ONLY_2m.csv', '2.0 m', 'y', 2.0, threshold)
-test5 = Test('BASE_ONLY_2.5m.csv', '2.5 m', 'y', 2.5, threshold)
-test6 = Test('BASE_ONLY_3m.csv', '3.0 m', 'y', 3.0, threshold)
+test1 = Test('BASE_ONLY_0.5m.csv', '0.5 m', 'y', 0.5, threshold, cache=cache)
+test2 = Test('BASE_ONLY_1m.csv', '1.0 m', 'y', 1.0, threshold, cache=cache)
+test3 = Test('BASE_ONLY_1.5m.csv', '1.5 m', 'y', 1.5, threshold, cache=cache)
+test4 = Test('BASE_ONLY_2m.csv', '2.0 m', 'y', 2.0, threshold, cache=cache)
+test5 = Test('BASE_ONLY_2.5m.csv', '2.5 m', 'y', 2.5, threshold, cache=cache)
+test6 = Test('BASE_ONLY_3m.csv', '3.0 m', 'y', 3.0, threshold, cache=cache)
 
 tests1 = [test1, test2, test3, test4, test5, test6]
 
@@ -86,18 +90,18 @@ plt.show()
 
 # Model 2: UNDER RFL (one reflector under the UAV)
 
-test7 = Test('UNDER_RFL_0.5m.csv', '0.5 m', 'y', 0.5, threshold)
-test8 = Test('UNDER_RFL_1m.csv', '1.0 m', 'y', 1.0, threshold)
-test9 = Test('UNDER_RFL_1.5m.csv', '1.5 m', 'y', 1.5, threshold)
-test10 = Test('UNDER_RFL_2m.csv', '2.0 m', 'y', 2.0, threshold)
-test11 = Test('UNDER_RFL_2.5m.csv', '2.5 m', 'y', 2.5, threshold)
-test12 = Test('UNDER_RFL_3m.csv', '3.0 m', 'y', 3.0, threshold)
-test13 = Test('UNDER_RFL_4m.csv', '4 m', 'y', 4.0, threshold)
-test14 = Test('UNDER_RFL_5m.csv', '5 m', 'y', 5.0, threshold)
-test15 = Test('UNDER_RFL_7.5m.csv', '7.5 m', 'y', 7.5, threshold)
-test16 = Test('UNDER_RFL_8.9m.csv', '8.9 m', 'y', 8.9, threshold)
-test17 = Test('UNDER_RFL_9.5m.csv', '9.5 m', 'y', 9.5, threshold)
-test18 = Test('UNDER_RFL_10m.csv', '10 m', 'y', 10.0, threshold)
+test7 = Test('UNDER_RFL_0.5m.csv', '0.5 m', 'y', 0.5, threshold, cache=cache)
+test8 = Test('UNDER_RFL_1m.csv', '1.0 m', 'y', 1.0, threshold, cache=cache)
+test9 = Test('UNDER_RFL_1.5m.csv', '1.5 m', 'y', 1.5, threshold, cache=cache)
+test10 = Test('UNDER_RFL_2m.csv', '2.0 m', 'y', 2.0, threshold, cache=cache)
+test11 = Test('UNDER_RFL_2.5m.csv', '2.5 m', 'y', 2.5, threshold, cache=cache)
+test12 = Test('UNDER_RFL_3m.csv', '3.0 m', 'y', 3.0, threshold, cache=cache)
+test13 = Test('UNDER_RFL_4m.csv', '4 m', 'y', 4.0, threshold, cache=cache)
+test14 = Test('UNDER_RFL_5m.csv', '5 m', 'y', 5.0, threshold, cache=cache)
+test15 = Test('UNDER_RFL_7.5m.csv', '7.5 m', 'y', 7.5, threshold, cache=cache)
+test16 = Test('UNDER_RFL_8.9m.csv', '8.9 m', 'y', 8.9, threshold, cache=cache)
+test17 = Test('UNDER_RFL_9.5m.csv', '9.5 m', 'y', 9.5, threshold, cache=cache)
+test18 = Test('UNDER_RFL_10m.csv', '10 m', 'y', 10.0, threshold, cache=cache)
 
 tests2 = [test7, test8, test9, test10, test11, test12, test13, test14, test15, test16, test17, test18]
 
@@ -0,0 +1,190 @@
+import numpy as np
+
+# Cell coordinates are packed in one int64 key (21 bits per axis)
+keyBits = 21
+keyOffset = 1 << (keyBits - 1)
+
+maxPairs = 1 << 22 # Largest batch of (center, cell) or (center, point) pairs of a knnQuery step
+
+def cellKey(cells):
+    cells = cells + keyOffset
+    return (cells[..., 0] << (2 * keyBits)) | (cells[..., 1] << keyBits) | cells[..., 2]
+
+def cellOffsets(span):
+    # All integer offsets in [-span, span]³ (or [0, span) per axis if span is a 3-tuple)
+    if np.isscalar(span):
+        axis = np.arange(-span, span + 1)
+        axes = (axis, axis, axis)
+    else:
+        axes = tuple(np.arange(s) for s in span)
+    return np.stack(np.meshgrid(*axes, indexing='ij'), axis=-1).reshape(-1, 3)
+
+def shellOffsets(span):
+    # Integer offsets on the surface of the [-span, span]³ cube (max(|offset|) == span)
+    if span == 0:
+        return np.zeros((1, 3), dtype=np.int64)
+    axis = np.arange(-span, span + 1)
+    inner = np.arange(-span + 1, span)
+    faces = []
+    for side in [-span, span]:
+        a, b = np.meshgrid(axis, axis, indexing='ij') # x = ±span
+        faces.append(np.stack([np.full(a.size, side), a.ravel(), b.ravel()], axis=-1))
+        a, b = np.meshgrid(inner, axis, indexing='ij') # y = ±span
+        faces.append(np.stack([a.ravel(), np.full(a.size, side), b.ravel()], axis=-1))
+        a, b = np.meshgrid(inner, inner, indexing='ij') # z = ±span
+        faces.append(np.stack([a.ravel(), b.ravel(), np.full(a.size, side)], axis=-1))
+    return np.concatenate(faces)
+
+class VoxelGrid:
+
+    # Hashed voxel grid over a point cloud (one frame or a whole capture), built once and queried many times
+    # Points are sorted by cell, each occupied cell keeps the (start, end) range of its points
+    # Queries take a batch of centers/boxes and return (query index, point index) pairs,
+    # point indices refer to the rows of the points given to the constructor
+
+    def __init__(self, points, cellSize=0.25):
+
+        self.points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        self.cellSize = float(cellSize)
+
+        keys = cellKey(np.floor(self.points / self.cellSize).astype(np.int64))
+        self.order = np.argsort(keys, kind='stable')
+        self.sortedPoints = self.points[self.order]
+        self.keys, self.starts, counts = np.unique(keys[self.order], return_index=True, return_counts=True)
+        self.ends = self.starts + counts
+
+    def __len__(self):
+        return len(self.points)
+
+    def gatherCells(self, queryIndex, cells):
+
+        # Points of the given cells: (query index, position in sortedPoints) pairs
+        if len(self.keys) == 0 or len(cells) == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+        keys = cellKey(cells)
+        position = np.minimum(np.searchsorted(self.keys, keys), len(self.keys) - 1)
+        found = self.keys[position] == keys
+        queryIndex = queryIndex[found]
+        position = position[found]
+
+        starts = self.starts[position]
+        counts = self.ends[position] - starts
+        firstOfCell = np.cumsum(counts) - counts
+
+        pairQuery = np.repeat(queryIndex, counts)
+        pairPoint = np.repeat(starts - firstOfCell, counts) + np.arange(counts.sum())
+
+        return pairQuery, pairPoint
+
+    def radiusQuery(self, centers, radius):
+
+        # Points within radius (scalar or one per center) of each center
+        centers = np.asarray(centers, dtype=np.float64).reshape(-1, 3)
+        radius = np.broadcast_to(np.asarray(radius, dtype=np.float64), (len(centers),))
+        if len(centers) == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+        offsets = cellOffsets(int(np.ceil(radius.max() / self.cellSize)))
+        centerCells = np.floor(centers / self.cellSize).astype(np.int64)
+        cells = (centerCells[:, None, :] + offsets[None, :, :]).reshape(-1, 3)
+        queryIndex = np.repeat(np.arange(len(centers)), len(offsets))
+
+        pairQuery, pairPoint = self.gatherCells(queryIndex, cells)
+        distance2 = np.sum((self.sortedPoints[pairPoint] - centers[pairQuery])**2, axis=1)
+        inside = distance2 <= radius[pairQuery]**2
+
+        return pairQuery[inside], self.order[pairPoint[inside]]
+
+    def boxQuery(self, lower, upper):
+
+        # Points inside each axis-aligned box [lower, upper]
+        lower = np.asarray(lower, dtype=np.float64).reshape(-1, 3)
+        upper = np.asarray(upper, dtype=np.float64).reshape(-1, 3)
+        if len(lower) == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+        lowerCells = np.floor(lower / self.cellSize).astype(np.int64)
+        upperCells = np.floor(upper / self.cellSize).astype(np.int64)
+        offsets = cellOffsets(tuple(np.max(upperCells - lowerCells, axis=0) + 1))
+
+        cells = lowerCells[:, None, :] + offsets[None, :, :]
+        valid = np.all(cells <= upperCells[:, None, :], axis=2)
+        queryIndex = np.repeat(np.arange(len(lower)), len(offsets)).reshape(len(lower), -1)
+
+        pairQuery, pairPoint = self.gatherCells(queryIndex[valid], cells[valid])
+        points = self.sortedPoints[pairPoint]
+        inside = np.all((points >= lower[pairQuery]) & (points <= upper[pairQuery]), axis=1)
+
+        return pairQuery[inside], self.order[pairPoint[inside]]
+
+    def knnQuery(self, centers, k):
+
+        # k nearest points of each center: indices (-1 if there are fewer than k points) and distances
+        centers = np.asarray(centers, dtype=np.float64).reshape(-1, 3)
+        indices = np.full((len(centers), k), -1, dtype=np.int64)
+        distances = np.full((len(centers), k), np.inf)
+        if len(self.points) == 0 or len(centers) == 0 or k == 0:
+            return indices, distances
+
+        # Shells of cells around each center, nearest first: after shell s every point closer than s * cellSize has been
+        # visited, so a center is done when its k-th distance is within that
+        centerCells = np.floor(centers / self.cellSize).astype(np.int64)
+        pending = np.arange(len(centers))
+        span = 0
+        while len(pending) > 0:
+
+            # Shell larger than the occupied cells (e.g. a far outlier): brute force for the rest
+            offsets = shellOffsets(span)
+            if len(offsets) > len(self.keys):
+                break
+
+            for chunk in np.array_split(pending, int(np.ceil(len(pending) * len(offsets) / maxPairs))):
+                cells = (centerCells[chunk][:, None, :] + offsets[None, :, :]).reshape(-1, 3)
+                pairQuery, pairPoint = self.gatherCells(np.repeat(chunk, len(offsets)), cells)
+                self.mergeNearest(indices, distances, centers, pairQuery, self.order[pairPoint])
+
+            pending = pending[distances[pending, -1] > span * self.cellSize]
+            span += 1
+
+        # Remaining centers against every point
+        if len(pending) > 0:
+            indices[pending] = -1
+            distances[pending] = np.inf
+            for chunk in np.array_split(pending, int(np.ceil(len(pending) * len(self.points) / maxPairs))):
+                self.mergeNearest(indices, distances, centers, np.repeat(chunk, len(self.points)), np.tile(np.arange(len(self.points)), len(chunk)))
+
+        return indices, distances
+
+    def mergeNearest(self, indices, distances, centers, pairQuery, pairPoint):
+
+        # Merges (center, point) candidates with the nearest points found so far (rows of indices/distances, sorted)
+        if len(pairQuery) == 0:
+            return
+        k = indices.shape[1]
+        queries = np.unique(pairQuery)
+        known = indices[queries] >= 0
+        pairQuery = np.concatenate([np.repeat(queries, k)[known.ravel()], pairQuery])
+        pairPoint = np.concatenate([indices[queries][known], pairPoint])
+
+        distance = np.sqrt(np.sum((self.points[pairPoint] - centers[pairQuery])**2, axis=1))
+        order = np.lexsort((distance, pairQuery))
+        pairQuery, pairPoint, distance = pairQuery[order], pairPoint[order], distance[order]
+        counts = np.bincount(pairQuery, minlength=len(indices))
+        rank = np.arange(len(pairQuery)) - (np.cumsum(counts) - counts)[pairQuery]
+        keep = rank < k
+        indices[pairQuery[keep], rank[keep]] = pairPoint[keep]
+        distances[pairQuery[keep], rank[keep]] = distance[keep]
+
+    def countRadius(self, centers, radius):
+
+        # Number of points within radius of each center
+        pairQuery, pairPoint = self.radiusQuery(centers, radius)
+        return np.bincount(pairQuery, minlength=len(np.asarray(centers).reshape(-1, 3)))
+
+def splitPairs(pairQuery, pairPoint, nOfQueries):
+
+    # (query index, point index) pairs --> one array of point indices per query
+    order = np.argsort(pairQuery, kind='stable')
+    counts = np.bincount(pairQuery, minlength=nOfQueries)
+    return np.split(pairPoint[order], np.cumsum(counts)[:-1])
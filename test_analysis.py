@@ -4,35 +4,39 @@ import matplotlib.patches as patches
 import numpy as np
 import plotly.express as px
 from test_class import *
+from result_cache import ResultCache
 
 # Establish threshold percentage
 threshold = 0.2
 
+# Cache of parsed, filtered and averaged data (only changed files or parameters are recomputed)
+cache = ResultCache()
+
 # Tests with NO aluminum foil
 
-test1 = Test('test_floor_1.csv', '0.654 m, no aluminum', 'y', 0.654, threshold)
-test2 = Test('test_floor_2.csv', '0.326 m, no aluminum', 'y', 0.326, threshold)
-test3 = Test('test_floor_3.csv', '0.270 m, no aluminum', 'y', 0.270, threshold)
-test4 = Test('test_floor_4.csv', '0.173 m, no aluminum', 'y', 0.173, threshold)
-test5 = Test('test_floor_5.csv', '0.872 m, no aluminum', 'y', 0.872, threshold)
-test6 = Test('test_floor_6.csv', '1.12 m, no aluminum', 'y', 1.12, threshold)
-test7 = Test('test_floor_7.csv', '1.304 m, no aluminum', 'y', 1.304, threshold)
-test8 = Test('test_floor_8.csv', '1.641 m, no aluminum', 'y', 1.641, threshold)
-test9 = Test('test_floor_9.csv', '1.844 m, no aluminum', 'y', 1.844, threshold)
-test10 = Test('test_floor_10.csv', '2 m, no aluminum', 'y', 2, threshold)
+test1 = Test('test_floor_1.csv', '0.654 m, no aluminum', 'y', 0.654, threshold, cache=cache)
+test2 = Test('test_floor_2.csv', '0.326 m, no aluminum', 'y', 0.326, threshold, cache=cache)
+test3 = Test('test_floor_3.csv', '0.270 m, no aluminum', 'y', 0.270, threshold, cache=cache)
+test4 = Test('test_floor_4.csv', '0.173 m, no aluminum', 'y', 0.173, threshold, cache=cache)
+test5 = Test('test_floor_5.csv', '0.872 m, no aluminum', 'y', 0.872, threshold, cache=cache)
+test6 = Test('test_floor_6.csv', '1.12 m, no aluminum', 'y', 1.12, threshold, cache=cache)
+test7 = Test('test_floor_7.csv', '1.304 m, no aluminum', 'y', 1.304, threshold, cache=cache)
+test8 = Test('test_floor_8.csv', '1.641 m, no aluminum', 'y', 1.641, threshold, cache=cache)
+test9 = Test('test_floor_9.csv', '1.844 m, no aluminum', 'y', 1.844, threshold, cache=cache)
+test10 = Test('test_floor_10.csv', '2 m, no aluminum', 'y', 2, threshold, cache=cache)
 
 # Tests with aluminum foil
 
-test11 = Test('test_floor_1_al.csv', '0.193 m, aluminum', 'y', 0.193, threshold)
-test12 = Test('test_floor_2_al.csv', '0.341 m, aluminum', 'y', 0.341, threshold)
-test13 = Test('test_floor_3_al.csv', '0.476 m, aluminum', 'y', 0.476, threshold)
-test14 = Test('test_floor_4_al.csv', '0.644 m, aluminum', 'y', 0.644, threshold)
-test15 = Test('test_floor_5_al.csv', '0.801 m, aluminum', 'y', 0.801, threshold)
-test16 = Test('test_floor_6_al.csv', '0.995 m, aluminum', 'y', 0.995, threshold)
-test17 = Test('test_floor_7_al.csv', '1.229 m, aluminum', 'y', 1.229, threshold)
-test18 = Test('test_floor_8_al.csv', '1.494 m, aluminum', 'y', 1.494, threshold)
-test19 = Test('test_floor_9_al.csv', '1.782 m, aluminum', 'y', 1.782, threshold)
-test20 = Test('test_floor_10_al.csv', '2.014 m, aluminum', 'y', 2.014, threshold)
+test11 = Test('test_floor_1_al.csv', '0.193 m, aluminum', 'y', 0.193, threshold, cache=cache)
+test12 = Test('test_floor_2_al.csv', '0.341 m, aluminum', 'y', 0.341, threshold, cache=cache)
+test13 = Test('test_floor_3_al.csv', '0.476 m, aluminum', 'y', 0.476, threshold, cache=cache)
+test14 = Test('test_floor_4_al.csv', '0.644 m, aluminum', 'y', 0.644, threshold, cache=cache)
+test15 = Test('test_floor_5_al.csv', '0.801 m, aluminum', 'y', 0.801, threshold, cache=cache)
+test16 = Test('test_floor_6_al.csv', '0.995 m, aluminum', 'y', 0.995, threshold, cache=cache)
+test17 = Test('test_floor_7_al.csv', '1.229 m, aluminum', 'y', 1.229, threshold, cache=cache)
+test18 = Test('test_floor_8_al.csv', '1.494 m, aluminum', 'y', 1.494, threshold, cache=cache)
+test19 = Test('test_floor_9_al.csv', '1.782 m, aluminum', 'y', 1.782, threshold, cache=cache)
+test20 = Test('test_floor_10_al.csv', '2.014 m, aluminum', 'y', 2.014, threshold, cache=cache)
 
 tests = [test1, test2, test3, test4, test5, test6, test7, test8, test9, test10, test11, test12, test13, test14, test15, test16, test17, test18, test19, test20]
 
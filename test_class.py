@@ -4,17 +4,47 @@ from mpl_toolkits.mplot3d import Axes3D
 import numpy as np
 import pandas as pd
 import plotly.express as px
+import sys
+import capture
+import frame_store
+import metrics
+import spatial_index
+from capture import captureExtension, readCaptureDataFrame
+from metrics import cycleMetrics
+from spatial_index import VoxelGrid
+from pointcloud_export import lodFigure
+
+# Modules that compute each cached stage (its own code and the stages it reads from): editing one of them
+# invalidates the cached results of the stage (see ResultCache.key)
+stageCode = {'readData': [capture, frame_store]}
+stageCode['filterData'] = stageCode['readData'] + [sys.modules[__name__], spatial_index]
+stageCode['cycleMetrics'] = stageCode['filterData'] + [metrics]
 
 class Test:
-    def __init__(self, filename, testname, axis, distance, threshold):
+    def __init__(self, filename, testname, axis, distance, threshold, cache=None):
         self.filename = filename
         self.testname = testname
         self.axis = axis # Measurement configuration
         self.distance = distance
         self.threshold = threshold
+        self.cache = cache # ResultCache (see result_cache.py), None to always recompute
+
+    def cached(self, stage, compute, **params):
+
+        # Result of compute(), loaded from the cache if this file was already processed with the same parameters
+        if self.cache is None:
+            return compute()
+        return self.cache.getOrCompute(self.cache.key(self.filename, stage, code=stageCode[stage], **params), compute)
+
+    def loadData(self):
+        if self.filename.endswith(captureExtension):
+            return readCaptureDataFrame(self.filename) # Binary capture (.npc)
+        else:
+            return pd.read_csv(self.filename)
 
     def readData(self):
-        self.data = pd.read_csv(self.filename)
+        self.data = self.cached('readData', self.loadData)
+        self.index = None # Spatial index of the points, built on the first region query (see spatialIndex)
         self.cycle = self.data.cycle
         self.object = self.data.object
         self.x = self.data.x
@@ -31,12 +61,16 @@ class Test:
         lower_threshold = self.distance * (1 - self.threshold)
 
         # Remove data outside the limits depending on the axis
-        if self.axis == 'x':
-            self.filteredData = self.data[(self.data.x >= lower_threshold) & (self.data.x <= upper_threshold)]
-        elif self.axis == 'y':
-            self.filteredData = self.data[(self.data.y >= lower_threshold) & (self.data.y <= upper_threshold)] 
-        elif self.axis == 'z':
-            self.filteredData = self.data[(self.data.z >= lower_threshold) & (self.data.z <= upper_threshold)]
+        def compute():
+            if self.axis == 'x':
+                return self.data[(self.data.x >= lower_threshold) & (self.data.x <= upper_threshold)]
+            elif self.axis == 'y':
+                return self.data[(self.data.y >= lower_threshold) & (self.data.y <= upper_threshold)] 
+            elif self.axis == 'z':
+                return self.data[(self.data.z >= lower_threshold) & (self.data.z <= upper_threshold)]
+
+        self.filterParams = {'filter': 'axis', 'axis': self.axis, 'distance': self.distance, 'threshold': self.threshold}
+        self.filteredData = self.cached('filterData', compute, **self.filterParams)
 
     # Filtering for OUTDOORS tests (3D surfaces)
     def filterDataOutdoors(self, l, w, h, threshold):
@@ -60,18 +94,34 @@ class Test:
         # Define sphere radius (higher dimension of the drone + margin)
         self.r = max(l, w, h)*(1 + threshold)
 
-        # Calculate distance to the center and filter data
-        dist = np.sqrt((self.x - xc)**2 + (self.y -yc)**2 + (self.z - zc)**2)
-        inside_sphere = dist <= self.r
+        # Points within the sphere, found through the spatial index (rows kept in their original order)
+        def compute():
+            pairQuery, inside_sphere = self.spatialIndex().radiusQuery([xc, yc, zc], self.r)
+            return self.data.iloc[np.sort(inside_sphere)]
 
-        self.filteredData = self.data[inside_sphere]
+        self.filterParams = {'filter': 'sphere', 'axis': self.axis, 'distance': self.distance, 'l': l, 'w': w, 'h': h, 'threshold': threshold}
+        self.filteredData = self.cached('filterData', compute, **self.filterParams)
         
+    def spatialIndex(self, cellSize=0.25):
+
+        # Voxel grid over all the points of the test, built once and reused by every region query
+        if self.index is None:
+            self.index = VoxelGrid(self.data[['x', 'y', 'z']].to_numpy(), cellSize)
+        return self.index
+
+    def countInSpheres(self, centers, radius):
+
+        # Number of points around each candidate center (e.g. several drone positions or sizes) in one query
+        return self.spatialIndex().countRadius(centers, radius)
+
     def averageData(self):
 
         self.snr = 10 * np.log10(self.filteredData.snr) # Convert to dB
-        snr_avg = self.snr.groupby(self.cycle).mean()
-        self.snr_plot = snr_avg.values
-        self.cycle_plot = snr_avg.index.values
+
+        # Per-cycle statistics of the filtered data in one grouped pass (see metrics.py)
+        self.metrics = self.cached('cycleMetrics', lambda: cycleMetrics(self.filteredData, self.distance, axis=self.axis), **self.filterParams)
+        self.snr_plot = self.metrics.snr_db.values
+        self.cycle_plot = self.metrics.index.values
 
     def plotData(self):
         plt.plot(self.cycle_plot, self.snr_plot)
@@ -158,11 +208,20 @@ class Test:
         plt.show()
 
 
-    def savePointCloud(self):
+    def savePointCloud(self, lod=False, voxelSizes=(0.02, 0.05, 0.1), maxPoints=20000, maxFrames=100, framePoints=2000):
 
         # Save figure to html format
-        df = pd.DataFrame({'x': self.x_rot, 'y': self.y_rot, 'z': self.z_rot})
-        fig = px.scatter_3d(df, x='x', y='y', z='z')
+        if not lod:
+            df = pd.DataFrame({'x': self.x_rot, 'y': self.y_rot, 'z': self.z_rot})
+            fig = px.scatter_3d(df, x='x', y='y', z='z')
+            fig.write_html(f"{self.testname}.html")
+            return
+
+        # Level-of-detail export (bounded size whatever the capture length, see pointcloud_export.py):
+        # voxel-decimated clouds selected with buttons + per-cycle frames behind a slider, colored by SNR
+        points = np.column_stack((self.x_rot, self.y_rot, self.z_rot))
+        fig = lodFigure(points, self.filteredData.snr.to_numpy(), self.filteredData.cycle.to_numpy(), self.testname,
+                        voxelSizes, maxPoints, maxFrames, framePoints)
         fig.write_html(f"{self.testname}.html")
 
     
\ No newline at end of file
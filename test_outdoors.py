@@ -3,6 +3,9 @@ from mpl_toolkits.mplot3d.art3d import Poly3DCollection
 from mpl_toolkits.mplot3d import Axes3D
 import numpy as np
 import pandas as pd
+from capture import captureExtension, Capture
+from metrics import cycleMetrics
+from spatial_index import VoxelGrid
 
 class Test:
     def __init__(self, filename, testname, distance, threshold):
@@ -12,13 +15,22 @@ class Test:
         self.threshold = threshold
 
     def readData(self):
-        self.data = pd.read_csv(self.filename)
+        if self.filename.endswith(captureExtension):
+            self.data = Capture(self.filename).toDataFrame() # Binary capture (.npc)
+        else:
+            self.data = pd.read_csv(self.filename)
+
+        # Keep each cycle as a contiguous block of rows (captures are already written in cycle order)
+        if not self.data.cycle.is_monotonic_increasing:
+            self.data = self.data.sort_values('cycle', kind='stable')
+
         self.cycle = self.data.cycle
         self.object = self.data.object
         self.x = self.data.x
         self.y = self.data.y
         self.z = self.data.z
         self.cycles = sorted(self.data.cycle.unique())
+        self.index = None # Spatial index of the points, built on the first filter
 
     def filterData(self, l, w, h, threshold):
 
@@ -32,37 +44,38 @@ class Test:
         # Define sphere radius (higher dimension of the drone + margin)
         self.r = max(l, w, h)*(1 + threshold)
 
-        # Calculate distance to the center and filter data
-        dist = np.sqrt((self.x - xc)**2 + (self.y -yc)**2 + (self.z - zc)**2)
-        inside_sphere = dist <= self.r
+        # Points within the sphere, found through a spatial index of the capture (built once per test)
+        if self.index is None:
+            self.index = VoxelGrid(self.data[['x', 'y', 'z']].to_numpy())
+        pairQuery, inside_sphere = self.index.radiusQuery([xc, yc, zc], self.r)
 
-        self.filteredData = self.data[inside_sphere]
+        self.filteredData = self.data.iloc[np.sort(inside_sphere)]
         self.snr = 10 * np.log10(self.filteredData.snr)
         self.noise = 10 * np.log10(self.filteredData.noise)
         self.snr_linear = self.filteredData.snr
+        self.metrics = None # Per-cycle metrics of the new filtered data (see computeMetrics)
 
-    def calculateCentroids(self):
+    def computeMetrics(self):
 
-        # Calculate centroids of each point cloud (per cycle)
-        self.centroids_x = []
-        self.centroids_y = []
-        self.centroids_z = []
+        # Per-cycle centroids, SNR, RCS and error of the filtered data in one grouped pass (see metrics.py)
+        # Every cycle of the gross data is reported, cycles without filtered points give NaN
+        if self.metrics is None:
+            self.metrics = cycleMetrics(self.filteredData, self.distance, self.cycles)
+        return self.metrics
 
-        for cycle in self.cycles:
-            currentCycleData = self.filteredData.loc[self.filteredData['cycle'] == cycle]
-
-            currentX = currentCycleData.x
-            currentY = currentCycleData.y
-            currentZ = currentCycleData.z
+    def calculateCentroids(self):
 
-            self.centroids_x.append(np.average(currentX))
-            self.centroids_y.append(np.average(currentY))
-            self.centroids_z.append(np.average(currentZ))
+        # Calculate centroids of each point cloud (per cycle)
+        metrics = self.computeMetrics()
+        self.centroids_x = metrics.centroid_x.tolist()
+        self.centroids_y = metrics.centroid_y.tolist()
+        self.centroids_z = metrics.centroid_z.tolist()
 
     def averageSNR(self):
-        # Calculate average SNR for each cycle
-        self.avgsnr = self.snr.groupby(self.cycle).mean()
-        self.avgsnr_linear = self.snr_linear.groupby(self.cycle).mean()
+        # Calculate average SNR for each cycle (cycles with filtered points)
+        metrics = self.computeMetrics()
+        self.avgsnr = metrics.snr_db[metrics.points > 0]
+        self.avgsnr_linear = metrics.snr_linear[metrics.points > 0]
 
     def SNRModelNoRLF(self):
         # Model SNR as an exponential function
@@ -88,29 +101,10 @@ class Test:
         print(f"Test: {self.testname}")
         print(f"Filtered/Gross point ratio: {self.ratio}")
     
-        # 2. RCS (Radar Cross Section)
-        k = 1.38e-23 # Boltzmann constant (J/K)
-        T = 290 # Temperature (K)
-        B = 4e9 # Bandwidth (Hz)
-        G = 1 # Antenna gain (linear)
-        L = 1 # Loss factor (linear)
-        Pt = 0.0316 # Transmitted power (W)
-        f = 62e9 # Frequency (Hz)
-        c = 3e8 # Speed of light (m/s)
-        lamb = c / f # Wavelength (m)
-
-        self.rcs = []
-
-        for cycle in self.cycles:
-            currentRCS = (self.avgsnr_linear[cycle]*(4*np.pi)**3*(self.distance**4)*k*T*B*L)/(Pt*(G**2)*(lamb**2))
-            self.rcs.append(currentRCS)
-
-        # 3. Error (distancemeter distance vs radar distance)
-        self.error = []
-
-        for i in range(len(self.cycles)):
-            currentError = abs(self.centroids_y[i] - self.distance)
-            self.error.append(currentError)
+        # 2. RCS (Radar Cross Section) and 3. Error (distancemeter distance vs radar distance)
+        metrics = self.computeMetrics()
+        self.rcs = metrics.rcs.tolist()
+        self.error = metrics.error.tolist()
 
         # 4. Plot results
 
@@ -3,6 +3,8 @@ from mpl_toolkits.mplot3d.art3d import Poly3DCollection
 from mpl_toolkits.mplot3d import Axes3D
 import numpy as np
 import pandas as pd
+from capture import captureExtension, Capture
+from metrics import cycleMetrics
 
 class Test:
     def __init__(self, filename, testname, distance, threshold):
@@ -12,7 +14,15 @@ class Test:
         self.threshold = threshold
 
     def readData(self):
-        self.data = pd.read_csv(self.filename)
+        if self.filename.endswith(captureExtension):
+            self.data = Capture(self.filename).toDataFrame() # Binary capture (.npc)
+        else:
+            self.data = pd.read_csv(self.filename)
+
+        # Keep each cycle as a contiguous block of rows (captures are already written in cycle order)
+        if not self.data.cycle.is_monotonic_increasing:
+            self.data = self.data.sort_values('cycle', kind='stable')
+
         self.cycle = self.data.cycle
         self.object = self.data.object
         self.x = self.data.x
@@ -32,32 +42,32 @@ class Test:
         self.snr = 10 * np.log10(self.filteredData.snr)
         self.noise = 10 * np.log10(self.filteredData.noise)
         self.snr_linear = self.filteredData.snr
+        self.metrics = None # Per-cycle metrics of the new filtered data (see computeMetrics)
 
         print("FILTERED DATA:")
         print(self.filteredData)
 
-    def calculateCentroids(self):
+    def computeMetrics(self):
 
-        # Calculate centroids of each point cloud (per cycle)
-        self.centroids_x = []
-        self.centroids_y = []
-        self.centroids_z = []
+        # Per-cycle centroids, SNR, RCS and error of the filtered data in one grouped pass (see metrics.py)
+        # Every cycle of the gross data is reported, cycles without filtered points give NaN
+        if self.metrics is None:
+            self.metrics = cycleMetrics(self.filteredData, self.distance, self.cycles)
+        return self.metrics
 
-        for cycle in self.cycles:
-            currentCycleData = self.filteredData.loc[self.filteredData['cycle'] == cycle]
-
-            currentX = currentCycleData.x
-            currentY = currentCycleData.y
-            currentZ = currentCycleData.z
+    def calculateCentroids(self):
 
-            self.centroids_x.append(np.average(currentX))
-            self.centroids_y.append(np.average(currentY))
-            self.centroids_z.append(np.average(currentZ))
+        # Calculate centroids of each point cloud (per cycle)
+        metrics = self.computeMetrics()
+        self.centroids_x = metrics.centroid_x.tolist()
+        self.centroids_y = metrics.centroid_y.tolist()
+        self.centroids_z = metrics.centroid_z.tolist()
 
     def averageSNR(self):
-        # Calculate average SNR for each cycle
-        self.avgsnr = self.snr.groupby(self.filteredData.cycle).mean()
-        self.avgsnr_linear = self.snr_linear.groupby(self.filteredData.cycle).mean()
+        # Calculate average SNR for each cycle (cycles with filtered points)
+        metrics = self.computeMetrics()
+        self.avgsnr = metrics.snr_db[metrics.points > 0]
+        self.avgsnr_linear = metrics.snr_linear[metrics.points > 0]
 
     def dataMetrics(self):
 
@@ -72,32 +82,10 @@ class Test:
             self.error = []
             return
         
-        # 2. RCS (Radar Cross Section)
-        k = 1.38e-23 # Boltzmann constant (J/K)
-        T = 290 # Temperature (K)
-        B = 4e9 # Bandwidth (Hz)
-        G = 1 # Antenna gain (linear)
-        L = 1 # Loss factor (linear)
-        Pt = 0.0316 # Transmitted power (W)
-        f = 62e9 # Frequency (Hz)
-        c = 3e8 # Speed of light (m/s)
-        lamb = c / f # Wavelength (m)
-
-        self.rcs = []
-
-        for cycle in self.cycles:
-            if cycle in self.avgsnr_linear.index:
-                currentRCS = (self.avgsnr_linear[cycle]*(4*np.pi)**3*(self.distance**4)*k*T*B*L)/(Pt*(G**2)*(lamb**2))
-                self.rcs.append(currentRCS)
-            else:
-                self.rcs.append(np.nan)  # O el valor que prefieras para ciclos sin datos
-
-        # 3. Error (distancemeter distance vs radar distance)
-        self.error = []
-
-        for i in range(len(self.cycles)):
-            currentError = abs(self.centroids_y[i] - self.distance)
-            self.error.append(currentError)
+        # 2. RCS (Radar Cross Section) and 3. Error (distancemeter distance vs radar distance)
+        metrics = self.computeMetrics()
+        self.rcs = metrics.rcs.tolist()
+        self.error = metrics.error.tolist()
 
         # 4. Plot results
 
@@ -0,0 +1,173 @@
+import struct
+import numpy as np
+
+# -------------------------------------------------------------------------
+# mmWave SDK packet layout (little endian)
+# -------------------------------------------------------------------------
+
+# Syncronization word, sent as the bytes 02 01 04 03 06 05 08 07
+syncPattern = 0x708050603040102
+syncBytes = struct.pack('<Q', syncPattern)
+
+# Header = 40 bytes: sync word (8 bytes) + version, packet length, platform,
+# frame number, time, number of detected objects, number of TLVs and
+# sub-frame number (4 bytes each)
+headerStruct = struct.Struct('<Q8I')
+headerLength = headerStruct.size
+
+# TLV header = 8 bytes: TLV type + TLV length (4 bytes each)
+tlvHeaderStruct = struct.Struct('<2I')
+tlvHeaderLength = tlvHeaderStruct.size
+
+# TLV types we decode
+tlvDetectedPoints = 1 # Position (x,y,z) and speed (v)
+tlvSideInfo = 7 # SNR and noise
+
+# Sanity limit for the TLV type, anything above is treated as a corrupted packet
+# (TLV lengths are checked against the bytes actually left in the payload)
+maxTlvType = 20
+
+# Layout of one element of each TLV body
+pointDtype = np.dtype([('x', '<f4'), ('y', '<f4'), ('z', '<f4'), ('v', '<f4')]) # 16 bytes per object
+sideInfoDtype = np.dtype([('snr', '<u2'), ('noise', '<u2')]) # 4 bytes per object
+
+# Columnar layout of one decoded frame
+frameDtype = np.dtype([('object', '<u4'),
+                       ('x', '<f4'), ('y', '<f4'), ('z', '<f4'), ('v', '<f4'),
+                       ('snr', '<u2'), ('noise', '<u2')])
+
+def decodePayload(payload, numOfDetectedObj, numOfTlvs):
+
+    # Decode the TLVs of one packet payload into a single columnar frame
+    # TLV bodies are viewed in place with np.frombuffer, walking the payload with offsets
+
+    buffer = memoryview(payload)
+    offset = 0
+    points = None
+    sideInfo = None
+
+    for i in range(numOfTlvs):
+
+        if offset + tlvHeaderLength > len(buffer):
+            break
+
+        tlvType, tlvLength = tlvHeaderStruct.unpack_from(buffer, offset)
+        offset += tlvHeaderLength
+
+        if (tlvType > maxTlvType or tlvLength > len(buffer) - offset):
+            break # Corrupted TLV header, keep what was decoded so far
+
+        if (tlvType == tlvDetectedPoints):
+            count = min(numOfDetectedObj, tlvLength // pointDtype.itemsize)
+            points = np.frombuffer(buffer, dtype=pointDtype, count=count, offset=offset)
+
+        elif (tlvType == tlvSideInfo):
+            count = min(numOfDetectedObj, tlvLength // sideInfoDtype.itemsize)
+            sideInfo = np.frombuffer(buffer, dtype=sideInfoDtype, count=count, offset=offset)
+
+        offset += tlvLength
+
+    # Only objects with both position and side info are kept
+    nOfObjects = min(len(points) if points is not None else 0, len(sideInfo) if sideInfo is not None else 0)
+
+    frame = np.empty(nOfObjects, dtype=frameDtype)
+    frame['object'] = np.arange(1, nOfObjects + 1)
+    if nOfObjects > 0:
+        for name in pointDtype.names:
+            frame[name] = points[name][:nOfObjects]
+        for name in sideInfoDtype.names:
+            frame[name] = sideInfo[name][:nOfObjects]
+
+    return frame
+
+# Packets longer than this are treated as a corrupted header
+maxPacketLength = 262144
+
+class Framer:
+
+    # Split an arbitrary byte stream into complete packets
+    # Chunks of any size can be fed, packets split between chunks are kept until complete
+
+    def __init__(self, maxPacketLength=maxPacketLength):
+
+        self.maxPacketLength = maxPacketLength # Longer packets are treated as a corrupted header (see chirp_config.bufferSizes)
+        self.buffer = bytearray()
+        self.searchStart = 0 # Bytes before this position are already consumed
+
+        # Statistics
+        self.packets = 0
+        self.bytesDiscarded = 0 # Garbage skipped while searching for the syncronization word
+
+    def feed(self, chunk):
+
+        try:
+            self.buffer += chunk
+        except BufferError:
+            # A previous packet is still referenced by a consumer, move the pending bytes to a new buffer
+            self.buffer = self.buffer[self.searchStart:] + chunk
+            self.searchStart = 0
+
+    def nextPacket(self):
+
+        # Return (header, payload) memoryviews of the next complete packet, or None if more bytes are needed
+
+        while True:
+
+            # Look for the beginning of the next packet, garbage before it is skipped in one step
+            index = self.buffer.find(syncBytes, self.searchStart)
+            if index < 0:
+                # Keep the tail, the syncronization word may be split between chunks
+                tail = max(self.searchStart, len(self.buffer) - len(syncBytes) + 1)
+                self.bytesDiscarded += tail - self.searchStart
+                self.searchStart = tail
+                self.compact()
+                return None
+
+            self.bytesDiscarded += index - self.searchStart
+            self.searchStart = index
+
+            if len(self.buffer) - index < headerLength:
+                self.compact()
+                return None # Wait for the full header
+
+            packetLength = headerStruct.unpack_from(self.buffer, index)[2]
+
+            if packetLength < headerLength or packetLength > self.maxPacketLength:
+                # Corrupted header, search for the next syncronization word
+                self.bytesDiscarded += 1
+                self.searchStart = index + 1
+                continue
+
+            if len(self.buffer) - index < packetLength:
+                self.compact()
+                return None # Wait for the full packet
+
+            self.searchStart = index + packetLength
+            self.packets += 1
+
+            view = memoryview(self.buffer)
+            return view[index:index + headerLength], view[index + headerLength:index + packetLength]
+
+    def packetsIn(self, chunk):
+
+        # Feed a chunk and yield every packet completed by it
+        self.feed(chunk)
+        while True:
+            packet = self.nextPacket()
+            if packet is None:
+                break
+            yield packet
+
+    def compact(self):
+
+        # Discard consumed bytes once they fill half the buffer
+        if self.searchStart > len(self.buffer) // 2:
+            try:
+                del self.buffer[:self.searchStart]
+            except BufferError:
+                self.buffer = self.buffer[self.searchStart:]
+            self.searchStart = 0
+
+    def reset(self):
+        self.buffer = bytearray()
+        self.searchStart = 0
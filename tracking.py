@@ -0,0 +1,221 @@
+import numpy as np
+
+try:
+    from scipy.optimize import linear_sum_assignment # Optimal assignment if scipy is installed
+except ImportError:
+    linear_sum_assignment = None
+
+# One row per track: state (position, velocity), lifecycle counters and status
+trackDtype = np.dtype([('id', '<u4'),
+                       ('x', '<f4'), ('y', '<f4'), ('z', '<f4'),
+                       ('vx', '<f4'), ('vy', '<f4'), ('vz', '<f4'),
+                       ('hits', '<u4'), ('misses', '<u4'), ('age', '<u4'),
+                       ('confirmed', '?')])
+
+# Gate on the squared Mahalanobis distance of the 4D measurement (x, y, z, v): chi-square 99%
+gateThreshold = 13.28
+
+def radialVelocity(state):
+
+    # Measured Doppler of each state: velocity projected on the line of sight from the radar
+    position = state[:, :3]
+    distance = np.maximum(np.linalg.norm(position, axis=1), 1e-6)
+    return np.sum(position * state[:, 3:], axis=1) / distance
+
+def measurementJacobian(state):
+
+    # Rows: x, y, z, v --> derivatives with respect to x, y, z, vx, vy, vz
+    position = state[:, :3]
+    velocity = state[:, 3:]
+    distance = np.maximum(np.linalg.norm(position, axis=1), 1e-6)
+    radial = np.sum(position * velocity, axis=1) / distance
+
+    H = np.zeros((len(state), 4, 6))
+    H[:, 0, 0] = H[:, 1, 1] = H[:, 2, 2] = 1
+    H[:, 3, :3] = velocity / distance[:, None] - (radial / distance**2)[:, None] * position
+    H[:, 3, 3:] = position / distance[:, None]
+    return H
+
+def greedyAssignment(cost):
+
+    # Mutual best pairs (track and detection are each other's cheapest option) are assigned in rounds,
+    # so the globally cheapest pair is always taken first, every round is a few vectorized operations
+    cost = cost.copy()
+    rows = []
+    cols = []
+    while np.isfinite(cost).any():
+        bestCol = np.argmin(cost, axis=1)
+        bestRow = np.argmin(cost, axis=0)
+        row = np.flatnonzero(np.isfinite(cost[np.arange(len(cost)), bestCol]) & (bestRow[bestCol] == np.arange(len(cost))))
+        col = bestCol[row]
+        rows.append(row)
+        cols.append(col)
+        cost[row, :] = np.inf
+        cost[:, col] = np.inf
+
+    if not rows:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    return np.concatenate(rows), np.concatenate(cols)
+
+def optimalAssignment(cost):
+
+    # Hungarian assignment restricted to gated pairs (gated-out pairs get a cost that is never chosen)
+    finite = np.isfinite(cost)
+    if not finite.any():
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    bounded = np.where(finite, cost, cost[finite].max() * 10 + 1e6)
+    rows, cols = linear_sum_assignment(bounded)
+    valid = finite[rows, cols]
+    return rows[valid], cols[valid]
+
+class Tracker:
+
+    # Multi-target tracker: one constant-velocity Kalman filter per track, all tracks updated as arrays
+    # Measurements are detections (clustering.detectionDtype) or raw points (tlv.frameDtype): x, y, z and radial velocity v
+    # Lifecycle: new tracks are tentative, confirmed after confirmHits associations,
+    # deleted after maxMisses consecutive misses (tentativeMisses while still tentative)
+
+    def __init__(self, framePeriod=0.1, positionStd=0.15, velocityStd=0.1, accelerationStd=2.0, initialSpeedStd=3.0,
+                 confirmHits=3, maxMisses=5, tentativeMisses=1, assignment='greedy'):
+
+        self.framePeriod = framePeriod # Seconds between frames (used when update gets no dt)
+        self.measurementNoise = np.diag([positionStd**2] * 3 + [velocityStd**2])
+        self.accelerationStd = accelerationStd # Process noise (white acceleration, m/s²)
+        self.initialSpeedStd = initialSpeedStd # Uncertainty of the velocity across the line of sight of a new track (m/s)
+        self.confirmHits = confirmHits
+        self.maxMisses = maxMisses
+        self.tentativeMisses = tentativeMisses
+
+        # 'greedy' or 'hungarian' (scipy)
+        if assignment == 'hungarian' and linear_sum_assignment is None:
+            raise ImportError("Hungarian assignment needs scipy (pip install scipy), use assignment='greedy'")
+        self.assign = optimalAssignment if assignment == 'hungarian' else greedyAssignment
+
+        # Track arrays (one row per track)
+        self.state = np.zeros((0, 6))
+        self.covariance = np.zeros((0, 6, 6))
+        self.ids = np.zeros(0, dtype=np.uint32)
+        self.hits = np.zeros(0, dtype=np.uint32)
+        self.misses = np.zeros(0, dtype=np.uint32)
+        self.age = np.zeros(0, dtype=np.uint32)
+        self.confirmed = np.zeros(0, dtype=bool)
+
+        self.nextId = 1
+
+    def __len__(self):
+        return len(self.ids)
+
+    def predict(self, dt):
+
+        F = np.eye(6)
+        F[:3, 3:] = dt * np.eye(3)
+
+        q = self.accelerationStd**2
+        Q = np.zeros((6, 6))
+        Q[:3, :3] = q * dt**4 / 4 * np.eye(3)
+        Q[:3, 3:] = Q[3:, :3] = q * dt**3 / 2 * np.eye(3)
+        Q[3:, 3:] = q * dt**2 * np.eye(3)
+
+        self.state = self.state @ F.T
+        self.covariance = F @ self.covariance @ F.T + Q
+
+    def update(self, detections, dt=None):
+
+        # Advance all the tracks one step and associate this frame's detections, returns the tracks (trackDtype)
+        if dt is None:
+            dt = self.framePeriod
+
+        measurements = np.column_stack((detections['x'], detections['y'], detections['z'], detections['v'])).astype(np.float64)
+
+        self.predict(dt)
+        self.age += 1
+
+        rows = cols = np.zeros(0, dtype=np.int64)
+        if len(self.ids) > 0 and len(measurements) > 0:
+
+            # Innovation of every (track, detection) pair and its gated Mahalanobis distance
+            H = measurementJacobian(self.state)
+            predicted = np.column_stack((self.state[:, :3], radialVelocity(self.state)))
+            S = H @ self.covariance @ H.transpose(0, 2, 1) + self.measurementNoise
+            SInv = np.linalg.inv(S)
+
+            innovation = measurements[None, :, :] - predicted[:, None, :]
+            distance2 = np.einsum('tdi,tij,tdj->td', innovation, SInv, innovation)
+            cost = np.where(distance2 <= gateThreshold, distance2, np.inf)
+
+            rows, cols = self.assign(cost)
+
+            # Kalman update of the associated tracks
+            if len(rows) > 0:
+                K = self.covariance[rows] @ H[rows].transpose(0, 2, 1) @ SInv[rows]
+                self.state[rows] += np.einsum('kij,kj->ki', K, innovation[rows, cols])
+                self.covariance[rows] = (np.eye(6) - K @ H[rows]) @ self.covariance[rows]
+
+        # Lifecycle
+        associated = np.zeros(len(self.ids), dtype=bool)
+        associated[rows] = True
+        self.hits[associated] += 1
+        self.misses[associated] = 0
+        self.misses[~associated] += 1
+        self.confirmed |= self.hits >= self.confirmHits
+
+        keep = np.where(self.confirmed, self.misses <= self.maxMisses, self.misses <= self.tentativeMisses)
+        self.removeTracks(~keep)
+
+        # Unassociated detections start tentative tracks
+        unused = np.ones(len(measurements), dtype=bool)
+        unused[cols] = False
+        self.createTracks(measurements[unused])
+
+        return self.tracks()
+
+    def removeTracks(self, remove):
+
+        if remove.any():
+            keep = ~remove
+            self.state = self.state[keep]
+            self.covariance = self.covariance[keep]
+            self.ids = self.ids[keep]
+            self.hits = self.hits[keep]
+            self.misses = self.misses[keep]
+            self.age = self.age[keep]
+            self.confirmed = self.confirmed[keep]
+
+    def createTracks(self, measurements):
+
+        n = len(measurements)
+        if n == 0:
+            return
+
+        # Velocity starts along the line of sight with the measured radial velocity,
+        # the cross-range components are unknown (initialSpeedStd)
+        position = measurements[:, :3]
+        lineOfSight = position / np.maximum(np.linalg.norm(position, axis=1, keepdims=True), 1e-6)
+        state = np.hstack((position, lineOfSight * measurements[:, 3:4]))
+
+        projection = lineOfSight[:, :, None] * lineOfSight[:, None, :]
+        covariance = np.zeros((n, 6, 6))
+        covariance[:, :3, :3] = self.measurementNoise[:3, :3]
+        covariance[:, 3:, 3:] = self.measurementNoise[3, 3] * projection + self.initialSpeedStd**2 * (np.eye(3) - projection)
+
+        self.state = np.vstack((self.state, state))
+        self.covariance = np.concatenate((self.covariance, covariance))
+        self.ids = np.concatenate((self.ids, np.arange(self.nextId, self.nextId + n, dtype=np.uint32)))
+        self.hits = np.concatenate((self.hits, np.ones(n, dtype=np.uint32)))
+        self.misses = np.concatenate((self.misses, np.zeros(n, dtype=np.uint32)))
+        self.age = np.concatenate((self.age, np.ones(n, dtype=np.uint32)))
+        self.confirmed = np.concatenate((self.confirmed, np.zeros(n, dtype=bool)))
+        self.nextId += n
+
+    def tracks(self, confirmedOnly=False):
+
+        select = self.confirmed if confirmedOnly else np.ones(len(self.ids), dtype=bool)
+        tracks = np.zeros(int(select.sum()), dtype=trackDtype)
+        tracks['id'] = self.ids[select]
+        for column, name in enumerate(['x', 'y', 'z', 'vx', 'vy', 'vz']):
+            tracks[name] = self.state[select, column]
+        tracks['hits'] = self.hits[select]
+        tracks['misses'] = self.misses[select]
+        tracks['age'] = self.age[select]
+        tracks['confirmed'] = self.confirmed[select]
+        return tracks
@@ -0,0 +1,87 @@
+import time
+import numpy as np
+import matplotlib
+matplotlib.use('Agg') # No figure windows during the benchmark
+from tlv import frameDtype
+from radar_sim import TlvGenerator
+from clustering import PointClusterer
+from tracking import Tracker
+
+# Tracker throughput and accuracy with synthetic targets (known ground truth) in clutter,
+# and optionally a replayed raw capture (see uart_capture.py) through urad.Radar with clustering and tracking
+
+targetCounts = [1, 10, 25, 50] # Simultaneous targets
+nOfClutter = 500 # Clutter points per frame
+nOfFrames = 60 # Frames per measurement
+frameRate = 10 # Hz
+replayFileName = None # Raw capture (.uart) to validate on, None to skip
+
+def makeTargets(nOfTargets, rng):
+
+    # Targets on a grid (rows at least 0.75 m apart), consecutive rows crossing each other in opposite directions
+    columns = int(np.ceil(np.sqrt(nOfTargets)))
+    cell = np.arange(nOfTargets)
+    x = -4 + 8 * (cell % columns + 0.5) / columns
+    y = 1.5 + 6 * (cell // columns + 0.5) / columns
+    vx = np.where((cell // columns) % 2 == 0, 0.5, -0.5) + rng.uniform(-0.1, 0.1, nOfTargets)
+    vz = rng.uniform(-0.1, 0.1, nOfTargets)
+    return np.column_stack((x, y, np.zeros(nOfTargets), vx, np.zeros(nOfTargets), vz))
+
+print("Targets | update (ms) median | max | confirmed tracks | position error (m) | targets with 1 ID")
+
+rng = np.random.default_rng(0)
+for nOfTargets in targetCounts:
+
+    generator = TlvGenerator(nOfPoints = 20 * nOfTargets + nOfClutter, frameRate = frameRate, targets = makeTargets(nOfTargets, rng), seed = 1)
+    clusterer = PointClusterer(eps = 0.3, minPoints = 4, snrReference = 150, maxPoints = 5000)
+    tracker = Tracker(framePeriod = 1 / frameRate)
+
+    latencies = []
+    errors = []
+    idsPerTarget = [set() for i in range(nOfTargets)]
+    for i in range(nOfFrames):
+
+        points, sideInfo = generator.framePoints()
+        frame = np.zeros(len(points), dtype=frameDtype)
+        for name in ['x', 'y', 'z', 'v']:
+            frame[name] = points[name]
+        frame['snr'] = sideInfo['snr']
+        detections, labels = clusterer.cluster(frame)
+
+        start = time.perf_counter()
+        tracks = tracker.update(detections)
+        latencies.append(time.perf_counter() - start)
+
+        # Ground truth: nearest confirmed track of each target (after the confirmation frames)
+        confirmed = tracks[tracks['confirmed']]
+        if i >= 5 and len(confirmed) > 0:
+            trackPositions = np.column_stack((confirmed['x'], confirmed['y'], confirmed['z']))
+            distance = np.linalg.norm(generator.targets[:, None, :3] - trackPositions[None, :, :], axis=2)
+            nearest = np.argmin(distance, axis=1)
+            for target in np.flatnonzero(distance[np.arange(nOfTargets), nearest] < 0.5):
+                idsPerTarget[target].add(int(confirmed['id'][nearest[target]]))
+                errors.append(distance[target, nearest[target]])
+
+    latencies = np.array(latencies) * 1e3
+    singleId = sum(len(ids) == 1 for ids in idsPerTarget)
+    print(f"{nOfTargets:7d} | {np.median(latencies):18.2f} | {latencies.max():5.2f} | {int(tracks['confirmed'].sum()):16d} | {np.mean(errors):18.3f} | {singleId:3d}/{nOfTargets}")
+
+if replayFileName is not None:
+
+    from urad import *
+
+    radar = Radar(None, None, 'REPLAY', None, None, 0)
+    radar.configuratePorts(replayFileName = replayFileName, replaySpeed = None)
+    radar.enableTracking(1 / frameRate)
+
+    cycleCounter = 0
+    start = time.perf_counter()
+    while radar.unpackData():
+        cycleCounter += 1
+        radar.extractData(cycleCounter)
+    elapsed = time.perf_counter() - start
+
+    print(f"Replay {replayFileName}: {cycleCounter} frames, {cycleCounter / elapsed:.1f} frames/s, "
+          f"{radar.tracker.nextId - 1} tracks started, {int(radar.tracks['confirmed'].sum())} confirmed at the end")
+    print(radar.tracks[radar.tracks['confirmed']])
+    radar.closePorts()
@@ -0,0 +1,147 @@
+import struct
+import time
+
+# -------------------------------------------------------------------------
+# RAW UART CAPTURE FORMAT
+# -------------------------------------------------------------------------
+
+# File header (8 bytes), followed by one record per read from the port:
+# host timestamp (8 bytes, float) + number of bytes (4 bytes) + raw bytes
+
+captureMagic = b'UARTCAP1'
+recordStruct = struct.Struct('<dI')
+
+class RecordingPort:
+
+    # Wraps an open serial port and writes every byte read from it to a capture file
+
+    def __init__(self, port, captureFileName):
+        self.port = port
+        self.captureFile = open(captureFileName, 'wb')
+        self.captureFile.write(captureMagic)
+
+    @property
+    def in_waiting(self):
+        return self.port.in_waiting
+
+    @property
+    def is_open(self):
+        return self.port.is_open
+
+    def read(self, size=1):
+        data = self.port.read(size)
+        if data:
+            self.captureFile.write(recordStruct.pack(time.time(), len(data)))
+            self.captureFile.write(data)
+        return data
+
+    def write(self, data):
+        return self.port.write(data)
+
+    def reset_input_buffer(self):
+        self.port.reset_input_buffer()
+
+    def reset_output_buffer(self):
+        self.port.reset_output_buffer()
+
+    def close(self):
+        self.port.close()
+        self.captureFile.close()
+
+class ReplayPort:
+
+    # Plays a capture file back with the read/in_waiting/reset_input_buffer interface of serial.Serial
+    # speed = 1 plays at real time, speed = N plays N times faster, speed = None plays as fast as possible
+
+    def __init__(self, captureFileName, speed=1.0, timeout=0.3):
+
+        self.captureFile = open(captureFileName, 'rb')
+        if self.captureFile.read(len(captureMagic)) != captureMagic:
+            raise ValueError(f"{captureFileName} is not a UART capture file")
+
+        self.speed = speed
+        self.timeout = timeout
+        self.is_open = True
+
+        # Bytes already "received" but not read yet
+        self.pending = bytearray()
+
+        # Next record of the capture (None at the end of the file)
+        self.nextTimestamp, self.nextData = self.readRecord()
+        self.captureStart = self.nextTimestamp
+        self.replayStart = time.monotonic()
+
+    def readRecord(self):
+
+        recordHeader = self.captureFile.read(recordStruct.size)
+        if len(recordHeader) < recordStruct.size:
+            return None, None # End of the capture (or truncated record)
+
+        timestamp, length = recordStruct.unpack(recordHeader)
+        data = self.captureFile.read(length)
+        if len(data) < length:
+            return None, None
+
+        return timestamp, data
+
+    def captureTime(self):
+        # Position of the replay in capture time
+        return self.captureStart + (time.monotonic() - self.replayStart) * self.speed
+
+    def advance(self, size=1):
+
+        # Move the records that have already "arrived" to the pending bytes
+        if self.speed is None:
+            while self.nextData is not None and len(self.pending) < size:
+                self.pending += self.nextData
+                self.nextTimestamp, self.nextData = self.readRecord()
+        else:
+            now = self.captureTime()
+            while self.nextData is not None and self.nextTimestamp <= now:
+                self.pending += self.nextData
+                self.nextTimestamp, self.nextData = self.readRecord()
+
+    @property
+    def finished(self):
+        return self.nextData is None and len(self.pending) == 0
+
+    @property
+    def in_waiting(self):
+        self.advance()
+        return len(self.pending)
+
+    def read(self, size=1):
+
+        deadline = None if self.timeout is None else time.monotonic() + self.timeout
+
+        while True:
+            self.advance(size)
+            if len(self.pending) >= size or self.nextData is None:
+                break
+
+            # Wait for the next record (or the timeout, as a serial port would)
+            wait = (self.nextTimestamp - self.captureTime()) / self.speed
+            if deadline is not None:
+                wait = min(wait, deadline - time.monotonic())
+                if wait <= 0:
+                    break
+            if wait > 0:
+                time.sleep(wait)
+
+        data = bytes(self.pending[:size])
+        del self.pending[:size]
+        return data
+
+    def write(self, data):
+        return len(data) # Nothing is listening on a replayed port
+
+    def reset_input_buffer(self):
+        self.advance()
+        self.pending.clear()
+
+    def reset_output_buffer(self):
+        pass
+
+    def close(self):
+        self.captureFile.close()
+        self.is_open = False
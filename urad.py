@@ -1,9 +1,22 @@
 import serial
 import struct
+import time
 import numpy as np
 import pandas as pd
 from time import sleep
 import matplotlib.pyplot as plt
+from tlv import decodePayload, Framer, maxPacketLength
+from frame_store import FrameStore
+from serial_reader import SerialReader
+from uart_capture import RecordingPort, ReplayPort
+from capture import CaptureWriter
+from clustering import PointClusterer
+from tracking import Tracker
+from live_view import LiveViewer
+from frame_export import FrameExporter, writeVideo
+from config_sender import ConfigSender, printResults
+from chirp_config import ChirpConfig
+from georeference import Georeferencer
 
 class Radar:
 
@@ -20,87 +33,140 @@ class Radar:
         self.syncPattern = 0x708050603040102
 
         # Parameters for managing data packets and bytes received from the standard port
-        self.packetHeader = bytearray([])
+        self.framer = Framer() # Splits the standard port byte stream into packets (searches the syncronization pattern)
         self.headerLength = 40 # Header = 40 bytes
         self.tlvHeaderLength = 8 # TLV Header = 8 bytes
 
-        # Arrays to save data
-        self.cycles = []
-        self.objects = []
-        self.xArray = []
-        self.yArray = []
-        self.zArray = []
-        self.vArray = []
-        self.snrArray = []
-        self.noiseArray = []
+        # Host time of arrival of the current frame (time.time() for the sensor samples, time.monotonic() for the servos)
+        # and of the last bytes read from the standard port
+        self.frameTime = None
+        self.frameMonotonic = None
+        self.readTime = None
+        self.readMonotonic = None
 
         # Number of measuring cycles
         self.nOfCycles = nOfCycles
 
-        # Initialize the plot
-        self.fig = plt.figure()
-        self.ax = self.fig.add_subplot(111, projection='3d')
-        plt.ion()
-        plt.show()
+        # Parsed configuration and reader buffer sizes (see readConfigFile)
+        self.chirpConfig = None
+        self.bufferSizes = {'readSize': 65536, 'maxPacketLength': maxPacketLength, 'queueSize': 32}
+
+        # Plot (created on the first call to plotData) and live viewer process (see startViewer)
+        self.fig = None
+        self.viewer = None
+
+        # Frame images rendered by background workers (see startFrameExport)
+        self.exporter = None
+
+        # Background reader (only used in acquisition mode, see startAcquisition)
+        self.reader = None
+
+        # Initialize point cloud store (typed columns, converted to a DataFrame when saving)
+        self.store = FrameStore()
+
+        # Binary capture written frame by frame (see openCapture)
+        self.captureWriter = None
+
+        # Clustering of each frame into detections (see enableClustering)
+        self.clusterer = None
+        self.detections = None
+
+        # Tracking of the detections across frames (see enableTracking)
+        self.tracker = None
+        self.tracks = None
+        self.lastFrameNumber = None
+
+        # Pan/tilt sector scan: servo pose of each frame and stitched sweeps (see enableSectorScan)
+        self.scanner = None
+        self.scanPose = None
+
+        # Georeferencing of each frame with the platform pose (see enableGeoreferencing)
+        self.georeferencer = None
+        self.poseSource = None
+        self.geoFrame = None
+        self.geoDetections = None
+        self.geoFrames = [] # (cycle, object, geoFrame) of every georeferenced frame, see saveGeoData
+        self.framesWithoutPose = 0
+
+    def readConfigFile(self): # Open and parse .cfg file (see chirp_config.py)
 
-        # Initialize data DataFrame
-        self.data = pd.DataFrame(columns=["cycle", "object", "x", "y", "z", "v", "snr", "noise"])
+        self.chirpConfig = ChirpConfig.read(self.configFileName)
+        self.commands = self.chirpConfig.commands
+        self.counter = len(self.commands)
 
-    def readConfigFile(self): # Open and read .cfg file
+        # Derived parameters and configuration mistakes (e.g. more points than the data port can carry)
+        print(self.chirpConfig.summary())
 
-        self.counter = 0
-        self.commands = []
+        # Reader buffers sized for the data rate of this configuration
+        self.bufferSizes = self.chirpConfig.bufferSizes()
+        self.framer = Framer(self.bufferSizes['maxPacketLength'])
 
-        with open(self.configFileName, 'r') as fp:
-            for line in fp:
-                if (len(line) > 1):
-                    if (line[0] != '%'):
-                        self.commands.append(line)
-                        self.counter += 1
-            fp.close()
+    def configuratePorts(self, recordFileName=None, replayFileName=None, replaySpeed=1.0): # Define serial ports (enhanced = config, standard = data)
 
-    def configuratePorts(self): # Define serial ports (enhanced = config, standard = data)
+        # Replay mode: the standard port is played back from a raw capture, no radar attached
+        # (replaySpeed = 1 real time, N times faster, None as fast as possible)
+        if replayFileName is not None:
+            self.enhancedPort = None
+            self.standardPort = ReplayPort(replayFileName, speed = replaySpeed, timeout = 0.3)
+            return
 
         self.enhancedPort = serial.Serial(port = self.enhancedPortName, baudrate = 115200, parity = serial.PARITY_NONE, stopbits = serial.STOPBITS_ONE, timeout = 0.3)
         self.standardPort = serial.Serial(port = self.standardPortName, baudrate = 921600, parity = serial.PARITY_NONE, stopbits = serial.STOPBITS_ONE, timeout = 0.3)
 
         #self.standardPort.set_buffer_size(rx_size=16384,tx_size=16384)
 
+        # Record mode: every byte read from the standard port is also written to a raw capture (with host timestamps)
+        if recordFileName is not None:
+            self.standardPort = RecordingPort(self.standardPort, recordFileName)
+
         # Reset both input and output buffers to avoid old data issues
         self.standardPort.reset_input_buffer()
         self.standardPort.reset_output_buffer()
 
-    def writeCommands(self): # Write the .cfg file commands to the enhanced port
+    def writeCommands(self, skipIfApplied=False, timeout=1.0): # Write the .cfg file commands to the enhanced port
 
-        # Read initial response
-        initialResponse = bytearray([])
-        while(self.enhancedPort.in_waiting > 0): # Number of bytes in the input buffer > 0
-            initialResponse += self.enhancedPort.read(1) 
-        print(initialResponse.decode())
+        if self.enhancedPort is None:
+            return True # Replay mode, there is no radar to configure
 
-        # Write commands to the enhanced port
-        for i in range(self.counter):
-            self.enhancedPort.write(bytearray(self.commands[i].encode()))
-            sleep(0.02)
-            response = bytearray([])
-            while(self.enhancedPort.in_waiting > 0): 
-                response += self.enhancedPort.read(1) 
-            print(response.decode())
+        sender = ConfigSender(self.enhancedPort, timeout)
 
-    def unpackData(self):
+        # Same configuration already running (same hash as the last one sent, and data still streaming): nothing to send
+        if skipIfApplied and sender.isApplied(self.commands, self.standardPort):
+            print("Configuration already applied, not sent again")
+            self.configResults = []
+            return True
 
-        self.packetHeader += self.standardPort.read(self.headerLength - len(self.packetHeader))
+        # Each command waits for its own Done/Error reply (see config_sender.py)
+        start = time.perf_counter()
+        self.configResults = sender.sendConfig(self.commands)
+        self.configTime = time.perf_counter() - start
+        printResults(self.configResults, self.configTime)
 
-        # Checking if the data packet has the desired size
-        if len(self.packetHeader) != self.headerLength:    
-            print("Incorrect buffer length, waiting for full header...")
-            return False  # Wait until we have a full header
+        return all(result.ok for result in self.configResults) and len(self.configResults) == self.counter
+
+    def unpackData(self):
+
+        # Read from the standard port until the framer has a complete packet (header + payload)
+        # Bytes before the syncronization pattern are skipped by the framer in a single search
+        packet = self.framer.nextPacket()
+        while packet is None:
+            data = self.standardPort.read(max(self.standardPort.in_waiting, self.headerLength))
+            if not data:
+                print("Incorrect buffer length, waiting for full packet...")
+                return False  # Wait until we have a full packet
+            self.readTime, self.readMonotonic = time.time(), time.monotonic()
+            self.framer.feed(data)
+            packet = self.framer.nextPacket()
+
+        # Arrival of the packet: the read that completed it (it may have been buffered in the framer since an earlier call)
+        self.packetHeader, self.packetPayload = packet
+        self.frameTime, self.frameMonotonic = self.readTime, self.readMonotonic
 
         # -------------------------------------------------------------------------
         # HEADER --> 40 BYTES
         # -------------------------------------------------------------------------
 
-        # 1. Syncronization word (8 bytes) - Must match syncronization pattern (defined above)
+        # 1. Syncronization word (8 bytes) - Must match syncronization pattern (checked by the framer)
         # This word indicates where the data packet begins. It works as an identifier
 
         # 2. SDK Version (4 bytes)
@@ -119,9 +185,9 @@ class Radar:
 
         # 9. Sub-frame number (4 bytes)
 
-        self.sync, self.version, self.packetLength, self.platform, self.frameNumber, self.timeCpuCycles, self.numOfDetectedObj, self.numOfTlvs, self.subFrameNumber = struct.unpack('Q8I', self.packetHeader[:self.headerLength])
+        self.sync, self.version, self.packetLength, self.platform, self.frameNumber, self.timeCpuCycles, self.numOfDetectedObj, self.numOfTlvs, self.subFrameNumber = struct.unpack('Q8I', self.packetHeader)
         
-        return True # Condition for unpacking data only when the header has the correct size
+        return True # Condition for extracting data only when a full packet has been received
     
         # -------------------------------------------------------------------------
         # END OF THE HEADER
@@ -129,141 +195,189 @@ class Radar:
     
     def extractData(self, cycleCounter): 
 
-        if (self.sync == self.syncPattern): # If we find where the data packet begins
+        # Packet payload: What we want to extract (position, speed and noise)
+        # Total data packet consists of header + packet payload (TLV header is inside of the payload)
+
+        # Decode TLV type 1 (x, y, z, v) and type 7 (SNR, noise) into one columnar frame
+        # TLV bodies are read in place with offsets (see tlv.py for the packet layout)
+        self.frame = decodePayload(self.packetPayload, self.numOfDetectedObj, self.numOfTlvs)
+
+        self.storeFrame(cycleCounter)
 
-            #print("Syncronization pattern match, extracting data...")
+    def storeFrame(self, cycleCounter):
 
-            self.packetHeader = bytearray([])
+        # Append the current cycle to the point cloud store (and to the binary capture, if open)
+        self.store.append(cycleCounter, self.frame)
 
-            # Packet payload: What we want to extract (position, speed and noise)
-            # Total data packet consists of header + packet payload (TLV header is inside of the payload)
-            self.packetPayload = self.standardPort.read(self.packetLength - self.headerLength)
+        if self.captureWriter is not None:
+            self.captureWriter.append(cycleCounter, self.frame)
 
-            # Matrix for saving the packet payload data per detected object
-            self.objectData = np.zeros((self.numOfDetectedObj, 6))
-            #print(f"Detected objects: {self.numOfDetectedObj}")
+        if self.clusterer is not None:
+            self.detections, self.labels = self.clusterer.cluster(self.frame)
 
-            self.objectCounter = 1 # Reset object counter for the data frame
+        if self.tracker is not None:
+            # Time step from the radar frame numbers, so frames dropped by the background reader are accounted for
+            dt = None
+            if self.lastFrameNumber is not None and self.frameNumber > self.lastFrameNumber:
+                dt = (self.frameNumber - self.lastFrameNumber) * self.tracker.framePeriod
+            self.lastFrameNumber = self.frameNumber
+            self.tracks = self.tracker.update(self.detections, dt)
 
-            for i in range(self.numOfTlvs):
+        if self.scanner is not None:
+            self.scanPose = self.scanner.addFrame(cycleCounter, self.frame, self.frameMonotonic) # Servo pose at capture
 
-                # -------------------------------------------------------------------------
-                # TLV HEADER --> 8 BYTES
-                # -------------------------------------------------------------------------
+        if self.georeferencer is not None:
+            self.georeferenceFrame(cycleCounter)
 
-                # 1. TLV type (4 bytes)
-                #    - Type 1: Gives position (x,y,z) and speed (v)
-                #    - Type 7: Gives SNR and noise
+        if self.viewer is not None:
+            self.viewer.show(cycleCounter, self.frame)
 
-                # 2. TLV length (4 bytes)
-                
-                self.tlvType, self.tlvLength = struct.unpack('2I', self.packetPayload[:self.tlvHeaderLength])
+        if self.exporter is not None:
+            self.exporter.submit(cycleCounter, self.frame)
 
-                if (self.tlvType > 20 or self.tlvLength > 10000):
-                        self.packetHeader = bytearray([])
-                        break
-                
-                # -------------------------------------------------------------------------
-                # END OF THE TLV HEADER
-                # -------------------------------------------------------------------------
-                
-                # Once we have the TLV header information, we extract it from the payload
-                self.packetPayload = self.packetPayload[self.tlvHeaderLength:]
+    def enableClustering(self, eps=0.3, minPoints=4, snrReference=None, maxPoints=2000): # Cluster every stored frame into detections (clustering.detectionDtype)
+        self.clusterer = PointClusterer(eps, minPoints, snrReference, maxPoints = maxPoints)
 
-                if (self.tlvType == 1):
+    def enableTracking(self, framePeriod=None, **trackerOptions): # Track the detections across frames (tracking.trackDtype), framePeriod in seconds
 
-                    for k in range(self.numOfDetectedObj):
+        if framePeriod is None:
+            framePeriod = self.chirpConfig.framePeriod if self.chirpConfig is not None else 0.1
+        if self.clusterer is None:
+            self.enableClustering()
+        self.tracker = Tracker(framePeriod, **trackerOptions)
 
-                        # Extracting position and speed, each element consists of 4 bytes
+    def enableSectorScan(self, scanner): # Pan/tilt the radar (sector_scan.SectorScanner), every frame advances the scan
 
-                        self.x, self.y, self.z, self.v = struct.unpack('4f', self.packetPayload[:16])
+        self.scanner = scanner
+        self.scanner.start()
 
-                        # Adding data to matrix
-                        self.objectData[k,0] = self.x
-                        self.objectData[k,1] = self.y
-                        self.objectData[k,2] = self.z
-                        self.objectData[k,3] = self.v
+    def saveSweeps(self, sweepsFileName):
 
-                        # Supressing the already read data from the packet payload
-                        self.packetPayload = self.packetPayload[16:]
+        sweeps = list(self.scanner.sweeps)
+        if not sweeps:
+            print("No complete sweeps")
+            return
+        data = pd.DataFrame(np.concatenate(sweeps))
+        data.insert(0, 'sweep', np.concatenate([np.full(len(sweep), i) for i, sweep in enumerate(sweeps)]))
+        data.to_csv(sweepsFileName, index=False)
+        times = self.scanner.sweepTimes
+        print(f"Sweeps: {len(times)} | Revisit time: {np.mean(times):.2f} s | Frames while moving: {self.scanner.framesMoving}")
 
-                        self.objects.append(self.objectCounter)
-                        self.xArray.append(self.x)
-                        self.yArray.append(self.y)
-                        self.zArray.append(self.z)
-                        self.vArray.append(self.v)
-                        self.cycles.append(cycleCounter)
-                        
-                        self.objectCounter += 1
+    def enableGeoreferencing(self, poseSource, **georeferencerOptions): # Points and detections to ENU / WGS-84 (georeference.geoDtype)
 
-                elif (self.tlvType == 7): 
+        # poseSource: function of the arrival time of a frame (time.time()) returning the georeference.Pose at that time or
+        # None (e.g. SensorSampler.pose)
+        self.poseSource = poseSource
+        self.georeferencer = Georeferencer(**georeferencerOptions)
 
-                    for n in range(self.numOfDetectedObj):
+    def georeferenceFrame(self, cycleCounter):
 
-                        # Extracting SNR and noise, each element consists of 2 bytes
+        # Pose when the frame arrived (not when it is consumed, the background reader may have queued it) for the whole
+        # frame: points and detections are transformed together (one matrix product)
+        pose = self.poseSource(self.frameTime)
+        if pose is None:
+            self.geoFrame = self.geoDetections = None
+            self.framesWithoutPose += 1
+            return
 
-                        self.snr, self.noise = struct.unpack('2H', self.packetPayload[:4])
+        points = np.column_stack([self.frame['x'], self.frame['y'], self.frame['z']])
+        if self.detections is not None:
+            points = np.vstack([points, np.column_stack([self.detections['x'], self.detections['y'], self.detections['z']])])
 
-                        # Adding data to matrix
-                        self.objectData[n,4] = self.snr
-                        self.objectData[n,5] = self.noise
+        if self.scanner is not None:
+            points = points @ self.scanner.rotation(self.scanPose).T # Radar frame to platform frame (servo pose)
 
-                        # Supressing the already read data from the packet payload
-                        self.packetPayload = self.packetPayload[4:]
+        rows = self.georeferencer.georeference(points, pose)
+        self.geoFrame = rows[:len(self.frame)]
+        self.geoDetections = rows[len(self.frame):] if self.detections is not None else None
+        self.geoFrames.append((cycleCounter, self.frame['object'], self.geoFrame))
 
-                        # Print all the extracted data
-                        #print(f"x: {self.objectData[n,0]} m | y: {self.objectData[n,1]} m | z: {self.objectData[n,2]} m | v: {self.objectData[n,3]} m/s | SNR: {self.objectData[n,4]} dB | Noise: {self.objectData[n,5]} dB")
+    def saveGeoData(self, geoFileName):
 
-                        self.snrArray.append(self.snr)
-                        self.noiseArray.append(self.noise)
+        if not self.geoFrames:
+            print(f"No georeferenced frames ({self.framesWithoutPose} frames without heading or GPS fix)")
+            return
+        data = pd.DataFrame(np.concatenate([geoFrame for cycle, objects, geoFrame in self.geoFrames]))
+        data.insert(0, 'object', np.concatenate([objects for cycle, objects, geoFrame in self.geoFrames]))
+        data.insert(0, 'cycle', np.concatenate([np.full(len(geoFrame), cycle) for cycle, objects, geoFrame in self.geoFrames]))
+        data.to_csv(geoFileName, index=False)
+        print(f"Georeferenced frames: {len(self.geoFrames)} | Frames without pose: {self.framesWithoutPose}")
 
-            # Verify lists length
-            min_length = min(len(self.cycles), len(self.objects), len(self.xArray), len(self.yArray), len(self.zArray), len(self.vArray), len(self.snrArray), len(self.noiseArray))
+    def openCapture(self, captureFileName): # Binary point cloud (.npc) appended during acquisition
+        self.captureWriter = CaptureWriter(captureFileName)
 
-            # Data frame for the current cycle
-            currentCycleData = pd.DataFrame(
-            {
-            "cycle": self.cycles[:min_length],
-            "object": self.objects[:min_length],
-            "x": self.xArray[:min_length],
-            "y": self.yArray[:min_length],
-            "z": self.zArray[:min_length],
-            "v": self.vArray[:min_length],
-            "snr": self.snrArray[:min_length],
-            "noise": self.noiseArray[:min_length]
-            })
+    def flushInput(self): # Discard old bytes in the standard port and in the framer
+
+        self.standardPort.reset_input_buffer()
+        self.standardPort.reset_output_buffer()
+        self.framer.reset()
+
+    def startAcquisition(self, queueSize=None): # Read and decode the standard port in a background thread
+
+        self.standardPort.reset_input_buffer()
+        self.reader = SerialReader(self.standardPort, queueSize or self.bufferSizes['queueSize'],
+                                   self.bufferSizes['readSize'], self.bufferSizes['maxPacketLength'])
+        self.reader.start()
 
-            # Append data to the main data frame
-            self.data = pd.concat([self.data, currentCycleData], ignore_index = True)
-
-            # Reset the arrays for the next cycle
-            self.cycles.clear()
-            self.objects.clear()
-            self.xArray.clear()
-            self.yArray.clear()
-            self.zArray.clear()
-            self.vArray.clear()
-            self.snrArray.clear()
-            self.noiseArray.clear()
-
-        else:
-            # If syncronization pattern is not matching, we go forward one position in the header until it matches
-            print("Syncronization pattern match not found, trying again...")
-            self.packetHeader = self.packetHeader[1:]
+    def readFrame(self, cycleCounter, timeout=1.0): # Take the next decoded frame from the background reader
+
+        radarFrame = self.reader.getFrame(timeout)
+        if radarFrame is None:
+            print("No frame received from the background reader...")
+            return False
+
+        self.frameNumber = radarFrame.frameNumber
+        self.frameTime, self.frameMonotonic = radarFrame.timestamp, radarFrame.monotonic
+        self.numOfDetectedObj = radarFrame.numOfDetectedObj
+        self.frame = radarFrame.frame
+
+        self.storeFrame(cycleCounter)
+
+        return True
+
+    def stopAcquisition(self):
+
+        if self.reader is not None:
+            self.reader.stop()
+            print(f"Frames decoded: {self.reader.framesDecoded} | Frames dropped: {self.reader.framesDropped}")
+            self.reader = None
 
     def saveData(self):
+        self.data = self.store.toDataFrame()
         print(self.data)
         self.data.to_csv(self.pointCloudFileName, index=False)
 
-    def plotData(self, cycleCounter, saveFrames):
+    def startViewer(self, maxPoints=5000): # Live 3D view of the newest frame in a separate process (never delays acquisition)
 
-        cycleTable = self.data[self.data['cycle'] == cycleCounter]
-        xCycle = cycleTable.x
-        yCycle = cycleTable.y
-        zCycle = cycleTable.z
+        self.viewer = LiveViewer(maxPoints)
+        self.viewer.start()
+
+    def stopViewer(self):
+
+        if self.viewer is not None:
+            self.viewer.stop()
+            self.viewer = None
+
+    def startFrameExport(self, workers=2, queueSize=16): # Save every frame to .png in background worker processes
+        self.exporter = FrameExporter(self.testName, workers = workers, queueSize = queueSize)
+
+    def stopFrameExport(self, videoFileName=None, fps=10): # Wait for the pending frames (and join them into a video)
+
+        if self.exporter is not None:
+            self.exporter.close()
+            print(f"Frames saved: {len(self.exporter.fileNames)} | Frames skipped: {self.exporter.framesDropped}")
+            if videoFileName is not None:
+                writeVideo(self.exporter.fileNames, videoFileName, fps)
+            self.exporter = None
+
+    def initPlot(self):
+
+        # Axes, labels and texts are created once, each cycle only updates the scatter offsets and the texts
+        self.fig = plt.figure()
+        self.ax = self.fig.add_subplot(111, projection='3d')
+        plt.ion()
+        plt.show()
 
-        self.ax.cla()  # Clear graph
-        self.ax.set_title(f"Cycle {cycleCounter}")
         self.ax.set(xlabel='X [m]')
         self.ax.set(ylabel='Y [m]')
         self.ax.set(zlabel='Z [m]')
@@ -272,20 +386,41 @@ class Radar:
         self.ax.set_ylim([5, -5])
         self.ax.set_zlim([-5, 5])
 
+        self.scatter = self.ax.scatter([], [], [])
+        self.objectsText = self.ax.text(x=-8,y=8,z=13.75,s="")
+        self.clustersText = self.ax.text(x=-8,y=8,z=12.5,s="")
+        self.tracksText = self.ax.text(x=-8,y=8,z=11.25,s="")
+
+    def plotData(self, cycleCounter):
+
+        if self.fig is None:
+            self.initPlot()
+
+        cycleTable = self.store.getCycle(cycleCounter)
+        self.scatter._offsets3d = (cycleTable['x'], cycleTable['y'], cycleTable['z'])
+
         # Add information of the detected objects in the current cycle
-        self.ax.text(x=-8,y=8,z=13.75,s=f"Detected objects: {self.numOfDetectedObj}")
-        self.ax.scatter(xCycle, yCycle, zCycle)
-        
-        if(saveFrames):
-            # Save frames to .png
-            plt.savefig(fname=f"cycle_{cycleCounter}_test_{self.testName}.png")
+        self.ax.set_title(f"Cycle {cycleCounter}")
+        self.objectsText.set_text(f"Detected objects: {self.numOfDetectedObj}")
+        if self.detections is not None:
+            self.clustersText.set_text(f"Clusters: {len(self.detections)}")
+        if self.tracks is not None:
+            self.tracksText.set_text(f"Confirmed tracks: {int(self.tracks['confirmed'].sum())}")
 
-        plt.draw()  # Update figure in each cycle
-        plt.pause(0.25)
+        # Update figure in each cycle (redrawn by the GUI event loop, no fixed pause)
+        self.fig.canvas.draw_idle()
+        self.fig.canvas.flush_events()
 
     def closePorts(self): # Closing ports at the end of each measuring
 
-        if self.enhancedPort.is_open:
+        self.stopAcquisition()
+        self.stopViewer()
+        self.stopFrameExport()
+
+        if self.captureWriter is not None:
+            self.captureWriter.close()
+
+        if self.enhancedPort is not None and self.enhancedPort.is_open:
             self.enhancedPort.close()
 
         if self.standardPort.is_open: